@@ -0,0 +1,145 @@
+import argparse
+import functools
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.models.hailo.blaze_model.blaze_pipeline_base import BlazePipelineBase
+from backend.models.hailo.blaze_model.face_mesh.blaze_face_pipeline import (
+    BlazeFacePipeline,
+)
+from backend.models.hailo.blaze_model.hands.blaze_hands_pipeline import (
+    BlazeHandsPipeline,
+)
+from backend.models.hailo.hailo_runtime.replay_inference_engine import (
+    ReplayInferenceEngine,
+)
+
+PIPELINES = {
+    "face": BlazeFacePipeline,
+    "hands": BlazeHandsPipeline,
+}
+
+# Stage name, component of the pipeline and method timed, in the order they run
+STAGES = [
+    ("resize_pad", "detector", "resize_pad"),
+    ("detector_inference", "detector", "run_inference"),
+    ("detector_postprocess", "detector", "postprocess"),
+    ("detection2roi", "detector", "detection2roi"),
+    ("landmarks2roi", "landmark_model", "landmarks2roi"),
+    ("extract_roi", "landmark_model", "extract_roi"),
+    ("landmark_inference", "landmark_model", "run_batch_inference"),
+    ("landmark_process", "landmark_model", "process"),
+    ("denormalize_landmarks", "landmark_model", "denormalize_landmarks"),
+    ("normalize_landmarks", "landmark_model", "normalized_landmark_to_orginal_image_space"),
+]
+
+
+class StageTimer():
+    """
+    Collects the duration of every call of the timed methods, keyed by stage name.
+    """
+    def __init__(self):
+        self.timings : Dict[str, List[float]] = {}
+
+    def wrap(self, stage : str, function):
+        timings = self.timings.setdefault(stage, [])
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings.append((time.perf_counter() - start) * 1000)
+        return timed
+
+    def instrument(self, pipeline : BlazePipelineBase):
+        """
+        Replaces the stage methods of the pipeline components by timed ones, on the instances only.
+        """
+        for stage, component, method in STAGES:
+            target = getattr(pipeline, component)
+            setattr(target, method, self.wrap(stage, getattr(target, method)))
+
+    def summary(self, nb_frames : int) -> List[dict]:
+        """
+        Returns one row per stage with the number of calls and the mean, p95 and per frame durations in milliseconds.
+        """
+        rows = []
+        for stage, timings in self.timings.items():
+            timings = np.asarray(timings)
+            rows.append({
+                "stage": stage,
+                "calls": len(timings),
+                "mean_ms": float(timings.mean()) if len(timings) else 0.0,
+                "p95_ms": float(np.percentile(timings, 95)) if len(timings) else 0.0,
+                "per_frame_ms": float(timings.sum() / nb_frames),
+            })
+        return rows
+
+def run_benchmark(pipeline_name : str, nb_frames : int = 300, redetection_interval : int = 0,
+                  image_size : tuple[int, int] = (640, 480), recordings_dir : Optional[str] = None,
+                  warmup : int = 10) -> List[dict]:
+    """
+    Drives a Blaze pipeline end to end with the replay engine and measures each host side stage.
+
+    Parameters
+    ----------
+    pipeline_name : str
+        "face" or "hands".
+    nb_frames : int, optional
+        Number of measured frames (default is 300).
+    redetection_interval : int, optional
+        Tracking mode of the pipeline, 0 runs the detector on every frame (default is 0).
+    image_size : tuple[int, int], optional
+        Width and height of the frames (default is 640x480).
+    recordings_dir : str, optional
+        Directory of recorded outputs to replay instead of the synthetic ones.
+    warmup : int, optional
+        Number of frames run before measuring (default is 10).
+
+    Returns
+    -------
+    list[dict]
+        One row per stage, see `StageTimer.summary`, the last row being the whole frame.
+    """
+    engine = ReplayInferenceEngine(recordings_dir)
+    pipeline = PIPELINES[pipeline_name](engine, landmarks_as_array=True, redetection_interval=redetection_interval)
+
+    width, height = image_size
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    for _ in range(warmup):
+        pipeline.inference(frame, preprocessed=False)
+    pipeline.reset_tracking()
+
+    timer = StageTimer()
+    timer.instrument(pipeline)
+    inference = timer.wrap("frame", pipeline.inference)
+    for _ in range(nb_frames):
+        inference(frame, preprocessed=False)
+
+    return timer.summary(nb_frames)
+
+def print_summary(pipeline_name : str, rows : List[dict]):
+    print(f"\n{pipeline_name} pipeline")
+    print(f"{'stage':<24} {'calls':>6} {'mean ms':>9} {'p95 ms':>9} {'ms/frame':>9}")
+    for row in rows:
+        print(f"{row['stage']:<24} {row['calls']:>6} {row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['per_frame_ms']:>9.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per stage benchmark of the Blaze pipelines on the replay inference engine")
+    parser.add_argument("--pipeline", choices=[*PIPELINES, "all"], default="all", help="Pipeline to benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="Number of measured frames")
+    parser.add_argument("--redetection-interval", type=int, default=0, help="Tracking mode, 0 runs the detector on every frame")
+    parser.add_argument("--width", type=int, default=640, help="Frame width")
+    parser.add_argument("--height", type=int, default=480, help="Frame height")
+    parser.add_argument("--recordings", default=None, help="Directory of recorded outputs to replay")
+    args = parser.parse_args()
+
+    names = list(PIPELINES) if args.pipeline == "all" else [args.pipeline]
+    for name in names:
+        rows = run_benchmark(name, args.frames, args.redetection_interval, (args.width, args.height), args.recordings)
+        print_summary(name, rows)
+    print("\nlandmark_process includes landmark_inference, frame is the whole pipeline inference call")
@@ -0,0 +1,157 @@
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from backend.tasks.detection_task import DetectionTask
+from backend.utils.drawing_utils import draw_triangle_masking, triangle_mask
+from backend.utils.frame_pool import frame_pool
+
+MODEL_COUNT = 3
+
+
+def copying_frame_path(frame : np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The frame handling of one iteration of the detection loop as it was before the frame pool,
+    without the models: every stage copying the frame it draws on. Kept as the reference.
+
+    Notes
+    -----
+    The "before" number is an approximation: this is a hand-written copy of the former frame
+    handling, not the actual triangle masking and drawing code paths, which now use the pool.
+
+    Parameters
+    ----------
+    frame : np.ndarray
+        The captured BGR frame.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The processed, the debug and the masked face model input frames.
+    """
+    height, width = frame.shape[:2]
+    triangle_cnt = np.array([(0, height - 1), (width - 1, height - 1), (width // 2, 0)], dtype=np.int32)
+
+    # Capture copy of the processed frame
+    processed_frame = frame.copy()
+
+    # Triangle masking of the face model input
+    masked_input = frame.copy()
+    mask = np.zeros_like(masked_input, dtype=np.uint8)
+    cv2.fillPoly(mask, [triangle_cnt], (255, 255, 255))
+    masked_input = cv2.bitwise_and(masked_input, mask)
+
+    # Debug frame of each model, the face one with the shaded masking
+    debug_frames = []
+    for index in range(MODEL_COUNT):
+        annotated_frame = frame.copy()
+        if index == 0:
+            cv2.polylines(annotated_frame, [triangle_cnt], isClosed=True, color=(0, 255, 0), thickness=2)
+            overlay = annotated_frame.copy()
+            cv2.fillPoly(overlay, [triangle_cnt], color=(0, 0, 0))
+            annotated_frame = cv2.addWeighted(overlay, 0.5, annotated_frame, 0.5, 0)
+        debug_frames.append(annotated_frame)
+
+    # Each model drawing on a copy of the processed frame
+    for _ in range(MODEL_COUNT):
+        processed_frame = processed_frame.copy()
+
+    resized = [cv2.resize(f, (f.shape[1], f.shape[0])) for f in debug_frames]
+    return processed_frame, cv2.hconcat(resized), masked_input
+
+def pooled_frame_path(frame : np.ndarray, task : DetectionTask, published : list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The same iteration with the frame pool: the copies go to reused buffers, the processed frame
+    is drawn in place and the frames are released once published.
+    """
+    height, width = frame.shape[:2]
+
+    processed_frame = frame_pool.copy(frame)
+
+    masked_input = cv2.bitwise_and(frame, frame, mask=triangle_mask(height, width))
+
+    debug_frames = []
+    for index in range(MODEL_COUNT):
+        annotated_frame = frame_pool.copy(frame)
+        if index == 0:
+            draw_triangle_masking(annotated_frame)
+        debug_frames.append(annotated_frame)
+
+    debug_frame = task.combine_debug_frames(debug_frames)
+    for annotated_frame in debug_frames:
+        frame_pool.release(annotated_frame)
+    debug_frames.clear()
+
+    # Publishing replaces the previous frames, which go back to the pool
+    previous_frames = list(published)
+    published[:] = [processed_frame, debug_frame]
+    for previous in previous_frames:
+        frame_pool.release(previous)
+    return processed_frame, debug_frame, masked_input
+
+def measure(path, frames : int, warmup : int = 5) -> float:
+    """
+    Returns the mean of the peak memory allocated within each call of `path`, in bytes, as traced by tracemalloc.
+    """
+    for _ in range(warmup):
+        path()
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            outputs = path()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            del outputs
+    finally:
+        tracemalloc.stop()
+    return float(np.mean(peaks))
+
+def run_benchmark(frames : int = 100, size : tuple[int, int] = (640, 480)) -> dict:
+    """
+    Measures the bytes allocated per frame by the frame handling of the detection loop, with the
+    copies of every stage against the frame pool.
+
+    Parameters
+    ----------
+    frames : int, optional
+        Number of measured frames (default is 100).
+    size : tuple[int, int], optional
+        Frame (width, height) (default is 640x480).
+
+    Returns
+    -------
+    dict
+        The bytes per frame of both paths and the size of a frame.
+    """
+    width, height = size
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    task = DetectionTask()
+    published = []
+    allocated_count = frame_pool.allocated_count
+
+    return {
+        "frame_bytes": frame.nbytes,
+        "copying_bytes": measure(lambda: copying_frame_path(frame), frames),
+        "pooled_bytes": measure(lambda: pooled_frame_path(frame, task, published), frames),
+        "pool_allocations": frame_pool.allocated_count - allocated_count,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes allocated per frame by the frame handling of the detection loop")
+    parser.add_argument("--frames", type=int, default=100, help="Number of measured frames")
+    parser.add_argument("--width", type=int, default=640, help="Frame width")
+    parser.add_argument("--height", type=int, default=480, help="Frame height")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.frames, (args.width, args.height))
+    print(f"frame size       : {result['frame_bytes'] / 1e6:.2f} MB")
+    print(f"copying frames   : {result['copying_bytes'] / 1e6:.2f} MB per frame")
+    print(f"frame pool       : {result['pooled_bytes'] / 1e6:.2f} MB per frame")
+    print(f"pool allocations : {result['pool_allocations']} buffers in total")
@@ -0,0 +1,154 @@
+import argparse
+import time
+
+import numpy as np
+
+from backend.models.hailo.blaze_model.blaze_detector_base import BlazeDetectorBase
+from backend.models.hailo.blaze_model.box_utils import overlap_similarity
+
+CANDIDATE_COUNTS = (10, 100, 1000)
+
+
+def greedy_weighted_non_max_suppression(detections : np.ndarray, num_coords : int, min_suppression_threshold : float) -> list:
+    """
+    The original greedy weighted NMS, which recomputes the IoU of the best remaining box
+    against every remaining box at each iteration. Kept as the reference implementation.
+
+    Parameters
+    ----------
+    detections : np.ndarray
+        Array of shape (N, num_coords + 1), the score being the last column.
+    num_coords : int
+        Number of coordinates of a detection.
+    min_suppression_threshold : float
+        IoU above which two detections belong to the same object.
+
+    Returns
+    -------
+    list[np.ndarray]
+        One blended detection per object, from the most to the least confident.
+    """
+    if len(detections) == 0:
+        return []
+
+    output_detections = []
+    remaining = np.argsort(detections[:, num_coords])[::-1]
+
+    while len(remaining) > 0:
+        detection = detections[remaining[0]]
+        ious = overlap_similarity(detection[:4], detections[remaining, :4])
+
+        mask = ious > min_suppression_threshold
+        overlapping = remaining[mask]
+        remaining = remaining[~mask]
+
+        weighted_detection = detection.copy()
+        if len(overlapping) > 1:
+            coordinates = detections[overlapping, :num_coords]
+            scores = detections[overlapping, num_coords:num_coords+1]
+            total_score = scores.sum()
+            weighted = np.sum(coordinates * scores, axis=0) / total_score
+            weighted_detection[:num_coords] = weighted
+            weighted_detection[num_coords] = total_score / len(overlapping)
+
+        output_detections.append(weighted_detection)
+
+    return output_detections
+
+def generate_candidates(count : int, num_objects : int = 5, num_keypoints : int = 6, seed : int = 0) -> np.ndarray:
+    """
+    Generates detector candidates the way the Blaze detectors produce them: several
+    jittered boxes around each object, plus a few isolated low score boxes.
+
+    Parameters
+    ----------
+    count : int
+        Number of candidates.
+    num_objects : int, optional
+        Number of objects the candidates are clustered around (default is 5).
+    num_keypoints : int, optional
+        Number of keypoints of a detection (default is 6).
+    seed : int, optional
+        Seed of the random generator (default is 0).
+
+    Returns
+    -------
+    np.ndarray
+        Float32 array of shape (count, 4 + 2 * num_keypoints + 1), in [ymin, xmin, ymax, xmax, keypoints..., score] format.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0.2, 0.8, (num_objects, 2))
+    sizes = rng.uniform(0.1, 0.3, (num_objects, 1))
+
+    object_ids = rng.integers(0, num_objects, count)
+    center = centers[object_ids] + rng.normal(0, 0.01, (count, 2))
+    size = sizes[object_ids] * rng.uniform(0.9, 1.1, (count, 1))
+
+    # About a tenth of the candidates are isolated boxes anywhere in the image
+    isolated = rng.random(count) < 0.1
+    center[isolated] = rng.uniform(0, 1, (isolated.sum(), 2))
+    size[isolated] = rng.uniform(0.01, 0.05, (isolated.sum(), 1))
+
+    boxes = np.concatenate((center - size / 2, center + size / 2), axis=-1)
+    keypoints = np.repeat(center, num_keypoints, axis=0).reshape(count, -1) + rng.normal(0, 0.02, (count, 2 * num_keypoints))
+    scores = rng.uniform(0.5, 1.0, (count, 1))
+    return np.concatenate((boxes, keypoints, scores), axis=-1).astype(np.float32)
+
+def time_function(function, repeat : int) -> float:
+    """
+    Returns the best time of `repeat` calls of `function`, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def run_benchmark(counts : tuple = CANDIDATE_COUNTS, repeat : int = 20) -> list[dict]:
+    """
+    Benchmarks the vectorized weighted NMS of the detectors against the original greedy one.
+
+    Parameters
+    ----------
+    counts : tuple[int], optional
+        Numbers of candidates to benchmark (default is 10, 100 and 1000).
+    repeat : int, optional
+        Number of calls per measurement, the best one is kept (default is 20).
+
+    Returns
+    -------
+    list[dict]
+        One row per count with the timings in milliseconds, the speedup and whether the outputs are identical.
+    """
+    detector = BlazeDetectorBase()
+    detector.num_coords = 16
+    detector.min_suppression_threshold = 0.3
+
+    results = []
+    for count in counts:
+        detections = generate_candidates(count)
+        expected = np.asarray(greedy_weighted_non_max_suppression(detections, detector.num_coords, detector.min_suppression_threshold))
+        output = detector.weighted_non_max_suppression(detections)
+
+        greedy_ms = time_function(lambda: greedy_weighted_non_max_suppression(detections, detector.num_coords, detector.min_suppression_threshold), repeat)
+        vectorized_ms = time_function(lambda: detector.weighted_non_max_suppression(detections), repeat)
+        results.append({
+            "candidates": count,
+            "clusters": len(output),
+            "greedy_ms": greedy_ms,
+            "vectorized_ms": vectorized_ms,
+            "speedup": greedy_ms / vectorized_ms,
+            "identical": np.array_equal(output, expected),
+        })
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the Blaze weighted non max suppression")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'clusters':>8} {'greedy ms':>10} {'vectorized ms':>13} {'speedup':>8} {'identical':>9}")
+    for row in run_benchmark(repeat=args.repeat):
+        print(f"{row['candidates']:>10} {row['clusters']:>8} {row['greedy_ms']:>10.3f} {row['vectorized_ms']:>13.3f} {row['speedup']:>7.1f}x {str(row['identical']):>9}")
@@ -0,0 +1,23 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from backend.hardware.camera.base_camera import BaseCamera
+from backend.services.drowsiness_detection_service import DrowsinessDetectionService
+from backend.services.hand_detection_service import HandsDetectionService
+from backend.services.phone_detection_service import PhoneDetectionService
+from backend.tasks.detection_task import DetectionTask
+from backend.utils.frame_buffer import FrameBuffer
+
+
+@dataclass
+class CameraPipeline:
+    camera_id: str
+    camera: BaseCamera
+    frame_buffer: FrameBuffer
+    detection_task: DetectionTask
+    drowsiness_service: DrowsinessDetectionService
+    phone_detection_service: PhoneDetectionService
+    hand_service: HandsDetectionService
+    thread: Optional[threading.Thread] = None
+    is_running: bool = False
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class CapturedFrame:
+    frame: np.ndarray
+    sequence: int  # Index of the frame since the camera started, a gap means frames were skipped
+    timestamp: float  # time.monotonic() when the frame was read
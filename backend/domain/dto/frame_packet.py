@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from backend.domain.dto.drowsiness_detection_result import DrowsinessDetectionResult
+from backend.domain.dto.hands_detection_result import HandsDetectionResult
+from backend.domain.dto.phone_detection_result import PhoneDetectionResult
+
+
+@dataclass
+class FramePacket:
+    frame_id: int
+    captured_at: float  # time.monotonic() when the camera read the frame
+    raw_frame: np.ndarray
+    processed_frame: Optional[np.ndarray]
+    drowsiness_result: Optional[DrowsinessDetectionResult] = None
+    phone_result: Optional[PhoneDetectionResult] = None
+    hands_result: Optional[HandsDetectionResult] = None
+    debug_frame: Optional[np.ndarray] = None
+    fresh_models: set[str] = field(default_factory=set)  # Models run on this frame, the other results are reused
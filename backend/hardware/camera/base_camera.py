@@ -1,7 +1,11 @@
+import time
 from abc import ABC, abstractmethod
+from typing import Optional
 
 import numpy as np
 
+from backend.domain.dto.captured_frame import CapturedFrame
+
 
 class BaseCamera(ABC):
     @abstractmethod
@@ -12,6 +16,18 @@ class BaseCamera(ABC):
         """
         pass
 
+    def get_frame(self) -> Optional[CapturedFrame]:
+        """
+        Returns the next frame with its sequence number and the monotonic time it was read at,
+        or None when the capture failed. Cameras reading on their own thread stamp the frames
+        when they are read rather than when they are taken.
+        """
+        ret, frame = self.get_capture()
+        if not ret:
+            return None
+        self.sequence = getattr(self, "sequence", -1) + 1
+        return CapturedFrame(frame, self.sequence, time.monotonic())
+
     @abstractmethod
     def release(self):
         """
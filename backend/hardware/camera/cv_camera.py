@@ -6,10 +6,37 @@ from backend.utils.logging import logging_default #Imports a pre-configured logg
 
 
 class CVCamera(BaseCamera):
-    def __init__(self, cam_index=0): #cam_index=0: It accepts a camera index, which is typically 0 for the default built-in webcam. If you have multiple cameras, you could use 1, 2, and so on.
+    def __init__(self, cam_index=0, width=0, height=0, fps=0.0, fourcc="", buffer_size=1): #cam_index=0: It accepts a camera index, which is typically 0 for the default built-in webcam. If you have multiple cameras, you could use 1, 2, and so on.
         logging_default.info("Setting up the camera")
         self.cap = cv2.VideoCapture(cam_index) #calls cv2.VideoCapture() with the camera index to create a video capture object. This object is the connection to the physical camera hardware
 
+        # The pixel format goes first, the resolutions and frame rates a camera offers depend on it
+        # (MJPG usually reaches 30 FPS at 1080p where YUYV doesn't). 0 or "" keep the driver default.
+        if fourcc:
+            self.set_property(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc), "fourcc")
+        if width and height:
+            self.set_property(cv2.CAP_PROP_FRAME_WIDTH, width, "width")
+            self.set_property(cv2.CAP_PROP_FRAME_HEIGHT, height, "height")
+        if fps:
+            self.set_property(cv2.CAP_PROP_FPS, fps, "fps")
+        # Keep a single frame in the driver buffer, so a read returns the newest frame instead of a
+        # stale queued one. Not every backend supports it, in which case the setting is ignored.
+        if buffer_size:
+            self.set_property(cv2.CAP_PROP_BUFFERSIZE, buffer_size, "buffer size")
+
+        logging_default.info(
+            "Camera format - {width}x{height} at {fps} FPS, fourcc {fourcc}",
+            width=int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            fps=self.cap.get(cv2.CAP_PROP_FPS),
+            fourcc=int(self.cap.get(cv2.CAP_PROP_FOURCC)).to_bytes(4, "little").decode(errors="replace")
+        )
+
+    def set_property(self, property_id : int, value, name : str):
+        # The camera may silently pick the closest supported value, the format actually used is logged above
+        if not self.cap.set(property_id, value):
+            logging_default.warning(f"The camera backend doesn't support setting the {name} to {value}")
+
 
 
     #Tuple is an ordered collection of lements but it is immutable (elements cannot be changed)
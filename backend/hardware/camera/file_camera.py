@@ -0,0 +1,136 @@
+import os
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from backend.hardware.camera.base_camera import BaseCamera
+from backend.utils.logging import logging_default
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Frame rate of an image directory when none is given
+DEFAULT_IMAGE_FPS = 30.0
+
+
+class FileCamera(BaseCamera):
+    """
+    Plays a recorded video or a directory of images as a camera, so the performance of the
+    pipeline can be measured on the same frames across commits and devices.
+
+    In the "realtime" mode the frames come at the frame rate of the clip, like from a live camera:
+    reading waits for the next frame to be due, and the frames that went by while the reader was
+    busy are skipped. In the "max" mode every frame is returned as soon as it is read, to measure
+    the maximum throughput of the pipeline. Wrapped in a `ThreadedCamera` the "max" mode reads
+    faster than the pipeline and the frames it can't keep up with are dropped, so disable the
+    threaded capture to have every frame of the clip processed.
+
+    Parameters
+    ----------
+    path : str
+        Path of the video file or of the directory of images, played in the order of their names.
+    mode : str, optional
+        "realtime" or "max" (default is "realtime").
+    loop : bool, optional
+        Whether to start over at the end of the clip instead of returning no frame (default is True).
+    fps : float, optional
+        Frame rate of the clip, 0 to use the one of the video, or 30 for the images (default is 0).
+    """
+    def __init__(self, path : str, mode : str = "realtime", loop : bool = True, fps : float = 0.0):
+        if mode not in ("realtime", "max"):
+            raise ValueError(f"Unknown file camera mode {mode}, expected 'realtime' or 'max'")
+        logging_default.info(f"Setting up the file camera on {path} ({mode} mode)")
+
+        self.path = path
+        self.mode = mode
+        self.loop = loop
+        self.cap : Optional[cv2.VideoCapture] = None
+        self.image_paths : list[str] = []
+
+        if os.path.isdir(path):
+            self.image_paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self.image_paths:
+                raise ValueError(f"No image found in {path}")
+            self.frame_count = len(self.image_paths)
+            self.fps = fps or DEFAULT_IMAGE_FPS
+        else:
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                raise ValueError(f"Cannot open the video {path}")
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_IMAGE_FPS
+
+        # Index of the next frame to read, and the time the first frame of the clip was due
+        self.position = 0
+        self.start_time = time.monotonic()
+        self.skipped_count = 0
+
+    def get_capture(self) -> tuple[bool, np.ndarray]:
+        if self.position >= self.frame_count:
+            if not self.loop:
+                return False, None
+            self.seek(0)
+
+        if self.mode == "realtime":
+            due_index = int((time.monotonic() - self.start_time) * self.fps)
+            if due_index < self.position:
+                # Wait for the next frame to be due
+                time.sleep((self.start_time + self.position / self.fps) - time.monotonic())
+            elif due_index > self.position:
+                # Skip the frames that went by meanwhile, like a live camera would have
+                self.skipped_count += min(due_index, self.frame_count) - self.position
+                if due_index >= self.frame_count:
+                    if not self.loop:
+                        self.position = self.frame_count
+                        return False, None
+                    self.seek(0)
+                elif self.cap is not None and due_index - self.position <= self.fps:
+                    # Grabbing a few frames without decoding them is cheaper than seeking in the video
+                    for _ in range(due_index - self.position):
+                        self.cap.grab()
+                    self.position = due_index
+                else:
+                    self.seek(due_index, keep_clock=True)
+
+        frame = self.read_frame()
+        if frame is None:
+            logging_default.warning(f"Failed to read frame {self.position} of {self.path}")
+            return False, None
+        self.position += 1
+        return True, frame
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        if self.cap is not None:
+            ret, frame = self.cap.read()
+            return frame if ret else None
+        return cv2.imread(self.image_paths[self.position])
+
+    def seek(self, index : int, keep_clock : bool = False):
+        """
+        Move to the frame `index` of the clip, wrapped around its length when looping.
+
+        Parameters
+        ----------
+        index : int
+            Index of the next frame to read.
+        keep_clock : bool, optional
+            Whether the realtime clock keeps running, otherwise the clip plays on from `index` as
+            if it had started there (default is False).
+        """
+        if self.loop and self.frame_count > 0:
+            index %= self.frame_count
+        self.position = min(max(index, 0), self.frame_count)
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.position)
+        if not keep_clock:
+            self.start_time = time.monotonic() - self.position / self.fps
+
+    def seek_seconds(self, seconds : float):
+        """Move to the frame at `seconds` from the start of the clip."""
+        self.seek(int(seconds * self.fps))
+
+    def release(self):
+        if self.cap is not None:
+            logging_default.info("Releasing the file camera")
+            self.cap.release()
@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import cv2
+import numpy as np
+
+from backend.hardware.camera.base_camera import BaseCamera
+from backend.hardware.camera.threaded_camera import ThreadedCamera
+from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
+
+
+def redact_url(url : str) -> str:
+    """Returns the URL without the password it may hold, to log it."""
+    parts = urlsplit(url)
+    if parts.password is None:
+        return url
+    netloc = f"{parts.username}:***@{parts.hostname}" + (f":{parts.port}" if parts.port else "")
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+class NetworkStream(BaseCamera):
+    """
+    Reads an RTSP or HTTP MJPEG stream with the FFmpeg backend of OpenCV, reconnecting when the
+    stream is lost. Reading blocks on the network, use it through a `NetworkCamera`.
+
+    A failed connection is retried after a backoff doubling up to `max_backoff`, reset once a
+    frame is read again.
+
+    Parameters
+    ----------
+    url : str
+        URL of the stream, like rtsp://192.168.1.10:554/stream1 or http://192.168.1.10/video.mjpg.
+    camera_id : str, optional
+        Id of the camera in the metrics and the logs (default is "default").
+    open_timeout : float, optional
+        Maximum time to open the stream or to wait for a frame, in seconds (default is 5.0).
+    backoff : float, optional
+        Wait before the first reconnection attempt, in seconds (default is 0.5).
+    max_backoff : float, optional
+        Longest wait between two reconnection attempts, in seconds (default is 10.0).
+    """
+    def __init__(self, url : str, camera_id : str = "default", open_timeout : float = 5.0,
+                 backoff : float = 0.5, max_backoff : float = 10.0):
+        self.url = url
+        self.camera_id = camera_id
+        self.open_timeout = open_timeout
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.cap : Optional[cv2.VideoCapture] = None
+        self.backoff = backoff
+        self.next_attempt = 0.0
+        self.connected_once = False
+        self.reconnect_count = 0
+        self.stop_event = threading.Event()
+
+        self.decode_histogram = metrics.histogram("camera_decode_seconds", camera=camera_id)
+        self.reconnect_counter = metrics.counter("camera_reconnects_total", camera=camera_id)
+
+    def connect(self) -> bool:
+        # Wait for the backoff of the previous failure, unless the camera is released meanwhile
+        if self.stop_event.wait(max(0.0, self.next_attempt - time.monotonic())):
+            return False
+        if self.connected_once:
+            self.reconnect_count += 1
+            self.reconnect_counter.inc()
+
+        timeout_ms = int(self.open_timeout * 1000)
+        cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+        if not cap.isOpened():
+            cap.release()
+            logging_default.warning(f"Cannot open the stream of camera {self.camera_id} ({redact_url(self.url)}), retrying in {self.backoff:.1f}s")
+            self.next_attempt = time.monotonic() + self.backoff
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            return False
+
+        logging_default.info(f"Connected to the stream of camera {self.camera_id} ({redact_url(self.url)})")
+        self.cap = cap
+        self.connected_once = True
+        return True
+
+    def get_capture(self) -> tuple[bool, np.ndarray]:
+        if self.cap is None and not self.connect():
+            return False, None
+
+        # grab waits for the next packet, retrieve decodes it
+        if not self.cap.grab():
+            logging_default.warning(f"Lost the stream of camera {self.camera_id}, reconnecting")
+            self.disconnect()
+            return False, None
+        with self.decode_histogram.time():
+            ret, frame = self.cap.retrieve()
+        if not ret or frame is None:
+            return False, None
+
+        self.backoff = self.initial_backoff
+        return True, frame
+
+    def disconnect(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.next_attempt = time.monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def release(self):
+        self.stop_event.set()
+        if self.cap is not None:
+            logging_default.info(f"Releasing the stream of camera {self.camera_id}")
+            self.cap.release()
+            self.cap = None
+
+
+class NetworkCamera(ThreadedCamera):
+    """
+    A network stream camera, connected, read and decoded on its own thread so the detection loop
+    never waits on the network or the decoder, and always gets the newest decoded frame.
+
+    The time to decode each frame is published as `camera_decode_seconds`, the reconnections as
+    `camera_reconnects_total` and the decoded frames never taken as `frames_dropped_total{queue="camera"}`.
+
+    Parameters
+    ----------
+    url : str
+        URL of the RTSP or HTTP MJPEG stream.
+    camera_id : str, optional
+        Id of the camera in the metrics and the logs (default is "default").
+    timeout : float, optional
+        Maximum time `get_capture` waits for a new frame, in seconds (default is 0.1).
+    **stream_options
+        The timeout and backoff options of `NetworkStream`.
+    """
+    def __init__(self, url : str, camera_id : str = "default", timeout : float = 0.1, **stream_options):
+        self.stream = NetworkStream(url, camera_id, **stream_options)
+        super().__init__(self.stream, camera_id, timeout)
+
+    @property
+    def reconnect_count(self) -> int:
+        return self.stream.reconnect_count
+
+    def release(self):
+        # Interrupt a reconnection backoff before waiting for the reading thread
+        self.stream.stop_event.set()
+        super().release()
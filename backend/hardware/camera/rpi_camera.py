@@ -6,9 +6,15 @@ from backend.utils.logging import logging_default
 
 
 class RPiCamera(BaseCamera): #creates a new class named RPiCamera that inherits from BaseCamera
-    def __init__(self):
+    def __init__(self, camera_num=0, width=0, height=0, fps=0.0): #camera_num: index of the camera when several are connected
         logging_default.info("Setting up the camera")
-        self.picam2 = Picamera2() #creates an instance of the Picamera2 class, initializes the connection to the physical camera hardware
+        self.picam2 = Picamera2(camera_num) #creates an instance of the Picamera2 class, initializes the connection to the physical camera hardware
+        # Size and frame rate of the stream, 0 keeps the default preview configuration.
+        # The ISP scales the sensor output, the pixel format stays the default one.
+        if (width and height) or fps:
+            main = {"size": (width, height)} if width and height else {}
+            controls = {"FrameRate": fps} if fps else {}
+            self.picam2.configure(self.picam2.create_preview_configuration(main=main, controls=controls))
         self.picam2.start() # calls the .start() method on the camera object. This powers up the camera sensor and starts the video stream
 
     def get_capture(self) -> np.ndarray: #purpose is to capture a single, current frame from the camera's video stream
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from backend.domain.dto.captured_frame import CapturedFrame
+from backend.hardware.camera.base_camera import BaseCamera
+from backend.utils.latest_value_queue import LatestValueQueue
+from backend.utils.logging import logging_default
+
+# Seconds to wait before reading again after a failed capture
+RETRY_INTERVAL = 0.01
+
+
+class ThreadedCamera(BaseCamera):
+    """
+    Reads any camera continuously on its own thread, so the detection loop never waits on the
+    sensor timing nor reads the frames queued in the driver while it was busy.
+
+    The reading thread puts every frame, stamped with its sequence number and the time it was
+    read at, into a latest frame slot: the frame being read and the one waiting in the slot are
+    the two buffers, and a frame not taken before the next one is read is dropped and counted.
+    `get_capture` returns the waiting frame at once, and only waits for the next one when the
+    newest frame was already taken.
+
+    Parameters
+    ----------
+    camera : BaseCamera
+        The camera to read.
+    camera_id : str, optional
+        Id of the camera in the metrics and the logs (default is "default").
+    timeout : float, optional
+        Maximum time `get_capture` waits for a new frame, in seconds, short enough for the detection
+        loop to notice it is asked to stop (default is 0.1).
+    """
+    def __init__(self, camera : BaseCamera, camera_id : str = "default", timeout : float = 0.1):
+        self.camera = camera
+        self.camera_id = camera_id
+        self.timeout = timeout
+        self.slot = LatestValueQueue("camera", camera=camera_id)
+        self.sequence = -1
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.read_loop, name=f"camera-{camera_id}", daemon=True)
+        self.thread.start()
+
+    def read_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                ret, frame = self.camera.get_capture()
+            except Exception:
+                logging_default.exception(f"Reading camera {self.camera_id} failed")
+                ret, frame = False, None
+
+            if not ret:
+                self.stop_event.wait(RETRY_INTERVAL)
+                continue
+
+            self.sequence += 1
+            self.slot.put(CapturedFrame(frame, self.sequence, time.monotonic()))
+
+    def get_frame(self) -> Optional[CapturedFrame]:
+        """
+        Returns the newest frame not taken yet, waiting up to `timeout` for one, or None.
+        """
+        return self.slot.get(timeout=self.timeout)
+
+    def get_capture(self) -> tuple[bool, np.ndarray]:
+        captured = self.get_frame()
+        if captured is None:
+            return False, None
+        return True, captured.frame
+
+    @property
+    def dropped_count(self) -> int:
+        """Frames read but replaced by a newer one before being taken."""
+        return self.slot.dropped_count
+
+    def release(self):
+        """Stops the reading thread, then releases the camera."""
+        self.stop_event.set()
+        self.slot.close()
+        self.thread.join(timeout=2)
+        if self.thread.is_alive():
+            # Releasing the camera under a read still in progress may crash the capture backend
+            logging_default.warning(f"Camera {self.camera_id} is still reading, leaving it to the end of the process")
+            return
+        self.camera.release()
@@ -1,12 +1,44 @@
 import os #Provides tools to interact with the OS, such as findoing out its name
+from typing import Optional
 
+from backend.settings.app_config import CameraSettings
 
-def get_camera(): #figure out which camera class to use, create an instance of it, and return it
-    if os.name == "posix": #checks the name attribute of the os module
+
+def get_camera(camera_settings : Optional[CameraSettings] = None): #figure out which camera class to use, create an instance of it, and return it
+    # The settings of the camera in app_settings.json, the default camera when not given
+    camera_settings = camera_settings or CameraSettings()
+    if camera_settings.type == "network":
+        # RTSP or HTTP MJPEG stream, always read on its own thread as reading waits on the network
+        from backend.hardware.camera.network_camera import NetworkCamera
+        return NetworkCamera(
+            camera_settings.url,
+            camera_settings.camera_id,
+            backoff=camera_settings.reconnect_backoff,
+            max_backoff=camera_settings.reconnect_max_backoff
+        )
+    if camera_settings.type == "file":
+        # Recorded clip or image directory, to benchmark the pipeline on the same frames
+        from backend.hardware.camera.file_camera import FileCamera
+        camera = FileCamera(camera_settings.file_path, camera_settings.file_mode, camera_settings.file_loop, camera_settings.file_fps)
+    elif os.name == "posix": #checks the name attribute of the os module
         from backend.hardware.camera.rpi_camera import RPiCamera #If True then import RPICamera class
-        return RPiCamera() #Creates insatcne of RPICamera class
-    from backend.hardware.camera.cv_camera import CVCamera #It imports the CVCamera class
-    return CVCamera()#Creates instacne of CVCamera
+        camera = RPiCamera(camera_settings.source, camera_settings.width, camera_settings.height, camera_settings.fps) #Creates insatcne of RPICamera class
+    else:
+        from backend.hardware.camera.cv_camera import CVCamera #It imports the CVCamera class
+        camera = CVCamera(
+            camera_settings.source,
+            camera_settings.width,
+            camera_settings.height,
+            camera_settings.fps,
+            camera_settings.fourcc,
+            camera_settings.buffer_size
+        )#Creates instacne of CVCamera
+
+    # Read the camera on its own thread, the detection loop then takes the newest frame without waiting
+    if camera_settings.threaded_capture:
+        from backend.hardware.camera.threaded_camera import ThreadedCamera
+        camera = ThreadedCamera(camera, camera_settings.camera_id)
+    return camera
 
 def get_buzzer():
     if os.name == "posix":
@@ -1,4 +1,6 @@
 import math
+import time
+from typing import Optional
 
 import cv2
 import numpy as np
@@ -14,7 +16,10 @@ from backend.utils.drawing_utils import (
     draw_face_bounding_box,
     draw_head_pose_direction,
     draw_landmarks,
+    draw_triangle_masking,
+    triangle_mask,
 )
+from backend.utils.frame_context import FrameContext
 from backend.utils.landmark_constants import (
     HEAD_POSE_POINTS,
     INNER_LIPS_CONNECTIONS,
@@ -28,10 +33,11 @@ from backend.utils.landmark_constants import (
     RIGHT_EYEBROW_CONNECTIONS,
 )
 from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
 
 
 class DrowsinessDetection():
-    def __init__(self, model_settings : FaceMeshConfig, detection_settings : DrowsinessConfig, inference_engine : str = None):
+    def __init__(self, model_settings : FaceMeshConfig, detection_settings : DrowsinessConfig, inference_engine : str = None, camera_id : str = "default"):
         
         # Load Configurations
         self.load_configuration(detection_settings)
@@ -39,6 +45,12 @@ class DrowsinessDetection():
         # Get the model
         self.model = get_face_model(model_settings, inference_engine)
 
+        # Timings published at /metrics, per camera as each camera has its own detector
+        self.preprocess_histogram = metrics.histogram("model_preprocess_seconds", model="face", camera=camera_id)
+        self.inference_histogram = metrics.histogram("model_inference_seconds", model="face", camera=camera_id)
+        self.feature_histogram = metrics.histogram("feature_extraction_seconds", model="face", camera=camera_id)
+        self.invocation_counter = metrics.counter("model_invocations_total", model="face", camera=camera_id)
+
         # Counter for the Yawn and Drowsiness
         self.drowsiness_frame_counter = 0
         self.yawn_frame_counter = 0
@@ -91,7 +103,7 @@ class DrowsinessDetection():
         )
         return
 
-    def detect_face_landmarks(self, image: np.ndarray) -> list:
+    def detect_face_landmarks(self, image: np.ndarray, context : Optional[FrameContext] = None) -> list:
         """
         This function is to process an RGB image and returns the face landmarks on each detected face.
 
@@ -99,6 +111,8 @@ class DrowsinessDetection():
         ----------
         image : np.ndarray
             The image frame of which want to get the face landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, the model preprocessing is looked up there
 
         Return
         ----------
@@ -106,6 +120,7 @@ class DrowsinessDetection():
             A list of lists of face landmark, where each inner list contains the landmarks of a detected face.
             Each landmark contains the (x, y, z) coordinates. To access the coordinates, simply loop through 
             the list and use item.x, item.y, or item.z with index array like item[0], item[1], item[2].
+            The Hailo pipeline returns the same layout as a (N, K, 3) float32 array, so test it with `len()`.
 
             Example:
             ```
@@ -119,8 +134,11 @@ class DrowsinessDetection():
             ]
             ```
         """
-        processed_image = self.model.preprocess(image)
-        face_landmarks = self.model.inference(processed_image)
+        with self.preprocess_histogram.time():
+            processed_image = self.model.preprocess(image, context)
+        with self.inference_histogram.time():
+            face_landmarks = self.model.inference(processed_image, context=context)
+        self.invocation_counter.inc()
         return face_landmarks
 
     def extract_mouth_landmark(self, face_landmark, mouth_connections : list, frame_width : int = 640, frame_height : int = 480) -> list[tuple[int, int]]:
@@ -417,36 +435,33 @@ class DrowsinessDetection():
     def triangle_masking(self, frame : np.ndarray) -> np.ndarray:
         height, width = frame.shape[:2]
 
-        # Define the three points of the triangle
-        bottom_left = (0, height - 1)
-        bottom_right = (width - 1, height - 1)
-        top_middle = (width // 2, 0)
-
-        # Create a triangular mask
-        mask = np.zeros_like(frame, dtype=np.uint8)
-        triangle_cnt = np.array([bottom_left, bottom_right, top_middle], dtype=np.int32)
-        cv2.fillPoly(mask, [triangle_cnt], (255, 255, 255))
-
-        # Apply the mask using bitwise AND
-        masked_frame = cv2.bitwise_and(frame, mask)
+        # Keep the triangle and black out the rest, the mask is only built once per frame size
+        masked_frame = cv2.bitwise_and(frame, frame, mask=triangle_mask(height, width))
         return masked_frame
 
-    def detects(self, frame : np.ndarray) -> DrowsinessDetectionResult:
+    def detects(self, frame : np.ndarray, context : Optional[FrameContext] = None) -> DrowsinessDetectionResult:
         """
-        Calculating the result of the detection and draw the results
+        Calculating the result of the detection and draw the results. When the per frame `context`
+        of `frame` is given, the masked frame and its preprocessing are memoized there.
         """
         results = DrowsinessDetectionResult()
 
         # Preprocess
-        original_frame = frame.copy()
-        if self.apply_triangle_masking:
-            original_frame = self.triangle_masking(original_frame)
+        if context is not None:
+            if self.apply_triangle_masking:
+                context = context.derive("triangle_masked", self.triangle_masking)
+            original_frame = context.frame
+        else:
+            original_frame = frame
+            if self.apply_triangle_masking:
+                original_frame = self.triangle_masking(original_frame)
 
         # Get the landmarks for the face
-        face_landmarks = self.detect_face_landmarks(original_frame)
+        face_landmarks = self.detect_face_landmarks(original_frame, context)
 
         # Drowsiness and pose detection
-        if face_landmarks:
+        start = time.perf_counter()
+        if len(face_landmarks) > 0:
             face_id = 1
 
             for face_landmark in face_landmarks:
@@ -479,6 +494,7 @@ class DrowsinessDetection():
                 results.faces.append(face_result)
 
                 face_id += 1
+        self.feature_histogram.observe(time.perf_counter() - start)
         return results
     
     def draw(self, frame : np.ndarray, result : DrowsinessDetectionResult, draw_masking : bool) -> np.ndarray:
@@ -506,23 +522,11 @@ class DrowsinessDetection():
 
         # Draw masking
         if self.apply_triangle_masking:
-            height, width = annotated_frame.shape[:2]
-            bottom_left = (0, height - 1)
-            bottom_right = (width - 1, height - 1)
-            top_middle = (width // 2, 0)
-
-            # Draw the masking and the points
-            triangle_cnt = np.array([bottom_left, bottom_right, top_middle], dtype=np.int32)
-            cv2.polylines(annotated_frame, [triangle_cnt], isClosed=True, color=(0, 255, 0), thickness=2)
-            cv2.circle(annotated_frame, top_middle, radius=6, color=(0, 0, 255), thickness=-1)
-            overlay = annotated_frame.copy()
-            cv2.fillPoly(overlay, [triangle_cnt], color=(0, 0, 0))
-            alpha = 0.5
-            annotated_frame = cv2.addWeighted(overlay, alpha, annotated_frame, 1 - alpha, 0)
+            draw_triangle_masking(annotated_frame)
 
         for face in result.faces:
             landmark = face.face_landmark
-            if not landmark:
+            if landmark is None or len(landmark) == 0:
                 continue 
 
             # Draw bounding box (you must have your own method for this)
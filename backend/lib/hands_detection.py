@@ -1,20 +1,31 @@
+import time
+from typing import Optional
+
 import numpy as np
 
 from backend.domain.dto.hands_detection_result import HandsDetectionResult, HandState
 from backend.models.factory_model import get_hands_pose_model
 from backend.settings.model_config import HandsConfig
+from backend.utils.frame_context import FrameContext
 from backend.utils.landmark_constants import (
     MIDDLE_POINTS,
 )
+from backend.utils.metrics import metrics
 
 
 class HandsDetection():
-    def __init__(self, model_settings : HandsConfig, inference_engine : str = None):
+    def __init__(self, model_settings : HandsConfig, inference_engine : str = None, camera_id : str = "default"):
 
         # Get the model
         self.model = get_hands_pose_model(model_settings, inference_engine)
 
-    def detect_hand_landmarks(self, image : np.ndarray) -> list:
+        # Timings published at /metrics, per camera as each camera has its own detector
+        self.preprocess_histogram = metrics.histogram("model_preprocess_seconds", model="hands", camera=camera_id)
+        self.inference_histogram = metrics.histogram("model_inference_seconds", model="hands", camera=camera_id)
+        self.feature_histogram = metrics.histogram("feature_extraction_seconds", model="hands", camera=camera_id)
+        self.invocation_counter = metrics.counter("model_invocations_total", model="hands", camera=camera_id)
+
+    def detect_hand_landmarks(self, image : np.ndarray, context : Optional[FrameContext] = None) -> list:
         """
         This function is to process an RGB image and returns the hands landmarks on each detected hand.
 
@@ -25,6 +36,8 @@ class HandsDetection():
         ----------
         image : np.ndarray
             The RGB image frame in which to detect hand landmarks.
+        context : FrameContext, optional
+            The per frame memo of `image`, the model preprocessing is looked up there
             
         Returns
         -------
@@ -46,8 +59,11 @@ class HandsDetection():
             ]
             ```
         """
-        preprocess_image = self.model.preprocess(image)
-        hand_results = self.model.inference(preprocess_image)
+        with self.preprocess_histogram.time():
+            preprocess_image = self.model.preprocess(image, context)
+        with self.inference_histogram.time():
+            hand_results = self.model.inference(preprocess_image, context=context)
+        self.invocation_counter.inc()
         return hand_results
 
     def extract_hand_landmark(self, hand_landmark : np.ndarray, hand_connections : list, frame_width : int = 640, frame_height : int = 480):
@@ -81,16 +97,18 @@ class HandsDetection():
 
         return all_hands
     
-    def detect(self, original_frame : np.ndarray) -> HandsDetectionResult:
+    def detect(self, original_frame : np.ndarray, context : Optional[FrameContext] = None) -> HandsDetectionResult:
         """
-        Calculating the result of the detection and draw the results
+        Calculating the result of the detection and draw the results, the preprocessing is shared
+        through the per frame `context` of `original_frame` if given
         """
         results = HandsDetectionResult()
 
         # Get the landmarks for the hands
-        hand_landmarks = self.detect_hand_landmarks(original_frame)
+        hand_landmarks = self.detect_hand_landmarks(original_frame, context)
 
-        if hand_landmarks:
+        start = time.perf_counter()
+        if len(hand_landmarks) > 0:
             for hand_landmark in hand_landmarks:
                 hand_result = HandState()
                 hand_result.hand_landmark = hand_landmark
@@ -102,4 +120,5 @@ class HandsDetection():
                 # Here some example how to get it, have no need for now
                 _ = self.extract_hand_landmark(hand_landmark, MIDDLE_POINTS, original_frame.shape[1], original_frame.shape[0])
                 results.hands.append(hand_result)
+        self.feature_histogram.observe(time.perf_counter() - start)
         return results
\ No newline at end of file
@@ -0,0 +1,262 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from threading import Lock
+from typing import Any, Optional
+
+import numpy as np
+
+from backend.utils.frame_context import FrameContext
+from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
+from backend.utils.shared_frame_ring import SharedFrameReader, SharedFrameRing
+
+# Result list and landmark attribute of the detections of each model
+LANDMARK_FIELDS = {
+    "drowsiness": ("faces", "face_landmark"),
+    "phone": ("detection", "body_landmark"),
+    "hands": ("hands", "hand_landmark"),
+}
+
+# Seconds between two checks that the model process is still alive while waiting for its answer
+POLL_INTERVAL = 0.5
+
+
+def model_processes_enabled(pipeline_settings) -> bool:
+    """
+    Whether the models run in model processes. They run the CPU engine there, so the Hailo models
+    always stay in the main process which owns the device.
+    """
+    if not pipeline_settings.process_models:
+        return False
+    if pipeline_settings.inference_engine == "hailo":
+        logging_default.warning("process_models is ignored with the hailo inference engine, the models run in the main process")
+        return False
+    return True
+
+def build_detector(model_name : str, inference_engine : str, camera_id : str = "default"):
+    """
+    Builds the detector of the model in the model process, with the settings loaded there.
+
+    Returns
+    -------
+    tuple
+        The detector and its detection method.
+    """
+    from backend.settings.detection_config import detection_settings
+    from backend.settings.model_config import model_settings
+
+    if model_name == "drowsiness":
+        from backend.lib.drowsiness_detection import DrowsinessDetection
+        detector = DrowsinessDetection(model_settings.face, detection_settings.drowsiness, inference_engine=inference_engine, camera_id=camera_id)
+        return detector, detector.detects
+    if model_name == "phone":
+        from backend.lib.phone_detection import PhoneDetection
+        detector = PhoneDetection(model_settings.pose, detection_settings.phone_detection, inference_engine=inference_engine, camera_id=camera_id)
+        return detector, detector.detect
+    if model_name == "hands":
+        from backend.lib.hands_detection import HandsDetection
+        detector = HandsDetection(model_settings.hands, inference_engine=inference_engine, camera_id=camera_id)
+        return detector, detector.detect
+    raise ValueError(f"Unknown model {model_name}")
+
+def compact_result(model_name : str, result : Any) -> Any:
+    """
+    Converts the landmarks of the result to float32 arrays, which are much cheaper to send back than
+    lists of tuples. The rest of the result is made of flags and scalars.
+    """
+    items_field, landmark_field = LANDMARK_FIELDS[model_name]
+    for item in getattr(result, items_field):
+        landmark = getattr(item, landmark_field)
+        if landmark is not None:
+            setattr(item, landmark_field, np.asarray(landmark, dtype=np.float32))
+    return result
+
+def model_process_main(model_name : str, inference_engine : str, connection : Connection, camera_id : str = "default"):
+    """
+    Loop of the model process: runs the model on the frames read from the shared frame ring and sends
+    the results back, until it is told to stop or the main process goes away.
+
+    The messages are tuples whose first item is the command:
+        ("frame", segment name, slot offset, shape, dtype, captured frame shape) -> ("result", result) or ("error", message)
+        ("config", detection config) -> ("ok", None)
+        ("stop",)
+    """
+    detector, detect = build_detector(model_name, inference_engine, camera_id)
+    reader = SharedFrameReader()
+    connection.send(("ready", None))
+
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+
+            command = message[0]
+            if command == "stop":
+                break
+            try:
+                if command == "frame":
+                    _, name, offset, shape, dtype, full_shape = message
+                    frame = reader.view(name, offset, shape, dtype)
+                    result = detect(frame, FrameContext(frame, full_shape=full_shape))
+                    del frame
+                    connection.send(("result", compact_result(model_name, result)))
+                elif command == "config":
+                    detector.reinitialize_configuration(message[1])
+                    connection.send(("ok", None))
+                else:
+                    connection.send(("error", f"Unknown command {command}"))
+            except Exception as e:
+                connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        reader.close()
+        connection.close()
+
+
+class ModelProcess:
+    """
+    Runs the detector of a model in a dedicated process, out of the GIL of the API and of the other
+    models, and stands for it in the detection service with the same `detect` interface.
+
+    The frames are passed through the frame ring of the camera: when several model processes get the same
+    frame context, the frame is written once in the ring and its slot is released with the context.
+    Only the compact result, landmarks and flags, comes back through the pipe.
+
+    Parameters
+    ----------
+    model_name : str
+        "drowsiness", "phone" or "hands".
+    ring : SharedFrameRing
+        The ring shared by the model processes of the camera.
+    inference_engine : str, optional
+        The engine the model runs on in the process (default is "cpu").
+    camera_id : str, optional
+        The camera whose frames the process runs on (default is "default").
+    """
+    def __init__(self, model_name : str, ring : SharedFrameRing, inference_engine : str = "cpu", camera_id : str = "default"):
+        self.model_name = model_name
+        self.camera_id = camera_id
+        self.ring = ring
+        self.lock = Lock()
+
+        self.roundtrip_histogram = metrics.histogram("model_process_roundtrip_seconds", model=model_name, camera=camera_id)
+
+        spawn_context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = spawn_context.Pipe()
+        self.process = spawn_context.Process(
+            target=model_process_main,
+            args=(model_name, inference_engine, child_connection, camera_id),
+            name=f"{model_name}-model-{camera_id}",
+            daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+
+        self.receive()
+        logging_default.info(f"Started the {model_name} model process of camera {camera_id} (pid {self.process.pid})")
+
+    def detect(self, frame : np.ndarray, context : Optional[FrameContext] = None) -> Any:
+        """
+        Runs the model on the frame in the model process.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            The frame to run the model on.
+        context : FrameContext, optional
+            The per frame memo of `frame`, the slot of the frame in the ring is memoized there.
+
+        Returns
+        -------
+        Any
+            The detection result of the model, without debug frame.
+        """
+        if context is not None:
+            name, slot, offset = context.get_or_compute("shared_frame_slot", lambda: self.ring.write(frame, owner=context))
+            self.ring.hold(name, slot)
+        else:
+            name, slot, offset = self.ring.write(frame)
+
+        try:
+            with self.lock, self.roundtrip_histogram.time():
+                full_shape = context.full_shape if context is not None else frame.shape
+                self.connection.send(("frame", name, offset, frame.shape, frame.dtype.str, full_shape))
+                return self.receive()
+        finally:
+            self.ring.release(name, slot)
+
+    # DrowsinessDetection names its detection method `detects`
+    detects = detect
+
+    def reinitialize_configuration(self, new_config : Any):
+        """Applies a new detection config to the detector in the model process."""
+        with self.lock:
+            self.connection.send(("config", new_config))
+            self.receive()
+
+    def receive(self) -> Any:
+        while not self.connection.poll(POLL_INTERVAL):
+            if not self.process.is_alive():
+                raise RuntimeError(f"The {self.model_name} model process exited with code {self.process.exitcode}")
+
+        status, payload = self.connection.recv()
+        if status == "error":
+            raise RuntimeError(f"The {self.model_name} model process failed: {payload}")
+        return payload
+
+    def close(self, timeout : float = 2.0):
+        """Stops the model process."""
+        with self.lock:
+            try:
+                self.connection.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.connection.close()
+
+
+class ModelProcessPool:
+    """
+    The model processes of the application, started on demand by the detection services, and the
+    frame ring of each camera they read the frames from.
+
+    The detectors keep the state of the driver a camera watches between frames, so every camera
+    gets its own model processes.
+
+    Parameters
+    ----------
+    slot_count : int, optional
+        Number of frame slots of the ring of a camera, one for the frame being processed plus one per
+        model left busy on an older frame (default is 4).
+    """
+    def __init__(self, slot_count : int = 4):
+        self.slot_count = slot_count
+        self.rings : dict[str, SharedFrameRing] = {}
+        self.processes : dict[tuple[str, str], ModelProcess] = {}
+        self.lock = Lock()
+
+    def get(self, model_name : str, inference_engine : str = "cpu", camera_id : str = "default") -> ModelProcess:
+        """Returns the process of the model for the camera, started on the first call."""
+        with self.lock:
+            key = (model_name, camera_id)
+            if key not in self.processes:
+                ring = self.rings.setdefault(camera_id, SharedFrameRing(self.slot_count))
+                self.processes[key] = ModelProcess(model_name, ring, inference_engine, camera_id)
+            return self.processes[key]
+
+    def close(self):
+        """Stops the model processes and frees the frame rings."""
+        with self.lock:
+            for process in self.processes.values():
+                process.close()
+            self.processes.clear()
+            for ring in self.rings.values():
+                ring.close()
+            self.rings.clear()
+
+
+# The model processes shared by the detection services
+model_processes = ModelProcessPool()
@@ -1,4 +1,6 @@
 import math
+import time
+from typing import Optional
 
 import numpy as np
 
@@ -6,17 +8,25 @@ from backend.domain.dto.phone_detection_result import PhoneDetectionResult, Phon
 from backend.models.factory_model import get_body_pose_model
 from backend.settings.detection_config import PhoneDetectionConfig
 from backend.settings.model_config import PoseConfig
+from backend.utils.frame_context import FrameContext
 from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
 
 
 class PhoneDetection():
-    def __init__(self, model_settings : PoseConfig, detection_settings : PhoneDetectionConfig, inference_engine : str = None):
+    def __init__(self, model_settings : PoseConfig, detection_settings : PhoneDetectionConfig, inference_engine : str = None, camera_id : str = "default"):
         
         # Load Configurations
         self.load_configuration(detection_settings)
 
         self.model = get_body_pose_model(model_settings, inference_engine)
 
+        # Timings published at /metrics, per camera as each camera has its own detector
+        self.preprocess_histogram = metrics.histogram("model_preprocess_seconds", model="pose", camera=camera_id)
+        self.inference_histogram = metrics.histogram("model_inference_seconds", model="pose", camera=camera_id)
+        self.feature_histogram = metrics.histogram("feature_extraction_seconds", model="pose", camera=camera_id)
+        self.invocation_counter = metrics.counter("model_invocations_total", model="pose", camera=camera_id)
+
         # Landmarks (for now hardcoded)
         self.right_hand_landmark = [16, 22, 20, 18]
         self.left_hand_landmark = [15, 21, 19, 17]
@@ -55,7 +65,7 @@ class PhoneDetection():
         )
         return
 
-    def detect_body_pose(self, image : np.ndarray) -> list:
+    def detect_body_pose(self, image : np.ndarray, context : Optional[FrameContext] = None) -> list:
         """
         This function is to process an RGB image and
         returns body pose landmarks on each person captured in the frame
@@ -64,6 +74,8 @@ class PhoneDetection():
         ----------
         image : np.ndarray
             The image frame of which want to get the body landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, the model preprocessing is looked up there
 
         Return
         ----------
@@ -80,8 +92,11 @@ class PhoneDetection():
                 ]
             ```
         """
-        preprocess_image = self.model.preprocess(image)
-        pose_landmark = self.model.inference(preprocess_image)
+        with self.preprocess_histogram.time():
+            preprocess_image = self.model.preprocess(image, context)
+        with self.inference_histogram.time():
+            pose_landmark = self.model.inference(preprocess_image, context=context)
+        self.invocation_counter.inc()
         return pose_landmark
     
     def detect_phone_usage(self, pose_landmark, frame_width : int = 640, frame_height : int = 480, threshold : int = 150):
@@ -152,22 +167,26 @@ class PhoneDetection():
         """
         return math.sqrt((point1[0] - point2[0]) ** 2 + (point1[1] - point2[1]) ** 2)
     
-    def detect(self, original_frame : np.ndarray) -> PhoneDetectionResult:
+    def detect(self, original_frame : np.ndarray, context : Optional[FrameContext] = None) -> PhoneDetectionResult:
         """
-        Calculating the result of the detection and draw the results
+        Calculating the result of the detection and draw the results, the preprocessing is shared
+        through the per frame `context` of `original_frame` if given
         """
         results = PhoneDetectionResult()
 
         # Get the landmarks for the body
-        body_landmark = self.detect_body_pose(original_frame)
+        body_landmark = self.detect_body_pose(original_frame, context)
 
         # Phone usage detection feature get from pose information
+        start = time.perf_counter()
         if body_landmark:
             phone_result = PhoneState()
             phone_result.body_landmark = body_landmark
 
+            # The distance threshold is in pixels of the captured frame, the models may get a downscaled one
+            frame_height, frame_width = (context.full_shape if context is not None else original_frame.shape)[:2]
             is_calling, distance = self.detect_phone_usage(
-                body_landmark, original_frame.shape[1], original_frame.shape[0], self.distance_threshold
+                body_landmark, frame_width, frame_height, self.distance_threshold
             )
 
             if is_calling:
@@ -178,6 +197,7 @@ class PhoneDetection():
 
             # Drawing the result
             results.detection.append(phone_result)
+        self.feature_histogram.observe(time.perf_counter() - start)
         return results
 
 
@@ -9,6 +9,7 @@ from websockets.sync.client import connect
 
 from backend.settings.app_config import ApiSettings
 from backend.utils.logging import logging_default
+from backend.utils.metrics import timed
 
 
 class SocketTrigger:
@@ -72,10 +73,11 @@ class SocketTrigger:
             os.makedirs(self.image_event_path, exist_ok=True)
 
             # Save the file in the local system
-            cv2.imwrite(f"{self.image_event_path}/{image_uuid}.jpg", image)
+            with timed("event_image_save_seconds"):
+                cv2.imwrite(f"{self.image_event_path}/{image_uuid}.jpg", image)
 
             if self.send_to_server:
-                with connect(self.ws_url) as websocket: 
+                with timed("event_upload_seconds"), connect(self.ws_url) as websocket:
                     with open(f"{self.image_event_path}/{image_uuid}.jpg", "rb") as image_file:
                         encoded_string = base64.b64encode(image_file.read())
                         json_data = {
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod #Helper class that you inherit from to make your class an Abstract Base Class
 
+from typing import Optional
+
 import cv2 #Popular Tool for computer vision tasks
 
+from backend.utils.frame_context import FrameContext
+
 
 class BaseModelInference(ABC):
     """
@@ -25,7 +29,7 @@ class BaseModelInference(ABC):
         pass
 
     @abstractmethod
-    def preprocess(self, image: cv2.Mat) -> cv2.Mat: #Designed to take a raw image (image: cv2.Mat) and prepare it for the model (->cv2.Mat)
+    def preprocess(self, image: cv2.Mat, context : Optional[FrameContext] = None) -> cv2.Mat: #Designed to take a raw image (image: cv2.Mat) and prepare it for the model (->cv2.Mat)
         """
         Custom preprocess function the input frame for inference if needed.
         
@@ -33,6 +37,9 @@ class BaseModelInference(ABC):
         ----------
         image : cv2.Mat
             The image that will be inputted to the model in form of cv2 array format
+        context : FrameContext, optional
+            The per frame memo of `image`, when given the preprocessed image should be looked up
+            there so the models run on the same frame share it
 
         Return
         ----------
@@ -41,7 +48,7 @@ class BaseModelInference(ABC):
         pass
 
     @abstractmethod
-    def inference(self, image: cv2.Mat, preprocessed : bool = True): #Core predicition step where it takes an image and a boolean flag preprocessed
+    def inference(self, image: cv2.Mat, preprocessed : bool = True, context : Optional[FrameContext] = None): #Core predicition step where it takes an image and a boolean flag preprocessed
         """
         Performing inference of the model to detect landmarks (e.g., face, hand, pose) based on the provided model.
 
@@ -55,6 +62,8 @@ class BaseModelInference(ABC):
         preprocessed : bool
             Flag to tell the function does the image need to be preprocess or not, if it False then the image will be inputted to the inference stage first
             before going to do prediction/inference stage, if it's True is otherwise
+        context : FrameContext, optional
+            The per frame memo of the original frame, for the models deriving more than one input from it
 
         Return
         ----------
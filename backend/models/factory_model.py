@@ -1,4 +1,5 @@
-import os #Used to check the current operating system
+import os  #Used to check the current operating system
+
 #from back.setttings....: These lines import config classes
 from backend.settings.detection_config import PhoneDetectionConfig
 from backend.settings.model_config import FaceMeshConfig, HandsConfig
@@ -21,20 +22,21 @@ def get_face_model(config : FaceMeshConfig, inference_engine : str): #Takes a co
         )
         return MediapipeFaceMeshModel(config)
     try: #Main selection logic for non-Windows systems
-    """    
-    Function:
-
-1. It first checks if the user explicitly requested the "hailo" engine. If so, it tries to import and return the hardware-accelerated BlazeFacePipeline.
-
-2. If the engine is not "hailo" or if the if condition is passed, it falls back to importing and returning the standard MediapipeFaceMeshModel.
-
-3. If any error occurs during this process (e.g., the Hailo library is missing), the except block catches it and returns the safe MediapipeFaceMeshModel as a final fallback.
-     """  
+        # Function:
+        # 1. It first checks if the user explicitly requested the "hailo" engine. If so, it tries to import and return the hardware-accelerated BlazeFacePipeline.
+        # 2. If the engine is not "hailo" or if the if condition is passed, it falls back to importing and returning the standard MediapipeFaceMeshModel.
+        # 3. If any error occurs during this process (e.g., the Hailo library is missing), the except block catches it and returns the safe MediapipeFaceMeshModel as a final fallback.
         if inference_engine == "hailo":
             from backend.models.hailo.blaze_model.face_mesh.blaze_face_pipeline import (
                 BlazeFacePipeline,
             )
-            return BlazeFacePipeline(hailo_inference_engine)
+            # Track the faces from their landmarks between two detections, unless every frame is a static image
+            return BlazeFacePipeline(
+                hailo_inference_engine,
+                landmarks_as_array=True,
+                redetection_interval=0 if config.static_image_mode else config.redetection_interval,
+                min_tracking_confidence=config.min_tracking_confidence
+            )
         
         from backend.models.mediapipe_wrappers.mediapipe_face_model import (
             MediapipeFaceMeshModel,
@@ -77,7 +79,12 @@ def get_hands_pose_model(config : HandsConfig, inference_engine : str): #follows
             from backend.models.hailo.blaze_model.hands.blaze_hands_pipeline import (
                 BlazeHandsPipeline,
             )
-            return BlazeHandsPipeline(hailo_inference_engine)
+            return BlazeHandsPipeline(
+                hailo_inference_engine,
+                landmarks_as_array=True,
+                redetection_interval=config.redetection_interval,
+                min_tracking_confidence=config.min_tracking_confidence
+            )
 
         from backend.models.mediapipe_wrappers.mediapipe_hands_model import (
             MediapipeHandsModel,
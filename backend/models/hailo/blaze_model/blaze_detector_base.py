@@ -1,11 +1,17 @@
+import os
+from typing import Optional
+
 import cv2
 import numpy as np
 
-from backend.models.hailo.blaze_model.box_utils import (
-    calculate_scale,
-    overlap_similarity,
+from backend.models.hailo.blaze_model.box_utils import calculate_scale
+from backend.models.hailo.blaze_model.utils import (
+    get_anchor_options,
+    get_anchors_cache_path,
+    get_model_config,
 )
-from backend.models.hailo.blaze_model.utils import get_anchor_options, get_model_config
+from backend.utils.frame_context import FrameContext
+from backend.utils.logging import logging_default
 
 
 class BlazeDetectorBase():
@@ -37,7 +43,7 @@ class BlazeDetectorBase():
         """
         # Generate the anchors
         self.anchors_options = get_anchor_options(anchors_config)
-        self.anchors = self.generate_detector_anchors(self.anchors_options)
+        self.anchors = self.load_detector_anchors(anchors_config, self.anchors_options)
 
         # Get the configs of the model
         self.config = get_model_config(inference_config)
@@ -102,8 +108,6 @@ class BlazeDetectorBase():
         anchors = []
         layer_id = 0
         while layer_id < strides_size:
-            anchor_height = []
-            anchor_width = []
             aspect_ratios = []
             scales = []
 
@@ -140,37 +144,81 @@ class BlazeDetectorBase():
 
                 last_same_stride_layer += 1
 
-            for i in range(len(aspect_ratios)):
-                ratio_sqrts = np.sqrt(aspect_ratios[i])
-                anchor_height.append(scales[i] / ratio_sqrts)
-                anchor_width.append(scales[i] * ratio_sqrts)            
+            anchor_height = np.asarray(scales) / np.sqrt(aspect_ratios)
+            anchor_width = np.asarray(scales) * np.sqrt(aspect_ratios)
                 
             stride = options["strides"][layer_id]
             feature_map_height = int(np.ceil(options["input_size_height"] / stride))
             feature_map_width = int(np.ceil(options["input_size_width"] / stride))
 
-            for y in range(feature_map_height):
-                for x in range(feature_map_width):
-                    for anchor_id in range(len(anchor_height)):
-                        x_center = (x + options["anchor_offset_x"]) / feature_map_width
-                        y_center = (y + options["anchor_offset_y"]) / feature_map_height
-
-                        new_anchor = [x_center, y_center, 0, 0]
-                        if options["fixed_anchor_size"]:
-                            new_anchor[2] = 1.0
-                            new_anchor[3] = 1.0
-                        else:
-                            new_anchor[2] = anchor_width[anchor_id]
-                            new_anchor[3] = anchor_height[anchor_id]
-                        anchors.append(new_anchor)
+            # Every (y, x) cell of the feature map gets all the anchors of the layer, ordered
+            # by y, then x, then anchor id
+            y, x = np.meshgrid(np.arange(feature_map_height), np.arange(feature_map_width), indexing="ij")
+            x_center = (x + options["anchor_offset_x"]) / feature_map_width
+            y_center = (y + options["anchor_offset_y"]) / feature_map_height
+
+            layer_anchors = np.empty((feature_map_height, feature_map_width, len(anchor_height), 4))
+            layer_anchors[..., 0] = x_center[..., np.newaxis]
+            layer_anchors[..., 1] = y_center[..., np.newaxis]
+            if options["fixed_anchor_size"]:
+                layer_anchors[..., 2] = 1.0
+                layer_anchors[..., 3] = 1.0
+            else:
+                layer_anchors[..., 2] = anchor_width
+                layer_anchors[..., 3] = anchor_height
+            anchors.append(layer_anchors.reshape(-1, 4))
 
             layer_id = last_same_stride_layer
 
-        anchors = np.asarray(anchors)
+        anchors = np.concatenate(anchors, axis=0)
+
+        return anchors
+
+    def load_detector_anchors(self, anchors_config : str, options : dict) -> np.ndarray:
+        """
+        Loads the anchors from the on-disk cache next to the anchors config, or generates them
+        with `generate_detector_anchors` and saves them to the cache for the next start.
+
+        The cache file name holds a hash of the anchors options, so changing the options in the
+        config will never load stale anchors. The cache is loaded as a read only memory map.
+
+        Parameters
+        ----------
+        anchors_config : str
+            The config path on the model anchors
+        options : dict
+            The anchors options loaded from `anchors_config`
+
+        Returns
+        -------
+        anchors : np.ndarray
+            A NumPy array of shape (N, 4), same as `generate_detector_anchors`.
+        """
+        cache_path = get_anchors_cache_path(anchors_config, options)
+        if os.path.exists(cache_path):
+            try:
+                anchors = np.load(cache_path, mmap_mode="r")
+                if anchors.ndim == 2 and anchors.shape[1] == 4:
+                    return anchors
+                logging_default.warning(f"Ignoring anchors cache {cache_path} with shape {anchors.shape}")
+            except (OSError, ValueError) as e:
+                logging_default.warning(f"Failed to load anchors cache {cache_path}: {e}")
+
+        anchors = self.generate_detector_anchors(options)
+
+        # Write to a temporary file first so a crash while saving never leaves a corrupted cache
+        try:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, anchors)
+            os.replace(tmp_path, cache_path)
+            logging_default.info(f"Saved anchors cache to {cache_path}")
+        except OSError as e:
+            logging_default.warning(f"Failed to save anchors cache {cache_path}: {e}")
 
         return anchors
 
-    def resize_pad(self, img : np.ndarray) -> tuple[np.ndarray, float, tuple[int, int]]:
+    def resize_pad(self, img : np.ndarray, context : Optional[FrameContext] = None) -> tuple[np.ndarray, float, tuple[int, int]]:
         """
         resize and pad images to be input to the detectors
 
@@ -182,6 +230,8 @@ class BlazeDetectorBase():
         ----------
         img : np.ndarray
             The image of the frame or want to be padded
+        context : FrameContext, optional
+            The per frame memo of `img` (its RGB image), the resized image is looked up there
 
         Returns
         ----------
@@ -211,7 +261,7 @@ class BlazeDetectorBase():
         padh2 = padh//2 + padh % 2
         padw1 = padw//2
         padw2 = padw//2 + padw % 2
-        img = cv2.resize(img, (w1, h1))
+        img = context.resized(w1, h1) if context is not None else cv2.resize(img, (w1, h1))
         img = np.pad(img, ((padh1, padh2), (padw1, padw2), (0, 0)), mode='constant')
         pad = (int(padh1 * scale), int(padw1 * scale))
         return img, scale, pad
@@ -361,26 +411,26 @@ class BlazeDetectorBase():
             (num_detections, 13). Each row corresponds to a detected object and includes:
             bounding box coordinates, 5 keypoints (x, y), and a detection score.
         """        
-        detection_boxes = self.decode_boxes(raw_box_tensor, anchors)
-
+        # Score first: clip, sigmoid and threshold the scores before decoding anything, so only
+        # the handful of anchors that pass `min_score_thresh` get their boxes decoded
         thresh = self.score_clipping_thresh
-        clipped_score_tensor = np.clip(raw_score_tensor,-thresh,thresh)
+        raw_score_tensor = np.asarray(raw_score_tensor, dtype=np.float32)
+        clipped_score_tensor = np.clip(raw_score_tensor[..., 0], -thresh, thresh)
 
-        detection_scores = 1/(1 + np.exp(-clipped_score_tensor))
-        detection_scores = np.squeeze(detection_scores, axis=-1)        
-       
         # Note: we stripped off the last dimension from the scores tensor
         # because there is only has one class. Now we can simply use a mask
         # to filter out the boxes with too low confidence.
+        detection_scores = 1/(1 + np.exp(-clipped_score_tensor))
         mask = detection_scores >= self.min_score_thresh
 
         # Because each image from the batch can have a different number of
         # detections, process them one at a time using a loop.
         output_detections = []
         for i in range(raw_box_tensor.shape[0]):
-            boxes = detection_boxes[i, mask[i]]
+            indexes = np.flatnonzero(mask[i])
+            boxes = self.decode_boxes(raw_box_tensor[i, indexes], anchors[indexes])
 
-            scores = detection_scores[i, mask[i]]
+            scores = detection_scores[i, indexes]
             scores = np.expand_dims(scores,axis=-1) 
 
             boxes_scores = np.concatenate((boxes,scores),axis=-1)
@@ -412,12 +462,14 @@ class BlazeDetectorBase():
         Returns
         -------
         boxes : np.ndarray
-            Array of the same shape as `raw_boxes`, with decoded coordinates:
+            Float32 array of the same shape as `raw_boxes`, with decoded coordinates:
                 - boxes[..., 0:4] contain [ymin, xmin, ymax, xmax]
                 - boxes[..., 4:] contain decoded keypoint (x, y) positions
                 for `num_keypoints`
         """
-        boxes = np.zeros( raw_boxes.shape )
+        raw_boxes = np.asarray(raw_boxes, dtype=np.float32)
+        anchors = np.asarray(anchors, dtype=np.float32)
+        boxes = np.zeros(raw_boxes.shape, dtype=np.float32)
 
         x_center = raw_boxes[..., 0] / self.x_scale * anchors[:, 2] + anchors[:, 0]
         y_center = raw_boxes[..., 1] / self.y_scale * anchors[:, 3] + anchors[:, 1]
@@ -430,16 +482,16 @@ class BlazeDetectorBase():
         boxes[..., 2] = y_center + h / 2.  # ymax
         boxes[..., 3] = x_center + w / 2.  # xmax
 
-        for k in range(self.num_keypoints):
-            offset = 4 + k*2
-            keypoint_x = raw_boxes[..., offset    ] / self.x_scale * anchors[:, 2] + anchors[:, 0]
-            keypoint_y = raw_boxes[..., offset + 1] / self.y_scale * anchors[:, 3] + anchors[:, 1]
-            boxes[..., offset    ] = keypoint_x
-            boxes[..., offset + 1] = keypoint_y
+        # Decode all the keypoints at once as (..., num_anchors, num_keypoints, [x, y])
+        keypoints_end = 4 + self.num_keypoints * 2
+        keypoints = raw_boxes[..., 4:keypoints_end].reshape(*raw_boxes.shape[:-1], self.num_keypoints, 2)
+        keypoints_scale = np.array([self.x_scale, self.y_scale], dtype=np.float32)
+        keypoints = keypoints / keypoints_scale * anchors[:, np.newaxis, 2:4] + anchors[:, np.newaxis, 0:2]
+        boxes[..., 4:keypoints_end] = keypoints.reshape(*raw_boxes.shape[:-1], self.num_keypoints * 2)
 
         return boxes
 
-    def weighted_non_max_suppression(self, detections : np.ndarray) -> list:
+    def weighted_non_max_suppression(self, detections : np.ndarray) -> np.ndarray:
         """
         The alternative NMS method as mentioned in the [BlazeFace paper](https://arxiv.org/pdf/1907.05047):
 
@@ -451,9 +503,10 @@ class BlazeDetectorBase():
         detection to the weighted detection, but we take the average score
         of the overlapping detections.
 
-        The input detections should be a Tensor of shape (count, 17).
-        Returns a list of PyTorch tensors, one for each detected face.
-        
+        The box coordinates and areas of the sorted detections are computed once, the
+        greedy clustering then computes a single IoU row per cluster leader, and each
+        cluster is blended from a contiguous slice of the detections grouped by cluster.
+
         Notes
         ----------
         This is based on the source code from:
@@ -467,47 +520,68 @@ class BlazeDetectorBase():
 
         Returns
         -------
-        List[torch.Tensor]
-            A list of PyTorch tensors, each representing a single, blended detection
-            after applying weighted non-maximum suppression. Each tensor has shape (17,)
-            and maintains the same format as the input detections.
+        np.ndarray
+            An array of shape (M, 17), one blended detection per row, from the most to
+            the least confident cluster, in the same format as the input detections.
         """
-        if len(detections) == 0: 
-           return []
-
-        output_detections = []
+        if len(detections) == 0:
+            return detections[:0]
 
         # Sort the detections from highest to lowest score.
         # argsort() returns ascending order, therefore read the array from end
-        remaining = np.argsort(detections[:, self.num_coords])[::-1]    
-
-        while len(remaining) > 0:
-            detection = detections[remaining[0]]
-
-            # Compute the overlap between the first box and the other 
-            # remaining boxes. (Note that the other_boxes also include
-            # the first_box.)
-            first_box = detection[:4]
-            other_boxes = detections[remaining, :4]
-            ious = overlap_similarity(first_box, other_boxes)
+        order = np.argsort(detections[:, self.num_coords])[::-1]
+        sorted_detections = detections[order]
+
+        # Columns and areas of the boxes, so the IoU of a leader with every
+        # other box is a single vectorized pass.
+        ymin, xmin, ymax, xmax = (np.ascontiguousarray(sorted_detections[:, i]) for i in range(4))
+        areas = (ymax - ymin) * (xmax - xmin)
+
+        # Greedy clustering: the most confident unassigned detection takes every
+        # unassigned detection overlapping it.
+        num_detections = len(sorted_detections)
+        cluster_ids = np.empty(num_detections, dtype=np.intp)
+        unassigned = np.ones(num_detections, dtype=bool)
+        leaders = []
+        while True:
+            leader = int(np.argmax(unassigned))
+            if not unassigned[leader]:
+                break
+
+            inter_h = np.minimum(ymax[leader], ymax)
+            inter_h -= np.maximum(ymin[leader], ymin)
+            np.maximum(inter_h, 0, out=inter_h)
+            inter_w = np.minimum(xmax[leader], xmax)
+            inter_w -= np.maximum(xmin[leader], xmin)
+            np.maximum(inter_w, 0, out=inter_w)
+            inter_h *= inter_w
+            ious = inter_h / (areas[leader] + areas - inter_h)
 
             # If two detections don't overlap enough, they are considered
             # to be from different faces.
-            mask = ious > self.min_suppression_threshold
-            overlapping = remaining[mask]
-            remaining = remaining[~mask]
-
-            # Take an average of the coordinates from the overlapping
-            # detections, weighted by their confidence scores.
-            weighted_detection = detection.copy()
-            if len(overlapping) > 1:
-                coordinates = detections[overlapping, :self.num_coords]
-                scores = detections[overlapping, self.num_coords:self.num_coords+1]
-                total_score = scores.sum()
-                weighted = np.sum(coordinates * scores, axis=0) / total_score
-                weighted_detection[:self.num_coords] = weighted
-                weighted_detection[self.num_coords] = total_score / len(overlapping)
-
-            output_detections.append(weighted_detection)
-
-        return output_detections   
\ No newline at end of file
+            members = (ious > self.min_suppression_threshold) & unassigned
+            members[leader] = True
+            cluster_ids[members] = len(leaders)
+            unassigned &= ~members
+            leaders.append(leader)
+
+        # Group the members by cluster, the stable sort keeps them from the
+        # highest to the lowest score inside a cluster.
+        grouped = sorted_detections[np.argsort(cluster_ids, kind="stable")]
+        cluster_sizes = np.bincount(cluster_ids, minlength=len(leaders))
+        cluster_ends = np.cumsum(cluster_sizes)
+
+        # A single detection cluster is its own leader, only the others are blended.
+        # Take an average of the coordinates from the overlapping
+        # detections, weighted by their confidence scores.
+        output_detections = sorted_detections[leaders]
+        for cluster in np.flatnonzero(cluster_sizes > 1):
+            end = cluster_ends[cluster]
+            start = end - cluster_sizes[cluster]
+            coordinates = grouped[start:end, :self.num_coords]
+            scores = grouped[start:end, self.num_coords:self.num_coords+1]
+            total_score = scores.sum()
+            output_detections[cluster, :self.num_coords] = np.sum(coordinates * scores, axis=0) / total_score
+            output_detections[cluster, self.num_coords] = total_score / cluster_sizes[cluster]
+
+        return output_detections
@@ -17,11 +17,54 @@ class BlazeLandmarkBase():
 
     def __init__(self):
         super(BlazeLandmarkBase, self).__init__()
-        
+
+        # Landmarks to ROI parameters, set by the subclasses (same meaning as the detectors ones)
+        self.roi_kp1 = 0
+        self.roi_kp2 = 1
+        self.roi_theta0 = 0.0
+        self.roi_dscale = 1.0
+        self.roi_dy = 0.0
+        self.roi_landmark_indices = None
+
+        # Preallocated uint8 batch of ROIs, grown when a frame has more ROIs than it can hold
+        self.roi_buffer = None
+
+    def get_roi_buffer(self, nb_rois : int, dtype : np.dtype) -> np.ndarray:
+        """
+        Returns the preallocated ROI batch buffer, reallocated only when it is too small
+        or when the frame dtype changes.
+
+        Parameters
+        ----------
+        nb_rois : int
+            Number of ROIs the buffer must hold.
+        dtype : np.dtype
+            The dtype of the frame the ROIs are extracted from.
+
+        Returns
+        -------
+        np.ndarray
+            Buffer of shape (M, res, res, 3) with M >= nb_rois.
+        """
+        res = self.resolution
+        if self.roi_buffer is None or self.roi_buffer.shape[0] < nb_rois \
+            or self.roi_buffer.shape[1] != res or self.roi_buffer.dtype != dtype:
+            self.roi_buffer = np.empty((max(nb_rois, 1), res, res, 3), dtype=dtype)
+        return self.roi_buffer
+
     def extract_roi(self, frame: np.ndarray, xc: np.ndarray, yc: np.ndarray, theta: np.ndarray, scale: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Extracts aligned regions of interest (ROI) from the input image using the given bounding box parameters.
 
+        The forward and inverse affine matrices of every ROI are computed in closed form from the
+        rotation, scale and center, and the crops are warped directly into a preallocated batch
+        buffer in the frame dtype (uint8 for camera frames), ready for the landmark model.
+
+        Notes
+        ----------
+        The returned images are a view of the ROI buffer of the model, they are overwritten by the
+        next call to `extract_roi`.
+
         Parameters
         ----------
         frame : np.ndarray
@@ -38,52 +81,37 @@ class BlazeLandmarkBase():
         Returns
         -------
         imgs : np.ndarray
-            Aligned ROI images of shape (N, H, W, 3), where H = W = self.resolution.
+            Aligned ROI images of shape (N, H, W, 3), where H = W = self.resolution, in the frame dtype.
         affines : np.ndarray
             The affine transformation matrices used to map landmarks back (N, 2, 3).
         points : np.ndarray
             The transformed corner points of the ROI boxes (N, 2, 4).
         """
+        res = self.resolution
+        nb_rois = theta.shape[0]
 
-        # Assuming scale is a NumPy array of size [N]
-        scaleN = scale.reshape(-1, 1, 1).astype(np.float32)
-
-        # Define points
-        points = np.array([[-1, -1, 1, 1], [-1, 1, -1, 1]], dtype=np.float32)
-
-        # Element-wise multiplication
-        points = points * scaleN / 2
-        points = points.astype(np.float32)
+        # Rotation matrices of shape (N, 2, 2), in float64 so the crops don't shift by float32 rounding
+        cos = np.cos(theta).astype(np.float64)
+        sin = np.sin(theta).astype(np.float64)
+        R = np.stack((np.stack((cos, -sin), axis=-1), np.stack((sin, cos), axis=-1)), axis=-2)
 
-        R = np.zeros((theta.shape[0],2,2),dtype=np.float32)
-        for i in range (theta.shape[0]):
-            R[i,:,:] = [[np.cos(theta[i]), -np.sin(theta[i])], [np.sin(theta[i]), np.cos(theta[i])]]
+        center = np.column_stack((xc, yc)).astype(np.float64)[:, :, np.newaxis]
+        half_size = scale.reshape(-1, 1, 1).astype(np.float64) / 2
 
-        center = np.column_stack((xc, yc))
-        center = np.expand_dims(center, axis=-1)
+        # Corners of the ROI boxes
+        points = np.array([[-1, -1, 1, 1], [-1, 1, -1, 1]], dtype=np.float64)
+        points = (np.matmul(R, points * half_size) + center).astype(np.float32)
 
-        points = np.matmul(R, points) + center
-        points = points.astype(np.float32)
+        # The ROI maps the box corners to the crop corners, ROI = k * (R^T (p - c) + s/2),
+        # and back p = R (ROI / k - s/2) + c, with k = (res - 1) / s.
+        k = (res - 1) / (2 * half_size)
+        Rt = np.swapaxes(R, 1, 2)
+        M = np.concatenate((k * Rt, k * (half_size - np.matmul(Rt, center))), axis=-1)
+        affines = np.concatenate((R / k, center - np.matmul(R, np.repeat(half_size, 2, axis=1))), axis=-1).astype(np.float32)
 
-        res = self.resolution
-        points1 = np.array([[0, 0], [0, res-1], [res-1, 0]], dtype=np.float32)
-
-        affines = []
-        imgs = []
-        for i in range(points.shape[0]):
-            pts = points[i,:,:3].T
-            M = cv2.getAffineTransform(pts, points1)
-            img = cv2.warpAffine(frame, M, (res, res))  # No borderValue in NumPy
-            img = img.astype('float32') / 255.0
-            imgs.append(img)
-            affine = cv2.invertAffineTransform(M).astype('float32')
-            affines.append(affine)
-        if imgs:
-            imgs = np.stack(imgs).astype('float32')
-            affines = np.stack(affines).astype('float32')
-        else:
-            imgs = np.zeros((0, 3, res, res), dtype='float32')
-            affines = np.zeros((0, 2, 3), dtype='float32')
+        imgs = self.get_roi_buffer(nb_rois, frame.dtype)[:nb_rois]
+        for i in range(nb_rois):
+            cv2.warpAffine(frame, M[i], (res, res), dst=imgs[i])
 
         return imgs, affines, points
 
@@ -104,12 +132,66 @@ class BlazeLandmarkBase():
             Denormalized landmark coordinates in original image space, same shape as input.
         """
         landmarks[:,:,:2] *= self.resolution
-        for i in range(len(landmarks)):
-            landmark, affine = landmarks[i], affines[i]
-            landmark = (affine[:,:2] @ landmark[:,:2].T + affine[:,2:]).T
-            landmarks[i,:,:2] = landmark
+
+        # All the ROIs at once, p' = A p + t for every landmark
+        landmarks[:,:,:2] = np.einsum("nij,nkj->nki", affines[:,:,:2], landmarks[:,:,:2]) + affines[:,np.newaxis,:,2]
         return landmarks
 
+    def landmarks2roi(self, landmarks : np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert the landmarks of the previous frame to the oriented ROI of the next frame, so
+        the detector can be skipped while the object is tracked. Rotation is calculated from the
+        vector between the landmarks kp1 and kp2 relative to theta0, the box is the bounding box
+        of the landmarks aligned with that rotation, made square, shifted by dy and scaled by dscale.
+
+        Notes
+        ---------
+        Adapted from:
+         - mediapipe/calculators/util/landmarks_to_detection_calculator.cc
+         - mediapipe/calculators/util/rect_transformation_calculator.cc
+
+        Parameters
+        ----------
+        landmarks : np.ndarray
+            Denormalized landmark coordinates in original image space of shape (N, K, 2 or 3).
+
+        Returns
+        -------
+        xc : np.ndarray, shape (N,)
+            x-coordinate of the ROI center for each object.
+        yc : np.ndarray, shape (N,)
+            y-coordinate of the ROI center for each object.
+        scale : np.ndarray, shape (N,)
+            Scale (size) of the ROI.
+        theta : np.ndarray, shape (N,)
+            Rotation angle (in radians) of the ROI.
+        """
+        points = landmarks[:, :, :2].astype(np.float64)
+        x0, y0 = points[:, self.roi_kp1, 0], points[:, self.roi_kp1, 1]
+        x1, y1 = points[:, self.roi_kp2, 0], points[:, self.roi_kp2, 1]
+        theta = np.arctan2(y0-y1, x0-x1) - self.roi_theta0
+
+        if self.roi_landmark_indices is not None:
+            points = points[:, self.roi_landmark_indices]
+
+        # Bounding box in the ROI frame, u = R^T p
+        cos = np.cos(theta)[:, np.newaxis]
+        sin = np.sin(theta)[:, np.newaxis]
+        u = cos * points[:, :, 0] + sin * points[:, :, 1]
+        v = -sin * points[:, :, 0] + cos * points[:, :, 1]
+        uc = (u.min(axis=1) + u.max(axis=1)) / 2
+        vc = (v.min(axis=1) + v.max(axis=1)) / 2
+        scale = np.maximum(u.max(axis=1) - u.min(axis=1), v.max(axis=1) - v.min(axis=1))
+
+        # Back to the image, p = R u, with the shift along the ROI y axis
+        vc += self.roi_dy * scale
+        cos, sin = cos[:, 0], sin[:, 0]
+        xc = cos * uc - sin * vc
+        yc = sin * uc + cos * vc
+        scale *= self.roi_dscale
+
+        return xc, yc, scale, theta
+
     def normalized_landmark_to_orginal_image_space(self, landmarks: np.ndarray, image_shape : np.ndarray) -> np.ndarray:
         """
         Normalized coordinate in original image space into a Mediapipe normalized output [0,1]
@@ -128,9 +210,44 @@ class BlazeLandmarkBase():
         """
         H, W = image_shape[:2]
 
-        normalized_landmarks = landmarks.copy()
-        for i in range(len(normalized_landmarks)):
-            normalized_landmarks[i, :, 0] /= W
-            normalized_landmarks[i, :, 1] /= H
+        # Divide x by the width and y by the height, leave z (if any) as is
+        image_size = np.ones(landmarks.shape[-1], dtype=landmarks.dtype)
+        image_size[:2] = W, H
+        return landmarks / image_size
+
+    def run_batch_inference(self, image: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Runs the landmark model on every ROI of a frame in a single inference submission, instead of
+        one submission per ROI. When the compiled model has a fixed batch size, the ROIs are sent in
+        chunks of that size and the last chunk is zero padded to fill the batch.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Batched ROI images of shape (N, H, W, 3), already in the model input format.
 
-        return normalized_landmarks
\ No newline at end of file
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Output of the model keyed by the output vstream name, each of shape (N, ...).
+        """
+        nb_images = image.shape[0]
+        batch_size = self.engine.get_batch_size(self.hef_id)
+        if batch_size <= 0 or batch_size == nb_images:
+            return self.engine.run_all(image, self.hef_id)
+
+        outputs_list = []
+        for start in range(0, nb_images, batch_size):
+            chunk = image[start:start + batch_size]
+            nb_chunk = chunk.shape[0]
+            if nb_chunk < batch_size:
+                padding = np.zeros((batch_size - nb_chunk, *chunk.shape[1:]), dtype=chunk.dtype)
+                chunk = np.concatenate((chunk, padding), axis=0)
+
+            outputs = self.engine.run_all(chunk, self.hef_id)
+            outputs_list.append({name: output[:nb_chunk] for name, output in outputs.items()})
+
+        return {
+            name: np.concatenate([outputs[name] for outputs in outputs_list], axis=0)
+            for name in outputs_list[0]
+        }
\ No newline at end of file
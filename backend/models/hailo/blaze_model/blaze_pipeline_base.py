@@ -0,0 +1,416 @@
+import queue
+import threading
+from typing import Optional
+
+import numpy as np
+
+from backend.models.base_model import BaseModelInference
+from backend.utils.frame_context import FrameContext
+from backend.utils.logging import logging_default
+
+
+class BlazePipelineBase(BaseModelInference):
+    """
+    Base class for the two stages Blaze pipelines (detector followed by the landmark model).
+
+    The pipeline is split in two stages so it can run either synchronously with `inference`,
+    or asynchronously with `submit` and `collect` where the detector inference of frame N+1
+    on the Hailo device is overlapped with the host side postprocess of frame N.
+
+    Notes
+    ----------
+    Subclasses have to set `self.detector` (a `BlazeDetectorBase`) and `self.landmark_model`
+    (a `BlazeLandmarkBase`) when loading the model.
+
+    Parameters
+    ----------
+    landmarks_as_array : bool, optional
+        If True, the landmarks are returned as a single (N, K, 3) float32 array instead of
+        a list of lists of (x, y, z) tuples (default is False). Both index the same way,
+        `landmarks[face][point][axis]`, but the consumers have to test the emptiness with `len()`.
+    redetection_interval : int, optional
+        Tracking mode, number of consecutive frames whose ROIs are derived from the landmarks of the
+        previous frame before the detector runs again (default is 0, the detector runs on every frame).
+    min_tracking_confidence : float, optional
+        Minimum landmark presence flag for an object to stay tracked (default is 0.5). When no object
+        is tracked anymore, the detector runs on the next frame.
+    """
+
+    def __init__(self, landmarks_as_array : bool = False, redetection_interval : int = 0, min_tracking_confidence : float = 0.5):
+        super().__init__()
+
+        self.detector = None
+        self.landmark_model = None
+        self.landmarks_as_array = landmarks_as_array
+
+        # Tracking mode state, the ROIs (xc, yc, scale, theta) of the tracked objects
+        self.redetection_interval = redetection_interval
+        self.min_tracking_confidence = min_tracking_confidence
+        self.tracked_rois : Optional[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self.frames_since_detection = 0
+
+        # Asynchronous mode state
+        self.is_async_running = False
+        self.detect_queue : Optional[queue.Queue] = None
+        self.landmark_queue : Optional[queue.Queue] = None
+        self.result_queue : Optional[queue.Queue] = None
+        self.in_flight_semaphore : Optional[threading.BoundedSemaphore] = None
+        self.detect_thread : Optional[threading.Thread] = None
+        self.landmark_thread : Optional[threading.Thread] = None
+
+    def detect(self, image : np.ndarray, context : Optional[FrameContext] = None) -> tuple[dict, float, tuple[int, int]]:
+        """
+        First stage of the pipeline, resize and pad the image and run the detector on the Hailo device.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image in RGB format of shape (H, W, 3).
+        context : FrameContext, optional
+            The per frame memo `image` comes from, the letterbox input is shared with the other
+            detectors of the same input size.
+
+        Returns
+        -------
+        outputs : dict[str, np.ndarray]
+            The raw output tensors of the detector.
+        scale : float
+            Scale factor between the original image and the detector input.
+        pad : tuple[int, int]
+            Pixels of padding in the original image.
+        """
+        if context is not None:
+            img1, scale1, pad1 = context.get_or_compute(
+                ("letterbox", self.detector.w_scale, self.detector.h_scale),
+                lambda: self.detector.resize_pad(image, context)
+            )
+        else:
+            img1, scale1, pad1 = self.detector.resize_pad(image)
+        image_tensor = self.detector.preprocess(np.expand_dims(img1, axis=0))
+        outputs = self.detector.run_inference(image_tensor)
+        return outputs, scale1, pad1
+
+    def should_detect(self) -> bool:
+        """
+        Whether the next frame needs the detector, or can be tracked from the landmarks of the previous one.
+
+        Returns
+        -------
+        bool
+            True if tracking is disabled, nothing is tracked or the redetection interval is reached.
+        """
+        return self.redetection_interval <= 0 or self.tracked_rois is None \
+            or self.frames_since_detection >= self.redetection_interval
+
+    def reset_tracking(self):
+        """
+        Drops the tracked objects, the detector runs on the next frame.
+        """
+        self.tracked_rois = None
+        self.frames_since_detection = 0
+
+    def estimate_landmarks(self, image : np.ndarray, detector_outputs : Optional[dict], scale : float, pad : tuple[int, int]) -> list:
+        """
+        Second stage of the pipeline, decode the detections on the host, extract the ROIs and
+        run the landmark model on them. Without detector outputs, the ROIs tracked from the
+        previous frame are used instead.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image in RGB format of shape (H, W, 3), the same one given to `detect`.
+        detector_outputs : dict[str, np.ndarray] or None
+            The raw output tensors returned by `detect`, or None to track the objects of the previous frame.
+        scale : float
+            Scale factor returned by `detect`.
+        pad : tuple[int, int]
+            Padding returned by `detect`.
+
+        Returns
+        -------
+        list | np.ndarray
+            A list with one element per detected object, each a list of (x, y, z) normalized landmarks,
+            or a (N, K, 3) float32 array of the normalized landmarks if `landmarks_as_array` is set.
+        """
+        if detector_outputs is None:
+            if self.tracked_rois is None:
+                # Tracking was lost after the detector stage had skipped this frame
+                detector_outputs, scale, pad = self.detect(image)
+            else:
+                self.frames_since_detection += 1
+                return self.track_landmarks(image)
+
+        self.frames_since_detection = 0
+        detections = self.detector.postprocess(detector_outputs)
+        if len(detections) == 0:
+            self.tracked_rois = None
+            return self.format_landmarks(np.zeros((0, 0, 3), dtype=np.float32))
+
+        normalized_detections = np.array(detections)[0]
+        detections = self.detector.denormalize_detections(normalized_detections, scale, pad)
+        xc, yc, roi_scale, theta = self.detector.detection2roi(detections)
+
+        flags, landmarks = self.predict_landmarks(image, xc, yc, roi_scale, theta)
+        self.update_tracking(flags, landmarks)
+
+        return self.format_landmarks(self.landmark_model.normalized_landmark_to_orginal_image_space(landmarks, image.shape))
+
+    def track_landmarks(self, image : np.ndarray) -> list:
+        """
+        Runs the landmark model on the ROIs derived from the landmarks of the previous frame, the
+        objects whose presence flag falls below `min_tracking_confidence` are lost and not returned.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image in RGB format of shape (H, W, 3).
+
+        Returns
+        -------
+        list | np.ndarray
+            Same as `estimate_landmarks`.
+        """
+        xc, yc, roi_scale, theta = self.tracked_rois
+        flags, landmarks = self.predict_landmarks(image, xc, yc, roi_scale, theta)
+        is_tracked = self.update_tracking(flags, landmarks)
+
+        return self.format_landmarks(self.landmark_model.normalized_landmark_to_orginal_image_space(landmarks[is_tracked], image.shape))
+
+    def predict_landmarks(self, image : np.ndarray, xc : np.ndarray, yc : np.ndarray, roi_scale : np.ndarray, theta : np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts the ROIs and runs the landmark model on all of them at once.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image in RGB format of shape (H, W, 3).
+        xc, yc, roi_scale, theta : np.ndarray
+            The ROIs, each of shape (N,), as returned by `detection2roi` or `landmarks2roi`.
+
+        Returns
+        -------
+        flags : np.ndarray
+            The landmark presence flag of each ROI of shape (N,).
+        landmarks : np.ndarray
+            The landmarks in original image pixel space of shape (N, K, 3).
+        """
+        roi_img, roi_affine, roi_box = self.landmark_model.extract_roi(image, xc, yc, theta, roi_scale)
+        flags, normalized_landmarks = self.landmark_model.process(roi_img)
+
+        # The landmarks are a fresh array from the landmark model, denormalized in place
+        landmarks = self.landmark_model.denormalize_landmarks(normalized_landmarks, roi_affine)
+        return np.asarray(flags).reshape(len(landmarks), -1)[:, 0], landmarks
+
+    def update_tracking(self, flags : np.ndarray, landmarks : np.ndarray) -> np.ndarray:
+        """
+        Keeps the ROIs of the objects still present for the next frame, when the tracking mode is enabled.
+
+        Parameters
+        ----------
+        flags : np.ndarray
+            The landmark presence flag of each object of shape (N,).
+        landmarks : np.ndarray
+            The landmarks in original image pixel space of shape (N, K, 3).
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask of shape (N,) of the objects still tracked.
+        """
+        is_tracked = flags >= self.min_tracking_confidence
+        if self.redetection_interval <= 0 or not is_tracked.any():
+            self.tracked_rois = None
+        else:
+            self.tracked_rois = self.landmark_model.landmarks2roi(landmarks[is_tracked])
+        return is_tracked
+
+    def format_landmarks(self, landmarks : np.ndarray) -> list:
+        """
+        Returns the normalized landmarks in the output format of the pipeline.
+
+        Parameters
+        ----------
+        landmarks : np.ndarray
+            Normalized landmarks in original image space of shape (N, K, 3).
+
+        Returns
+        -------
+        list | np.ndarray
+            The array itself if `landmarks_as_array` is set, else a list of lists of (x, y, z) tuples.
+        """
+        if self.landmarks_as_array:
+            return landmarks
+
+        coordinates = []
+        for landmark in landmarks:
+            coords = [tuple(pt) for pt in landmark]
+            coordinates.append(coords)
+
+        return coordinates
+
+    def inference(self, image: np.ndarray, preprocessed: bool = True, context : Optional[FrameContext] = None):
+        """
+        Runs the full pipeline synchronously: detection followed by landmark prediction. In tracking
+        mode, the detection is skipped while the landmarks of the previous frame locate the objects.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image (BGR format if preprocessed=False). Expected shape: (H, W, 3).
+        preprocessed : bool, optional
+            Whether the input image has already been converted to RGB (default is True).
+        context : FrameContext, optional
+            The per frame memo of the original frame, the RGB image and the detector input are
+            looked up there.
+
+        Returns
+        -------
+        list | np.ndarray
+            A list with one element per detected object, each a list of (x, y, z) normalized landmarks,
+            or a (N, K, 3) float32 array if `landmarks_as_array` is set. If nothing is detected, the
+            result is empty.
+        """
+        if not preprocessed:
+            image = self.preprocess(image, context)
+
+        if not self.should_detect():
+            return self.estimate_landmarks(image, None, 1.0, (0, 0))
+
+        detector_outputs, scale, pad = self.detect(image, context)
+        return self.estimate_landmarks(image, detector_outputs, scale, pad)
+
+    def start_async(self, max_in_flight : int = 2):
+        """
+        Starts the asynchronous mode, where the detector stage and the landmark stage run
+        on their own thread and are fed with `submit` and drained with `collect`.
+
+        Parameters
+        ----------
+        max_in_flight : int, optional
+            Maximum number of frames submitted but not yet collected (default is 2). With 2, the
+            detector can work on frame N+1 while the host postprocess frame N, so the result lags
+            by at most one frame.
+        """
+        if self.is_async_running:
+            logging_default.warning("Asynchronous pipeline is already running")
+            return
+
+        self.detect_queue = queue.Queue()
+        self.landmark_queue = queue.Queue()
+        self.result_queue = queue.Queue()
+        self.in_flight_semaphore = threading.BoundedSemaphore(max_in_flight)
+
+        self.detect_thread = threading.Thread(target=self._detect_worker, daemon=True)
+        self.landmark_thread = threading.Thread(target=self._landmark_worker, daemon=True)
+        self.is_async_running = True
+        self.detect_thread.start()
+        self.landmark_thread.start()
+        logging_default.info(f"Started asynchronous {type(self).__name__} with {max_in_flight} frames in flight")
+
+    def stop_async(self):
+        """
+        Stops the asynchronous mode, frames still in flight are dropped.
+        """
+        if not self.is_async_running:
+            return
+
+        self.is_async_running = False
+        self.detect_queue.put(None)
+        self.detect_thread.join(timeout=5)
+        self.landmark_thread.join(timeout=5)
+        self.detect_thread = None
+        self.landmark_thread = None
+
+    def submit(self, image : np.ndarray, preprocessed : bool = True, timeout : Optional[float] = None) -> bool:
+        """
+        Submits a frame to the asynchronous pipeline. Blocks while `max_in_flight` frames are
+        waiting to be collected.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Input image (BGR format if preprocessed=False). Expected shape: (H, W, 3).
+        preprocessed : bool, optional
+            Whether the input image has already been converted to RGB (default is True).
+        timeout : float, optional
+            Maximum time in seconds to wait for a free slot, None waits forever.
+
+        Returns
+        -------
+        bool
+            True if the frame was submitted, False if there was no free slot before the timeout.
+        """
+        if not self.is_async_running:
+            raise RuntimeError("Asynchronous pipeline is not started, call start_async() first")
+
+        if not self.in_flight_semaphore.acquire(timeout=timeout):
+            return False
+
+        self.detect_queue.put((image, preprocessed))
+        return True
+
+    def collect(self, timeout : Optional[float] = None) -> list:
+        """
+        Collects the result of the oldest submitted frame, results come back in submission order.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time in seconds to wait for the result, None waits forever.
+
+        Returns
+        -------
+        list
+            Same as `inference`.
+
+        Raises
+        ------
+        queue.Empty
+            If no result is ready before the timeout.
+        """
+        result = self.result_queue.get(timeout=timeout)
+        self.in_flight_semaphore.release()
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _detect_worker(self):
+        while True:
+            item = self.detect_queue.get()
+            if item is None:
+                self.landmark_queue.put(None)
+                return
+
+            image, preprocessed = item
+            try:
+                if not preprocessed:
+                    image = self.preprocess(image)
+
+                # The tracking state lags by the frames in flight, the landmark stage
+                # runs the detector itself if the tracking is lost in the meantime
+                if not self.should_detect():
+                    self.landmark_queue.put((image, None, 1.0, (0, 0)))
+                    continue
+
+                detector_outputs, scale, pad = self.detect(image)
+                self.landmark_queue.put((image, detector_outputs, scale, pad))
+            except Exception as e:
+                logging_default.error(f"Detector stage failed: {e}")
+                self.landmark_queue.put(e)
+
+    def _landmark_worker(self):
+        while True:
+            item = self.landmark_queue.get()
+            if item is None:
+                return
+
+            if isinstance(item, Exception):
+                self.result_queue.put(item)
+                continue
+
+            try:
+                self.result_queue.put(self.estimate_landmarks(*item))
+            except Exception as e:
+                logging_default.error(f"Landmark stage failed: {e}")
+                self.result_queue.put(e)
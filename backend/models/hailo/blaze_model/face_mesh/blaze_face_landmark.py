@@ -1,9 +1,13 @@
+from typing import TYPE_CHECKING
+
 import numpy as np
 
 from backend.models.hailo.blaze_model.blaze_landmark_base import BlazeLandmarkBase
-from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
-    HailoInferenceEngine,
-)
+
+if TYPE_CHECKING:
+    from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
+        HailoInferenceEngine,
+    )
 
 
 class BlazeFaceLandmark(BlazeLandmarkBase):
@@ -13,11 +17,20 @@ class BlazeFaceLandmark(BlazeLandmarkBase):
     and outputs keypoint predicted positions.
     """
 
-    def __init__(self, model_path : str, hailo_engine : HailoInferenceEngine):
+    def __init__(self, model_path : str, hailo_engine : "HailoInferenceEngine"):
         super(BlazeFaceLandmark, self).__init__()
 
         self.engine = hailo_engine
 
+        # Landmarks to ROI, from mediapipe/modules/face_landmark/face_landmark_landmarks_to_roi.pbtxt
+        # rotation from the right eye outer corner (33) to the left eye outer corner (263)
+        self.roi_kp1 = 263
+        self.roi_kp2 = 33
+        self.roi_theta0 = 0.0
+        self.roi_dscale = 1.5
+        self.roi_dy = 0.0
+        self.roi_landmark_indices = None
+
         # Load the model into the engine
         self.load_model(model_path)
 
@@ -54,19 +67,23 @@ class BlazeFaceLandmark(BlazeLandmarkBase):
 
         Notes
         -----
-        Input is expected to be in range [0, 1], float32.
+        Input is expected to be in range [0, 1], float32, or already uint8
+        (as extracted by `extract_roi`) in which case it is returned as is.
         Output is in range [0, 255], uint8.
 
         Parameters
         ----------
         image : np.ndarray
-            Normalized RGB image of shape (H, W, 3), dtype=float32.
+            RGB image of shape (H, W, 3), normalized float32 or uint8.
 
         Returns
         -------
         np.ndarray
             Image in uint8 format, ready for inference.
         """
+        if image.dtype == np.uint8:
+            return image
+
         image = image * 255.0
         image = image.astype(np.uint8)
         return image
@@ -78,9 +95,9 @@ class BlazeFaceLandmark(BlazeLandmarkBase):
         Parameters
         ----------
         image : np.ndarray
-            Batched input images, shape (N, H, W, 3), float32 in [0, 1].
+            Batched input images, shape (N, H, W, 3), uint8 or float32 in [0, 1].
         preprocessed : bool, optional
-            If False, applies preprocessing to convert input to uint8 (default is True).
+            If False, applies preprocessing to convert float32 input to uint8 (default is True).
 
         Returns
         -------
@@ -93,36 +110,27 @@ class BlazeFaceLandmark(BlazeLandmarkBase):
         if not preprocessed:
             image = self.preprocess(image)
 
-        output1_list = []
-        output2_list = []
-        
         nb_images = image.shape[0]
-        for i in range(nb_images):
-
-            # Preprocess the images into tensors:
-            image_input = np.expand_dims(image[i,:,:,:], axis=0)
-        
-            # Run the neural network on Hailo
-            """ Execute model on Hailo-8 """
-            outputs = self.engine.run_all(image_input, self.hef_id)
+        if nb_images == 0:
+            return np.asarray([]), np.asarray([])
 
-            # The output will give us something like this
-            #   Output face_landmark/conv23 UINT8, FCR(1x1x1)
-            #   Output face_landmark/conv25 UINT8, FCR(1x1x1x1404)
-            # And we dont want that
+        # Run the neural network on Hailo, all the ROIs of the frame at once
+        outputs = self.run_batch_inference(image)
 
-            output1 = outputs[self.output_vstream_infos[0].name]
-            output2 = outputs[self.output_vstream_infos[1].name]
+        # The output will give us something like this
+        #   Output face_landmark/conv23 UINT8, FCR(1x1x1)
+        #   Output face_landmark/conv25 UINT8, FCR(1x1x1x1404)
+        # And we dont want that
 
-            # Reshape to match what mediapipe postprocess expects from hailo
-            output2 = output2.reshape(1,-1,3) # 1404 => [1,356,3]
-            output2 = output2 / self.resolution                                      
+        output1 = outputs[self.output_vstream_infos[0].name]
+        output2 = outputs[self.output_vstream_infos[1].name]
 
-            output1_list.append(output1.squeeze(0))
-            output2_list.append(output2.squeeze(0))
+        # Reshape to match what mediapipe postprocess expects from hailo
+        output2 = output2.reshape(nb_images,-1,3) # 1404 => [N,356,3]
+        output2 = (output2 / self.resolution).astype(np.float32, copy=False)
 
-        flag = np.asarray(output1_list)
-        landmarks = np.asarray(output2_list)        
+        flag = np.asarray(output1)
+        landmarks = np.asarray(output2)
 
         return flag,landmarks
         
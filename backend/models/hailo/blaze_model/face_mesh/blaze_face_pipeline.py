@@ -1,21 +1,27 @@
+from typing import TYPE_CHECKING, Optional
+
 import cv2
 import numpy as np
 
-from backend.models.base_model import BaseModelInference
+from backend.models.hailo.blaze_model.blaze_pipeline_base import BlazePipelineBase
 from backend.models.hailo.blaze_model.face_mesh.blaze_face_detector import (
     BlazeFaceDetector,
 )
 from backend.models.hailo.blaze_model.face_mesh.blaze_face_landmark import (
     BlazeFaceLandmark,
 )
-from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
-    HailoInferenceEngine,
-)
+from backend.utils.frame_context import FrameContext
 
+if TYPE_CHECKING:
+    from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
+        HailoInferenceEngine,
+    )
 
-class BlazeFacePipeline(BaseModelInference):
-    def __init__(self, hailo_engine : HailoInferenceEngine):
-        super().__init__()
+
+class BlazeFacePipeline(BlazePipelineBase):
+    def __init__(self, hailo_engine : "HailoInferenceEngine", landmarks_as_array : bool = False,
+                 redetection_interval : int = 0, min_tracking_confidence : float = 0.5):
+        super().__init__(landmarks_as_array, redetection_interval, min_tracking_confidence)
 
         self.hailo_inference = hailo_engine
         self.hailo_face_detection_model = "hailo_model/hailo8l/hef/face_detection_full_range.hef"
@@ -40,18 +46,18 @@ class BlazeFacePipeline(BaseModelInference):
         That's why in this class, there are two models that will be run to the Hailo Engine.
         For the how detailed, you can see [here](https://learnopencv.com/introduction-to-mediapipe/).
         """
-        self.blaze_face_detector = BlazeFaceDetector(
+        self.detector = BlazeFaceDetector(
                                     self.hailo_face_detection_model, 
                                     self.face_detection_model_anchors,
                                     self.face_detection_model_inference_config,
                                     self.hailo_inference
                                     )
-        self.blaze_face_landmark = BlazeFaceLandmark(
+        self.landmark_model = BlazeFaceLandmark(
                                     self.hailo_face_landmark_model,
                                     self.hailo_inference
                                     )
 
-    def preprocess(self, image : np.ndarray):
+    def preprocess(self, image : np.ndarray, context : Optional[FrameContext] = None):
         """
         This function is to preprocess the image before going to the Mediapipe model.
         Process an BGR image and return the image in RGB format
@@ -60,45 +66,9 @@ class BlazeFacePipeline(BaseModelInference):
         ----------
         image : np.ndarray
             The image frame of which want to get the face landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, its RGB conversion is shared with the other models
         """
+        if context is not None:
+            return context.rgb()
         return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    
-    def inference(self, image: np.ndarray, preprocessed: bool = True):
-        """
-        Runs the full BlazeFace pipeline: face detection followed by landmark prediction.
-
-        Parameters
-        ----------
-        image : np.ndarray
-            Input image (BGR format if preprocessed=False). Expected shape: (H, W, 3).
-        preprocessed : bool, optional
-            Whether the input image has already been converted to RGB (default is True).
-
-        Returns
-        -------
-        list[np.ndarray]
-            A list of np.ndarrays, each of shape (N, 3), where N is the number of landmarks per face.
-            If no faces are detected, returns an empty list.
-        """
-        if not preprocessed:
-            image = self.preprocess(image)
-
-        img1, scale1, pad1 = self.blaze_face_detector.resize_pad(image)
-        normalized_detections = self.blaze_face_detector.process(img1, False)
-
-        faces_coordinates = []
-        if len(normalized_detections) > 0:
-            detections = self.blaze_face_detector.denormalize_detections(normalized_detections,scale1,pad1)
-            xc, yc, scale, theta = self.blaze_face_detector.detection2roi(detections)
-
-            roi_img, roi_affine, roi_box = self.blaze_face_landmark.extract_roi(image, xc, yc, theta, scale)
-            flags, normalized_landmarks = self.blaze_face_landmark.process(roi_img, False)
-
-            landmarks = self.blaze_face_landmark.denormalize_landmarks(normalized_landmarks.copy(), roi_affine.copy())
-            original_normalized_landmarks = self.blaze_face_landmark.normalized_landmark_to_orginal_image_space(landmarks.copy(), image.shape)
-
-            for face_landmark in original_normalized_landmarks:
-                face_coords = [tuple(pt) for pt in face_landmark]
-                faces_coordinates.append(face_coords)
-            
-        return faces_coordinates
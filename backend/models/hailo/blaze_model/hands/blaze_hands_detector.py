@@ -1,9 +1,13 @@
+from typing import TYPE_CHECKING
+
 import numpy as np
 
 from backend.models.hailo.blaze_model.blaze_detector_base import BlazeDetectorBase
-from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
-    HailoInferenceEngine,
-)
+
+if TYPE_CHECKING:
+    from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
+        HailoInferenceEngine,
+    )
 
 
 class BlazeHandsDetector(BlazeDetectorBase):
@@ -14,7 +18,7 @@ class BlazeHandsDetector(BlazeDetectorBase):
     It loads a model onto a Hailo inference engine, preprocesses input images, 
     runs inference, and postprocesses the raw outputs (including NMS).
     """
-    def __init__(self, model_path : str, anchors_config : str, inference_config : str, hailo_engine : HailoInferenceEngine):
+    def __init__(self, model_path : str, anchors_config : str, inference_config : str, hailo_engine : "HailoInferenceEngine"):
         super(BlazeHandsDetector, self).__init__()
 
         self.engine = hailo_engine
@@ -128,9 +132,41 @@ class BlazeHandsDetector(BlazeDetectorBase):
             A list of detection arrays (one per image). Each detection array has shape (N, 17),
             where N is the number of detected faces.
         """
+        outputs = self.run_inference(image_tensor)
+        return self.postprocess(outputs)
+
+    def run_inference(self, image_tensor: np.ndarray) -> dict:
+        """
+        Runs the detector on the Hailo device, without any of the host side postprocess.
+
+        Parameters
+        ----------
+        image_tensor : np.ndarray
+            A batch of images of shape (B, H, W, 3), already preprocessed.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The raw output tensors keyed by the output vstream name.
+        """
         # Run the neural network using Hailo
-        outputs = self.engine.run_all(image_tensor, self.hef_id)
+        return self.engine.run_all(image_tensor, self.hef_id)
+
+    def postprocess(self, outputs : dict) -> list:
+        """
+        Decodes the raw output tensors of the detector into detections, this is the host side
+        part of `predict_on_batch`.
+
+        Parameters
+        ----------
+        outputs : dict[str, np.ndarray]
+            The raw output tensors returned by `run_inference`.
 
+        Returns
+        -------
+        list of np.ndarray
+            A list of detection arrays (one per image), same as `predict_on_batch`.
+        """
         # The output will give us something like this
         #   Output palm_detection_full/conv29 UINT8, FCR(12x12x6)
         #   Output palm_detection_full/conv34 UINT8, FCR(24x24x2)
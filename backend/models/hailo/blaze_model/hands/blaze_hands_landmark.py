@@ -1,9 +1,13 @@
+from typing import TYPE_CHECKING
+
 import numpy as np
 
 from backend.models.hailo.blaze_model.blaze_landmark_base import BlazeLandmarkBase
-from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
-    HailoInferenceEngine,
-)
+
+if TYPE_CHECKING:
+    from backend.models.hailo.hailo_runtime.hailo_inference_engine import (
+        HailoInferenceEngine,
+    )
 
 
 class BlazeHandsLandmark(BlazeLandmarkBase):
@@ -13,11 +17,20 @@ class BlazeHandsLandmark(BlazeLandmarkBase):
     and outputs keypoint predicted positions of the landmark positition.
     """
 
-    def __init__(self, model_path : str, hailo_engine : HailoInferenceEngine):
+    def __init__(self, model_path : str, hailo_engine : "HailoInferenceEngine"):
         super(BlazeHandsLandmark, self).__init__()
 
         self.engine = hailo_engine
 
+        # Landmarks to ROI, from mediapipe/modules/hand_landmark/hand_landmark_landmarks_to_roi.pbtxt
+        # rotation from the wrist (0) to the middle finger MCP (9), box of the palm landmarks only
+        self.roi_kp1 = 0
+        self.roi_kp2 = 9
+        self.roi_theta0 = np.pi / 2
+        self.roi_dscale = 2.0
+        self.roi_dy = -0.1
+        self.roi_landmark_indices = [0, 1, 2, 3, 5, 6, 9, 10, 13, 14, 17, 18]
+
         # Load the model into the engine
         self.load_model(model_path)
 
@@ -54,19 +67,23 @@ class BlazeHandsLandmark(BlazeLandmarkBase):
 
         Notes
         -----
-        Input is expected to be in range [0, 1], float32.
+        Input is expected to be in range [0, 1], float32, or already uint8
+        (as extracted by `extract_roi`) in which case it is returned as is.
         Output is in range [0, 255], uint8.
 
         Parameters
         ----------
         image : np.ndarray
-            Normalized RGB image of shape (H, W, 3), dtype=float32.
+            RGB image of shape (H, W, 3), normalized float32 or uint8.
 
         Returns
         -------
         np.ndarray
             Image in uint8 format, ready for inference.
         """
+        if image.dtype == np.uint8:
+            return image
+
         image = image * 255.0
         image = image.astype(np.uint8)
         return image
@@ -78,9 +95,9 @@ class BlazeHandsLandmark(BlazeLandmarkBase):
         Parameters
         ----------
         image : np.ndarray
-            Batched input images, shape (N, H, W, 3), float32 in [0, 1].
+            Batched input images, shape (N, H, W, 3), uint8 or float32 in [0, 1].
         preprocessed : bool, optional
-            If False, applies preprocessing to convert input to uint8 (default is True).
+            If False, applies preprocessing to convert float32 input to uint8 (default is True).
 
         Returns
         -------
@@ -93,37 +110,28 @@ class BlazeHandsLandmark(BlazeLandmarkBase):
         if not preprocessed:
             image = self.preprocess(image)
 
-        output1_list = []
-        output2_list = []
-        
         nb_images = image.shape[0]
-        for i in range(nb_images):
-
-            # Preprocess the images into tensors:
-            image_input = np.expand_dims(image[i,:,:,:], axis=0)
-        
-            # Run the neural network on Hailo
-            """ Execute model on Hailo-8 """
-            outputs = self.engine.run_all(image_input, self.hef_id)
-
-            # The output will give us something like this
-            #   Output hand_landmark/fc1 UINT8, NC (63)
-            #   Output hand_landmark/fc4 UINT8, NC (1)
-            #   Output hand_landmark/fc3 UINT8, NC (1)
-            #   Output hand_landmark/fc2 UINT8, NC (63)
-            # And we dont want that
-
-            output1 = outputs[self.output_vstream_infos[2].name]
-            output2 = outputs[self.output_vstream_infos[0].name]
-
-            # Reshape to match what mediapipe postprocess expects from hailo
-            output2 = output2.reshape(1,21,-1) # 42 => [1,21,2] | 63 => [1,21,3]
-            output2 = output2 / self.resolution                                      
-
-            output1_list.append(output1.squeeze(0))
-            output2_list.append(output2.squeeze(0))
-
-        flag = np.asarray(output1_list)
-        landmarks = np.asarray(output2_list)        
+        if nb_images == 0:
+            return np.asarray([]), np.asarray([])
+
+        # Run the neural network on Hailo, all the ROIs of the frame at once
+        outputs = self.run_batch_inference(image)
+
+        # The output will give us something like this
+        #   Output hand_landmark/fc1 UINT8, NC (63)
+        #   Output hand_landmark/fc4 UINT8, NC (1)
+        #   Output hand_landmark/fc3 UINT8, NC (1)
+        #   Output hand_landmark/fc2 UINT8, NC (63)
+        # And we dont want that
+
+        output1 = outputs[self.output_vstream_infos[2].name]
+        output2 = outputs[self.output_vstream_infos[0].name]
+
+        # Reshape to match what mediapipe postprocess expects from hailo
+        output2 = output2.reshape(nb_images,21,-1) # 42 => [N,21,2] | 63 => [N,21,3]
+        output2 = (output2 / self.resolution).astype(np.float32, copy=False)
+
+        flag = np.asarray(output1)
+        landmarks = np.asarray(output2)
 
         return flag,landmarks
\ No newline at end of file
@@ -1,4 +1,9 @@
+import hashlib
 import json
+import os
+
+# Bump when the anchors generation changes, so the old cache files are not used anymore
+ANCHORS_CACHE_VERSION = 1
 
 
 def get_anchor_options(anchor_model_path : str) -> dict:
@@ -7,4 +12,25 @@ def get_anchor_options(anchor_model_path : str) -> dict:
     
 def get_model_config(inference_model_config : str) -> dict:
     with open(inference_model_config, 'r') as f:
-        return json.load(f)
\ No newline at end of file
+        return json.load(f)
+
+def get_anchors_cache_path(anchor_model_path : str, options : dict) -> str:
+    """
+    Get the path of the generated anchors cache, which is saved next to the anchors config
+    and named after the hash of the anchors options.
+
+    Parameters
+    ----------
+    anchor_model_path : str
+        The config path on the model anchors
+    options : dict
+        The anchors options loaded from the config
+
+    Returns
+    -------
+    str
+        The path of the `.npy` cache, e.g. `anchors/face_detection_full_option.<hash>.npy`
+    """
+    content = json.dumps({"version": ANCHORS_CACHE_VERSION, "options": options}, sort_keys=True)
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return f"{os.path.splitext(anchor_model_path)[0]}.{content_hash}.npy"
@@ -1,11 +1,14 @@
 # Reference : https://hailo.ai/developer-zone/documentation/dataflow-compiler-v3-26-0/?sp_referrer=tutorials_notebooks/notebooks/DFC_4_Inference_Tutorial.html
-from typing import List
+import time
+from threading import Lock
+from typing import Dict, List
 
 import numpy as np
 from hailo_platform import (
     HEF,
     ConfigureParams,
     FormatType,
+    HailoSchedulingAlgorithm,
     HailoStreamInterface,
     InferVStreams,
     InputVStreamParams,
@@ -20,10 +23,19 @@ class HailoInferenceEngine():
     def __init__(self):
         """
         Initialize the HailoInference class
+
+        Notes
+        ----------
+        The device is created with the Hailo model scheduler enabled, so every loaded HEF
+        can keep its own inference session open at the same time and the scheduler switches
+        between the network groups. Without the scheduler only one network group can be
+        activated at a time, which forces the stream setup and activation on every call.
         """
         # The target can be used as a context manager ("with" statement) 
         # to ensure it's released on time.
-        self.target = VDevice()
+        params = VDevice.create_params()
+        params.scheduling_algorithm = HailoSchedulingAlgorithm.ROUND_ROBIN
+        self.target = VDevice(params)
         self.hef_cnt = 0
         self.hef_list = []
         self.network_group_list = []
@@ -32,6 +44,20 @@ class HailoInferenceEngine():
         self.output_vstreams_params_list = []
         self.input_vstream_info_list = []
         self.output_vstream_info_list = []
+        self.batch_size_list = []
+
+        # Id of each loaded HEF file, so the pipelines of several cameras share the network groups
+        self.hef_ids : Dict[str, int] = {}
+
+        # Long-lived inference session of each loaded HEF, opened by `open()`
+        self.infer_pipeline_list = []
+        self.session_lock_list = []
+        self.is_opened = False
+        # Set by `close()`, the sessions are then no longer opened on demand
+        self.is_closed = False
+
+        # Per HEF latency accounting of the `infer()` hot path
+        self.latency_stats_list : List[Dict[str, float]] = []
     
     def load_model(self, hef_path : str):
         """
@@ -41,10 +67,18 @@ class HailoInferenceEngine():
         ----------
         hef_path: str 
             Path to the HEF model file.
+
+        Returns
+        -------
+        int
+            Id of the HEF, the same for every call with the same file.
         """
+        if hef_path in self.hef_ids:
+            return self.hef_ids[hef_path]
+
         hef_id = self.hef_cnt
         hef = HEF(hef_path)
-        network_group = self._configure_and_get_network_group(hef, self.target)
+        network_group, batch_size = self._configure_and_get_network_group(hef, self.target)
         network_group_params = network_group.create_params()
         input_vstreams_params, output_vstreams_params = self._create_vstream_params(network_group)
         self.input_vstream_info, self.output_vstream_info = self._get_and_print_vstream_info(hef)
@@ -56,8 +90,17 @@ class HailoInferenceEngine():
         self.output_vstreams_params_list.append(output_vstreams_params)
         self.input_vstream_info_list.append(self.input_vstream_info)
         self.output_vstream_info_list.append(self.output_vstream_info)
+        self.batch_size_list.append(batch_size)
+        self.infer_pipeline_list.append(None)
+        self.session_lock_list.append(Lock())
+        self.latency_stats_list.append({"count": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0})
 
         self.hef_cnt += 1
+        self.hef_ids[hef_path] = hef_id
+
+        # Model loaded after the engine is opened get their session right away
+        if self.is_opened:
+            self._open_session(hef_id)
 
         return hef_id
 
@@ -76,10 +119,15 @@ class HailoInferenceEngine():
         ----------
         NetworkGroup: 
             Configured network group.
+        int:
+            The batch size the network group was configured with, 0 means it was left
+            to the HailoRT default and the model doesn't force a fixed batch size.
         """
         configure_params = ConfigureParams.create_from_hef(hef, interface=HailoStreamInterface.PCIe)
+        network_group_name = hef.get_network_group_names()[0]
+        batch_size = configure_params[network_group_name].batch_size
         network_group = target.configure(hef, configure_params)[0]
-        return network_group
+        return network_group, batch_size
     
     def _create_vstream_params(self, network_group):
         """
@@ -145,6 +193,22 @@ class HailoInferenceEngine():
         """
         return self.hef.get_output_vstream_infos()[0].shape
     
+    def get_batch_size(self, hef_id : int) -> int:
+        """
+        Get the fixed batch size of a loaded model.
+
+        Parameters
+        ----------
+        hef_id : int
+            The id returned by `load_model`.
+
+        Returns
+        ----------
+        int:
+            The batch size, 0 if the model accepts any number of frames per submission.
+        """
+        return self.batch_size_list[hef_id]
+
     def run(self, image : np.ndarray, output_vstream_info_indexes=[0]):
         """
         Run inference on Hailo-8 device.
@@ -159,22 +223,127 @@ class HailoInferenceEngine():
         list: 
             Inference output.
         """
-        output_l = list(list())
-        with InferVStreams(self.network_group, self.input_vstreams_params, self.output_vstreams_params) as infer_pipeline:            
-            input_data = {self.input_vstream_info[0].name: image}   # Assumes that the model has one input
+        # Run on the last loaded model, same as the single model usage of this function
+        hef_id = self.hef_cnt - 1
+        output = self.infer(image, hef_id)
 
-            with self.network_group.activate(self.network_group_params):
-                output = infer_pipeline.infer(input_data)
-                for output_vstream_info_index in output_vstream_info_indexes:
-                    output_tmp = output[self.output_vstream_info[output_vstream_info_index].name]
-                    output_l.append(output_tmp)
+        output_l = list(list())
+        for output_vstream_info_index in output_vstream_info_indexes:
+            output_tmp = output[self.output_vstream_info_list[hef_id][output_vstream_info_index].name]
+            output_l.append(output_tmp)
 
         return output_l
-    
-    def run_all(self, image : np.ndarray, hef_id : int) -> List[np.ndarray]:
+
+    def open(self):
+        """
+        Open one long-lived inference session (the `InferVStreams` pipeline) for every loaded HEF.
+        Meant to be called once at startup after all the models have been loaded, the sessions
+        stay open until `close()` is called at shutdown.
+        """
+        self.is_closed = False
+        for hef_id in range(self.hef_cnt):
+            self._open_session(hef_id)
+        self.is_opened = True
+        logging_default.info(f"Opened Hailo inference sessions for {self.hef_cnt} model(s)")
+
+    def close(self):
+        """
+        Close every inference session opened by `open()` and log the latency of each model.
+        A stage still running afterwards gets an error instead of reopening a session.
+        """
+        self.is_closed = True
+        for hef_id in range(self.hef_cnt):
+            with self.session_lock_list[hef_id]:
+                infer_pipeline = self.infer_pipeline_list[hef_id]
+                if infer_pipeline is None:
+                    continue
+
+                try:
+                    infer_pipeline.__exit__(None, None, None)
+                except Exception as e:
+                    logging_default.warning(f"Failed to close inference session of HEF {hef_id}: {e}")
+                self.infer_pipeline_list[hef_id] = None
+
+            stats = self.get_latency_stats(hef_id)
+            logging_default.info(
+                "HEF {hef_id} latency - calls: {count}, mean: {mean_ms:.2f} ms, max: {max_ms:.2f} ms",
+                hef_id=hef_id, **stats
+            )
+        self.is_opened = False
+
+    def _open_session(self, hef_id : int):
+        """
+        Enter the `InferVStreams` context of a single HEF and keep it for the next calls.
+
+        Parameters
+        ----------
+        hef_id : int
+            The id returned by `load_model`.
+        """
+        with self.session_lock_list[hef_id]:
+            self._open_session_locked(hef_id)
+
+    def _open_session_locked(self, hef_id : int):
+        # Called with the session lock of the HEF held
+        if self.infer_pipeline_list[hef_id] is not None:
+            return
+
+        infer_pipeline = InferVStreams(
+            self.network_group_list[hef_id],
+            self.input_vstreams_params_list[hef_id],
+            self.output_vstreams_params_list[hef_id]
+        )
+        infer_pipeline.__enter__()
+        self.infer_pipeline_list[hef_id] = infer_pipeline
+
+    def infer(self, image : np.ndarray, hef_id : int) -> Dict[str, np.ndarray]:
+        """
+        Run inference on the already opened session of the HEF. This is the hot path, no stream
+        setup nor network group activation is done here, the model scheduler handles the switching
+        between the network groups.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Batch of images of shape (N, H, W, C) to run inference on.
+        hef_id : int
+            The id returned by `load_model`.
+
+        Returns
+        ----------
+        dict[str, np.ndarray]
+            Output of the model keyed by the output vstream name.
+
+        Raises
+        ----------
+        RuntimeError
+            If the sessions were closed by `close()`.
+        """
+        input_data = {self.input_vstream_info_list[hef_id][0].name: image}   # Assumes that the model has one input
+
+        # The session is checked, opened and used under its lock, so `close()` can't end it in between
+        with self.session_lock_list[hef_id]:
+            if self.infer_pipeline_list[hef_id] is None:
+                if self.is_closed:
+                    raise RuntimeError(f"The inference session of HEF {hef_id} is closed")
+                self._open_session_locked(hef_id)
+
+            # Timed once the lock is held, not counting the wait for the other users of the HEF
+            start_time = time.perf_counter()
+            output = self.infer_pipeline_list[hef_id].infer(input_data)
+            self._record_latency(hef_id, (time.perf_counter() - start_time) * 1000.0)
+
+        return output
+
+    def run_all(self, image : np.ndarray, hef_id : int) -> Dict[str, np.ndarray]:
         """
         Run inference on Hailo-8 device.
 
+        Notes
+        ----------
+        Kept for the Blaze models, it's the same as `infer()` and will open the session
+        of the HEF on the first call if `open()` haven't been called yet.
+
         Parameters
         ----------
         image: numpy.ndarray) 
@@ -183,23 +352,44 @@ class HailoInferenceEngine():
         Returns:
             numpy.ndarray: Inference output.
         """
-        network_group = self.network_group_list[hef_id]
-        network_group_params = self.network_group_params_list[hef_id]
-        input_vstreams_params = self.input_vstreams_params_list[hef_id]
-        output_vstreams_params = self.output_vstreams_params_list[hef_id]
-        input_vstream_info = self.input_vstream_info_list[hef_id]
+        return self.infer(image, hef_id)
 
-        output = None
-        with InferVStreams(network_group, input_vstreams_params, output_vstreams_params) as infer_pipeline:
-            input_data = {input_vstream_info[0].name: image}   # Assumes that the model has one input
+    def _record_latency(self, hef_id : int, elapsed_ms : float):
+        # Called with the session lock of the HEF held
+        stats = self.latency_stats_list[hef_id]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
 
-            with network_group.activate(network_group_params):
-                output = infer_pipeline.infer(input_data)
+    def get_latency_stats(self, hef_id : int) -> Dict[str, float]:
+        """
+        Get the latency of the `infer()` calls of a model.
 
-        return output
+        Parameters
+        ----------
+        hef_id : int
+            The id returned by `load_model`.
+
+        Returns
+        ----------
+        dict
+            The number of calls, mean, last and max latency in milliseconds.
+        """
+        with self.session_lock_list[hef_id]:
+            stats = dict(self.latency_stats_list[hef_id])
+        count = stats["count"]
+        return {
+            "count": count,
+            "mean_ms": stats["total_ms"] / count if count else 0.0,
+            "last_ms": stats["last_ms"],
+            "max_ms": stats["max_ms"],
+        }
 
     def release_device(self):
         """
         Release the Hailo device.
         """
-        self.target.release()
\ No newline at end of file
+        if self.is_opened:
+            self.close()
+        self.target.release()
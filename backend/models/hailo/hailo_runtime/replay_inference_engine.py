@@ -0,0 +1,387 @@
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.utils.logging import logging_default
+
+# Key of the vstreams description stored in every recording
+VSTREAM_INFOS_KEY = "__vstream_infos__"
+
+
+@dataclass
+class ReplayVStreamInfo:
+    """
+    The subset of the HailoRT vstream info used by the Blaze models.
+    """
+    name: str
+    shape: tuple
+
+
+class ReplayHef():
+    """
+    Stands for a HEF in the replay engine, it only describes the input and output vstreams.
+    """
+    def __init__(self, input_vstream_infos : List[ReplayVStreamInfo], output_vstream_infos : List[ReplayVStreamInfo]):
+        self.input_vstream_infos = input_vstream_infos
+        self.output_vstream_infos = output_vstream_infos
+
+    def get_input_vstream_infos(self) -> List[ReplayVStreamInfo]:
+        return self.input_vstream_infos
+
+    def get_output_vstream_infos(self) -> List[ReplayVStreamInfo]:
+        return self.output_vstream_infos
+
+
+# The vstreams of the HEFs used by the Blaze pipelines, in the order HailoRT returns them
+SYNTHETIC_PROFILES = {
+    "face_detection_full_range": {
+        "kind": "face_detector",
+        "inputs": [("face_detection_full_range/input_layer1", (192, 192, 3))],
+        "outputs": [
+            ("face_detection_full_range/conv49", (48, 48, 16)),
+            ("face_detection_full_range/conv48", (48, 48, 1)),
+        ],
+    },
+    "face_landmark": {
+        "kind": "face_landmark",
+        "inputs": [("face_landmark/input_layer1", (192, 192, 3))],
+        "outputs": [
+            ("face_landmark/conv23", (1, 1, 1)),
+            ("face_landmark/conv25", (1, 1, 1404)),
+        ],
+    },
+    "palm_detection_full": {
+        "kind": "palm_detector",
+        "inputs": [("palm_detection_full/input_layer1", (192, 192, 3))],
+        "outputs": [
+            ("palm_detection_full/conv29", (12, 12, 6)),
+            ("palm_detection_full/conv34", (24, 24, 2)),
+            ("palm_detection_full/conv30", (12, 12, 108)),
+            ("palm_detection_full/conv35", (24, 24, 36)),
+        ],
+    },
+    "hand_landmark_full": {
+        "kind": "hand_landmark",
+        "inputs": [("hand_landmark_full/input_layer1", (224, 224, 3))],
+        "outputs": [
+            ("hand_landmark_full/fc1", (63,)),
+            ("hand_landmark_full/fc4", (1,)),
+            ("hand_landmark_full/fc3", (1,)),
+            ("hand_landmark_full/fc2", (63,)),
+        ],
+    },
+}
+
+# Keypoints of the synthetic objects relative to their center, in units of the object size
+FACE_KEYPOINTS = np.array([[-0.2, -0.15], [0.2, -0.15], [0.0, 0.05], [0.0, 0.25], [-0.45, -0.05], [0.45, -0.05]])
+PALM_KEYPOINTS = np.array([[0.0, 0.45], [-0.2, -0.3], [0.0, -0.35], [0.15, -0.3], [0.3, -0.2], [-0.4, 0.2], [-0.45, -0.05]])
+
+
+class ReplayInferenceEngine():
+    """
+    Inference engine with the same surface as `HailoInferenceEngine` that serves recorded raw
+    output tensors, or deterministic synthetic ones, instead of running the HEF on a Hailo device.
+    Everything downstream of `run_all` can then run, be benchmarked and be tested on any machine.
+
+    A HEF is served from `<recordings_dir>/<hef stem>.npz` if the recording exists (see
+    `RecordingInferenceEngine`), else from the built-in synthetic profile of its stem. The synthetic
+    detectors see one object moving slowly around the center of the image, and the synthetic
+    landmark models return landmarks whose ROI is stable under the landmarks to ROI tracking.
+
+    Parameters
+    ----------
+    recordings_dir : str, optional
+        Directory of the recorded outputs, None always uses the synthetic profiles.
+    seed : int, optional
+        Seed of the synthetic outputs (default is 0).
+    """
+    def __init__(self, recordings_dir : Optional[str] = None, seed : int = 0):
+        self.recordings_dir = recordings_dir
+        self.seed = seed
+
+        self.hef_list : List[ReplayHef] = []
+        self.hef_name_list : List[str] = []
+        self.kind_list : List[Optional[str]] = []
+        self.recording_list : List[Optional[List[Dict[str, np.ndarray]]]] = []
+        self.call_count_list : List[int] = []
+
+    def load_model(self, hef_path : str) -> int:
+        """
+        Registers the HEF, from its recording or its synthetic profile.
+
+        Parameters
+        ----------
+        hef_path : str
+            Path to the HEF file, only its stem is used.
+
+        Returns
+        -------
+        int
+            The id of the HEF, to pass to `run_all`.
+        """
+        hef_name = os.path.splitext(os.path.basename(hef_path))[0]
+        recording_path = os.path.join(self.recordings_dir, hef_name + ".npz") if self.recordings_dir else None
+
+        if recording_path is not None and os.path.exists(recording_path):
+            hef, recording = load_recording(recording_path)
+            kind = None
+            logging_default.info(f"Replaying {len(recording)} recorded outputs of {hef_name} from {recording_path}")
+        elif hef_name in SYNTHETIC_PROFILES:
+            profile = SYNTHETIC_PROFILES[hef_name]
+            hef = ReplayHef(
+                [ReplayVStreamInfo(name, shape) for name, shape in profile["inputs"]],
+                [ReplayVStreamInfo(name, shape) for name, shape in profile["outputs"]],
+            )
+            recording = None
+            kind = profile["kind"]
+            logging_default.info(f"Serving synthetic outputs for {hef_name}")
+        else:
+            raise ValueError(f"No recording nor synthetic profile for the HEF {hef_path}")
+
+        self.hef_list.append(hef)
+        self.hef_name_list.append(hef_name)
+        self.kind_list.append(kind)
+        self.recording_list.append(recording)
+        self.call_count_list.append(0)
+        return len(self.hef_list) - 1
+
+    def get_batch_size(self, hef_id : int) -> int:
+        """
+        The replay engine accepts any number of frames per call.
+        """
+        return 0
+
+    def run_all(self, image : np.ndarray, hef_id : int) -> Dict[str, np.ndarray]:
+        """
+        Returns the next outputs of the HEF for a batch of frames.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            The batched input of shape (N, H, W, C), only N is used.
+        hef_id : int
+            The id returned by `load_model`.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Output of the model keyed by the output vstream name, each of shape (N, ...).
+        """
+        nb_images = image.shape[0]
+        call = self.call_count_list[hef_id]
+        self.call_count_list[hef_id] += 1
+
+        recording = self.recording_list[hef_id]
+        if recording is not None:
+            outputs = recording[call % len(recording)]
+            # The recorded call may have had another number of ROIs, repeat or trim its rows
+            return {name: np.resize(output, (nb_images, *output.shape[1:])) for name, output in outputs.items()}
+
+        rng = np.random.default_rng((self.seed, zlib.crc32(self.hef_name_list[hef_id].encode()), call))
+        generator = getattr(self, f"_synthetic_{self.kind_list[hef_id]}")
+        outputs = generator(self.hef_list[hef_id], nb_images, call, rng)
+        return {name: output.astype(np.float32) for name, output in outputs.items()}
+
+    # Same names as HailoInferenceEngine so the engines are interchangeable
+    infer = run_all
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def release_device(self):
+        pass
+
+    def _object_position(self, call : int) -> tuple[float, float, float]:
+        """
+        Center and size of the synthetic object, in normalized detector input coordinates.
+        """
+        return 0.5 + 0.05 * np.sin(call * 0.1), 0.5 + 0.03 * np.cos(call * 0.07), 0.35
+
+    def _detector_outputs(self, score_infos : list, box_infos : list, keypoints : np.ndarray, nb_images : int, call : int, rng : np.random.Generator) -> Dict[str, np.ndarray]:
+        """
+        Synthetic detector outputs: low scores everywhere but on the anchors close to the object
+        center, and boxes regressed to the object from every anchor.
+        """
+        cx, cy, size = self._object_position(call)
+        input_size = 192.0
+        target = np.concatenate(([cx, cy, size, size], (np.array([cx, cy]) + keypoints * size).ravel()))
+
+        outputs = {}
+        for score_info, box_info in zip(score_infos, box_infos):
+            height, width, nb_anchors = score_info.shape
+            ys, xs = np.meshgrid((np.arange(height) + 0.5) / height, (np.arange(width) + 0.5) / width, indexing="ij")
+            anchor_x = np.repeat(xs.ravel(), nb_anchors)
+            anchor_y = np.repeat(ys.ravel(), nb_anchors)
+
+            distance = np.hypot(anchor_x - cx, anchor_y - cy) / size
+            scores = np.where(distance < 0.15, 4.0 - 20.0 * distance, -8.0) + rng.normal(0, 0.1, distance.shape)
+
+            # With fixed size anchors, raw = (target - anchor) * input size for the positions
+            anchor = np.zeros((len(anchor_x), len(target)))
+            anchor[:, 0::2] = anchor_x[:, np.newaxis]
+            anchor[:, 1::2] = anchor_y[:, np.newaxis]
+            anchor[:, 2:4] = 0
+            boxes = (target - anchor) * input_size + rng.normal(0, 0.5, anchor.shape)
+
+            outputs[score_info.name] = np.broadcast_to(scores.reshape(score_info.shape), (nb_images, *score_info.shape))
+            outputs[box_info.name] = np.broadcast_to(boxes.reshape(box_info.shape), (nb_images, *box_info.shape))
+        return outputs
+
+    def _synthetic_face_detector(self, hef : ReplayHef, nb_images : int, call : int, rng : np.random.Generator) -> Dict[str, np.ndarray]:
+        boxes, scores = hef.get_output_vstream_infos()
+        return self._detector_outputs([scores], [boxes], FACE_KEYPOINTS, nb_images, call, rng)
+
+    def _synthetic_palm_detector(self, hef : ReplayHef, nb_images : int, call : int, rng : np.random.Generator) -> Dict[str, np.ndarray]:
+        scores_12, scores_24, boxes_12, boxes_24 = hef.get_output_vstream_infos()
+        return self._detector_outputs([scores_24, scores_12], [boxes_24, boxes_12], PALM_KEYPOINTS, nb_images, call, rng)
+
+    def _synthetic_face_landmark(self, hef : ReplayHef, nb_images : int, call : int, rng : np.random.Generator) -> Dict[str, np.ndarray]:
+        flag_info, landmarks_info = hef.get_output_vstream_infos()
+        resolution = hef.get_input_vstream_infos()[0].shape[0]
+
+        # The mesh spans 2/3 of the ROI (the ROI is 1.5 times the landmarks box) with level eyes
+        landmarks = np.random.default_rng(self.seed).uniform(0.25, 0.75, (468, 3))
+        landmarks[:, 2] = (landmarks[:, 2] - 0.5) * 0.1
+        landmarks[[10, 152, 234, 454], :2] = [[0.5, 1/6], [0.5, 5/6], [1/6, 0.5], [5/6, 0.5]]
+        landmarks[[33, 263], :2] = [[0.3, 0.4], [0.7, 0.4]]
+        landmarks[:, :2] += rng.normal(0, 0.001, (468, 2))
+
+        return {
+            flag_info.name: np.full((nb_images, *flag_info.shape), 0.99),
+            landmarks_info.name: np.broadcast_to((landmarks * resolution).reshape(landmarks_info.shape), (nb_images, *landmarks_info.shape)),
+        }
+
+    def _synthetic_hand_landmark(self, hef : ReplayHef, nb_images : int, call : int, rng : np.random.Generator) -> Dict[str, np.ndarray]:
+        landmarks_info, handedness_info, flag_info, world_info = hef.get_output_vstream_infos()
+        resolution = hef.get_input_vstream_infos()[0].shape[0]
+
+        # The palm spans half of the ROI (the ROI is 2 times the palm box, shifted up by a tenth),
+        # wrist below the middle finger MCP
+        landmarks = np.zeros((21, 3))
+        landmarks[:, 0] = np.linspace(0.25, 0.75, 21)
+        landmarks[:, 1] = np.linspace(0.1, 0.6, 21)
+        landmarks[[0, 1, 2, 3, 5, 6, 9, 10, 13, 14, 17, 18], :2] = [
+            [0.5, 0.8], [0.35, 0.7], [0.25, 0.6], [0.3, 0.5], [0.4, 0.45], [0.4, 0.35],
+            [0.5, 0.4], [0.5, 0.3], [0.6, 0.42], [0.6, 0.32], [0.75, 0.5], [0.7, 0.4],
+        ]
+        landmarks[:, :2] += rng.normal(0, 0.001, (21, 2))
+
+        return {
+            landmarks_info.name: np.broadcast_to((landmarks * resolution).ravel(), (nb_images, *landmarks_info.shape)),
+            handedness_info.name: np.full((nb_images, *handedness_info.shape), 0.9),
+            flag_info.name: np.full((nb_images, *flag_info.shape), 0.99),
+            world_info.name: np.broadcast_to(landmarks.ravel() * 0.1, (nb_images, *world_info.shape)),
+        }
+
+
+class RecordingInferenceEngine():
+    """
+    Wraps an inference engine and records the raw outputs of every `run_all` call, so they can be
+    replayed later by `ReplayInferenceEngine` on a machine without Hailo device.
+
+    Parameters
+    ----------
+    engine : HailoInferenceEngine
+        The engine running the models.
+    output_dir : str
+        Directory where `save` writes one `<hef stem>.npz` per loaded HEF.
+    """
+    def __init__(self, engine, output_dir : str):
+        self.engine = engine
+        self.output_dir = output_dir
+        self.hef_name_list : Dict[int, str] = {}
+        self.recording_list : Dict[int, List[Dict[str, np.ndarray]]] = {}
+
+    @property
+    def hef_list(self) -> list:
+        return self.engine.hef_list
+
+    def load_model(self, hef_path : str) -> int:
+        hef_id = self.engine.load_model(hef_path)
+        self.hef_name_list[hef_id] = os.path.splitext(os.path.basename(hef_path))[0]
+        self.recording_list[hef_id] = []
+        return hef_id
+
+    def get_batch_size(self, hef_id : int) -> int:
+        return self.engine.get_batch_size(hef_id)
+
+    def run_all(self, image : np.ndarray, hef_id : int) -> Dict[str, np.ndarray]:
+        outputs = self.engine.run_all(image, hef_id)
+        self.recording_list[hef_id].append({name: np.array(output) for name, output in outputs.items()})
+        return outputs
+
+    def save(self):
+        """
+        Writes the recorded outputs of every HEF to the output directory.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        for hef_id, recording in self.recording_list.items():
+            hef = self.engine.hef_list[hef_id]
+            path = os.path.join(self.output_dir, self.hef_name_list[hef_id] + ".npz")
+            save_recording(path, hef, recording)
+            logging_default.info(f"Saved {len(recording)} recorded outputs of {self.hef_name_list[hef_id]} to {path}")
+
+def save_recording(path : str, hef, recording : List[Dict[str, np.ndarray]]):
+    """
+    Saves the recorded outputs of a HEF, with the description of its vstreams.
+
+    Parameters
+    ----------
+    path : str
+        Path of the npz file.
+    hef : HEF or ReplayHef
+        The HEF the outputs come from.
+    recording : list[dict[str, np.ndarray]]
+        The outputs of each call, keyed by the output vstream name.
+    """
+    vstream_infos = {
+        "inputs": [[info.name, list(info.shape)] for info in hef.get_input_vstream_infos()],
+        "outputs": [[info.name, list(info.shape)] for info in hef.get_output_vstream_infos()],
+    }
+    arrays = {
+        f"{call:06d}/{name}": output
+        for call, outputs in enumerate(recording)
+        for name, output in outputs.items()
+    }
+    np.savez_compressed(path, **arrays, **{VSTREAM_INFOS_KEY: np.array(json.dumps(vstream_infos))})
+
+def load_recording(path : str) -> tuple[ReplayHef, List[Dict[str, np.ndarray]]]:
+    """
+    Loads the recorded outputs of a HEF saved by `save_recording`.
+
+    Parameters
+    ----------
+    path : str
+        Path of the npz file.
+
+    Returns
+    -------
+    hef : ReplayHef
+        The description of the vstreams of the HEF.
+    recording : list[dict[str, np.ndarray]]
+        The outputs of each call, keyed by the output vstream name.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        vstream_infos = json.loads(str(data[VSTREAM_INFOS_KEY]))
+        hef = ReplayHef(
+            [ReplayVStreamInfo(name, tuple(shape)) for name, shape in vstream_infos["inputs"]],
+            [ReplayVStreamInfo(name, tuple(shape)) for name, shape in vstream_infos["outputs"]],
+        )
+
+        recording : Dict[int, Dict[str, np.ndarray]] = {}
+        for key in data.files:
+            if key == VSTREAM_INFOS_KEY:
+                continue
+            call, name = key.split("/", 1)
+            recording.setdefault(int(call), {})[name] = data[key]
+
+    if not recording:
+        raise ValueError(f"The recording {path} has no outputs")
+    return hef, [recording[call] for call in sorted(recording)]
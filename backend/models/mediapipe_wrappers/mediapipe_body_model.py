@@ -1,10 +1,13 @@
 
+from typing import Optional
+
 import cv2
 import numpy as np
 from mediapipe.python.solutions import pose
 
 from backend.models.base_model import BaseModelInference
 from backend.settings.model_config import PoseConfig
+from backend.utils.frame_context import FrameContext
 from backend.utils.logging import logging_default
 
 
@@ -66,7 +69,7 @@ class MediapipeBodyPoseModel(BaseModelInference):
             self.min_tracking_confidence
         )
     
-    def preprocess(self, image : np.ndarray):
+    def preprocess(self, image : np.ndarray, context : Optional[FrameContext] = None):
         """
         This function is to preprocess the image before going to the Mediapipe model.
         Process an BGR image and return the image in RGB format
@@ -75,10 +78,14 @@ class MediapipeBodyPoseModel(BaseModelInference):
         ----------
         image : np.ndarray
             The image frame of which want to get the face landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, its RGB conversion is shared with the other models
         """
+        if context is not None:
+            return context.rgb()
         return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     
-    def inference(self, image : np.ndarray, preprocessed = True):
+    def inference(self, image : np.ndarray, preprocessed = True, context : Optional[FrameContext] = None):
         """
         Perform the inference, extract the relevant body pose landmarks, 
         and return them as a list of tuples.
@@ -89,6 +96,8 @@ class MediapipeBodyPoseModel(BaseModelInference):
             The input image to process.
         preprocessed : bool, optional
             If True, the image is already preprocessed; otherwise, preprocessing will be done here.
+        context : FrameContext, optional
+            The per frame memo of the original frame, used when the image still needs preprocessing.
 
         Returns
         -------
@@ -107,7 +116,7 @@ class MediapipeBodyPoseModel(BaseModelInference):
             ```
         """
         if not preprocessed:
-            image = self.preprocess(image)
+            image = self.preprocess(image, context)
             
         inference_result = self.body_pose.process(image)
 
@@ -1,10 +1,13 @@
 
+from typing import Optional
+
 import cv2
 import numpy as np
 from mediapipe.python.solutions import face_mesh
 
 from backend.models.base_model import BaseModelInference
 from backend.settings.model_config import FaceMeshConfig
+from backend.utils.frame_context import FrameContext
 from backend.utils.logging import logging_default
 
 
@@ -64,7 +67,7 @@ class MediapipeFaceMeshModel(BaseModelInference):
             min_tracking_confidence = self.min_tracking_confidence
         )
 
-    def preprocess(self, image : np.ndarray):
+    def preprocess(self, image : np.ndarray, context : Optional[FrameContext] = None):
         """
         This function is to preprocess the image before going to the Mediapipe model.
         Process an BGR image and return the image in RGB format
@@ -73,10 +76,14 @@ class MediapipeFaceMeshModel(BaseModelInference):
         ----------
         image : np.ndarray
             The image frame of which want to get the face landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, its RGB conversion is shared with the other models
         """
+        if context is not None:
+            return context.rgb()
         return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
-    def inference(self, image : np.ndarray, preprocessed: bool = True):
+    def inference(self, image : np.ndarray, preprocessed: bool = True, context : Optional[FrameContext] = None):
         """
         Runs the face mesh detection by Mediapipe Library
 
@@ -86,6 +93,8 @@ class MediapipeFaceMeshModel(BaseModelInference):
             Input image (BGR format if preprocessed=False). Expected shape: (H, W, 3).
         preprocessed : bool, optional
             Whether the input image has already been converted to RGB (default is True).
+        context : FrameContext, optional
+            The per frame memo of the original frame, used when the image still needs preprocessing.
 
         Returns
         -------
@@ -94,7 +103,7 @@ class MediapipeFaceMeshModel(BaseModelInference):
             If no faces are detected, returns an empty list.
         """
         if not preprocessed:
-            image = self.preprocess(image)
+            image = self.preprocess(image, context)
 
         inference_result = self.face_mesh.process(image)
 
@@ -1,10 +1,13 @@
 
+from typing import Optional
+
 import cv2
 import numpy as np
 from mediapipe.python.solutions import hands
 
 from backend.models.base_model import BaseModelInference
 from backend.settings.model_config import HandsConfig
+from backend.utils.frame_context import FrameContext
 from backend.utils.logging import logging_default
 
 
@@ -49,7 +52,7 @@ class MediapipeHandsModel(BaseModelInference):
             min_tracking_confidence=self.min_tracking_confidence
         )
 
-    def preprocess(self, image : np.ndarray):
+    def preprocess(self, image : np.ndarray, context : Optional[FrameContext] = None):
         """
         This function is to preprocess the image before going to the Mediapipe model.
         Process an BGR image and return the image in RGB format
@@ -58,10 +61,14 @@ class MediapipeHandsModel(BaseModelInference):
         ----------
         image : np.ndarray
             The image frame of which want to get the face landmark
+        context : FrameContext, optional
+            The per frame memo of `image`, its RGB conversion is shared with the other models
         """
+        if context is not None:
+            return context.rgb()
         return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     
-    def inference(self, image : np.ndarray, preprocessed : bool = True):
+    def inference(self, image : np.ndarray, preprocessed : bool = True, context : Optional[FrameContext] = None):
         """
         Perform inference using the MediaPipe Hands model, extract the relevant hand landmarks,
         and return them as a list of tuples.
@@ -70,6 +77,8 @@ class MediapipeHandsModel(BaseModelInference):
         ----------
         image : cv2.Mat
             The input image to process.
+        context : FrameContext, optional
+            The per frame memo of the original frame, used when the image still needs preprocessing.
 
         Returns
         -------
@@ -98,7 +107,7 @@ class MediapipeHandsModel(BaseModelInference):
             ```
         """
         if not preprocessed:
-            image = self.preprocess(image)
+            image = self.preprocess(image, context)
         inference_result = self.hands_pose.process(image)
         
         hand_landmarks = []
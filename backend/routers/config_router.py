@@ -4,22 +4,17 @@ from fastapi import APIRouter, HTTPException # FastAPI routing and HTTP error ha
 from pydantic import ValidationError #Catching Pydantic validation errors
 
 from backend.domain.dto.base_response import StandardResponse
-from backend.services.drowsiness_detection_service import DrowsinessDetectionService
-from backend.services.phone_detection_service import PhoneDetectionService
+from backend.services.detection_background_service import DetectionBackgroundService
 from backend.settings.app_config import (
     APP_CONFIG_PATH, #File path to app's main config JSON
     PipelineSettings, #Pydantic model for pipeline settings structure/validation
     settings, #App-wide settings holder (likely a singleton/config object)
 )
 from backend.settings.detection_config import DetectionConfig, detection_settings
-from backend.tasks.detection_task import DetectionTask
 
 
-def config_router(
-    drowsiness_service: DrowsinessDetectionService,
-    phone_detection_service: PhoneDetectionService,
-    detection_task : DetectionTask
-):
+def config_router(detection_background_service: DetectionBackgroundService):
+    # The settings apply to the pipelines of every camera
     router = APIRouter() # Create a new APIRouter to register endpoints on
 
     @router.get(
@@ -56,12 +51,13 @@ def config_router(
             detection_settings.save()
 
             # Reinitialize live servcies so changes take effect immediately
-            drowsiness_service.drowsiness_detector.reinitialize_configuration(
-                detection_settings.drowsiness #Pass new drowsines config
-            )
-            phone_detection_service.phone_detection.reinitialize_configuration(
-                detection_settings.phone_detection # Pass new phone detection config
-            )
+            for pipeline in detection_background_service.pipelines.values():
+                pipeline.drowsiness_service.drowsiness_detector.reinitialize_configuration(
+                    detection_settings.drowsiness #Pass new drowsines config
+                )
+                pipeline.phone_detection_service.phone_detection.reinitialize_configuration(
+                    detection_settings.phone_detection # Pass new phone detection config
+                )
 
             #Return a standardized success response
             return StandardResponse(
@@ -100,7 +96,8 @@ def config_router(
                 f.truncate()
             
              # Reinitialize the running detection task/pipeline to pick up new settings immediately
-            detection_task.reinitialize_configuration()
+            for pipeline in detection_background_service.pipelines.values():
+                pipeline.detection_task.reinitialize_configuration()
 
             # Return standardized success response with a boolean data payload
             return StandardResponse(
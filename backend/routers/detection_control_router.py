@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, status #Import FastAPI router, exception type, and HTTP status codes
 
 from backend.domain.dto.base_response import StandardResponse #Standardized response schema for API responses
@@ -6,6 +8,7 @@ from backend.services.detection_background_service import DetectionBackgroundSer
 
 def detection_control_router(detection_service: DetectionBackgroundService) -> APIRouter:
     #Factory function that takes a DetectionBackgroundService instance and returns a configured APIrouter
+    #Every endpoint takes an optional camera_id query parameter, without it they apply to all the cameras
     router = APIRouter()
 
     @router.post(
@@ -13,11 +16,13 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Start the detection background thread.", # OpenAPI description
         response_model=StandardResponse # Responses will be serialized as StandardResponse
     )
-    def start_detection():
+    def start_detection(camera_id: Optional[str] = None):
         #Handler to start the background detection process
         try:
-            status = detection_service.start() # Ask the service to start; returns status/info
+            status = detection_service.start(camera_id) # Ask the service to start; returns status/info
             return StandardResponse(status="success", message="Detection started.", data=status) # Return success with data
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             # On any error, raise a 500 Internal Server Error with details
             raise HTTPException(
@@ -30,11 +35,13 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Re-Start the detection background thread.", # Description (note: typically 'Restart')
         response_model=StandardResponse
     )
-    def restart_detection():
+    def restart_detection(camera_id: Optional[str] = None):
         # Handler to restart the background detection process
         try:
-            status = detection_service.restart() # Restart operation on the service
+            status = detection_service.restart(camera_id) # Restart operation on the service
             return StandardResponse(status="success", message="Detection started.", data=status) # Respond success
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             # On error, return 500 with message
             raise HTTPException(
@@ -47,11 +54,13 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Pause the detection thread.", # Description
         response_model=StandardResponse
     )
-    def pause_detection():
+    def pause_detection(camera_id: Optional[str] = None):
         # Handler to pause the background detection process
         try:
-            status = detection_service.pause() # Pause operation; returns status/info
+            status = detection_service.pause(camera_id) # Pause operation; returns status/info
             return StandardResponse(status="success", message="Detection paused.", data=status) # Respond success
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,11 +72,13 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Resume the paused detection thread.",
         response_model=StandardResponse
     )
-    def resume_detection():
+    def resume_detection(camera_id: Optional[str] = None):
         # Handler to resume a previously paused detection process
         try:
-            status = detection_service.resume() # Resume operation; returns status/info
+            status = detection_service.resume(camera_id) # Resume operation; returns status/info
             return StandardResponse(status="success", message="Detection resumed.", data=status)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -79,11 +90,13 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Stop the detection thread.",
         response_model=StandardResponse
     )
-    def stop_detection():
+    def stop_detection(camera_id: Optional[str] = None):
         # Handler to stop the background detection process
         try:
-            status = detection_service.stop() # Stop operation; returns status/info
+            status = detection_service.stop(camera_id) # Stop operation; returns status/info
             return StandardResponse(status="success", message="Detection stopped.", data=status)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -95,11 +108,11 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
         description="Get the current detection status.",
         response_model=StandardResponse
     )
-    def detection_status():
+    def detection_status(camera_id: Optional[str] = None):
         # Handler to fetch the current status of the detection process
         try:
-            is_alive_thread = detection_service.is_active()
-            is_running = detection_service.is_running
+            is_alive_thread = detection_service.is_active(camera_id)
+            is_running = detection_service.running(camera_id)
             status_msg = "running" if is_alive_thread and is_running else "stopped or paused"
             
             return StandardResponse(
@@ -110,10 +123,33 @@ def detection_control_router(detection_service: DetectionBackgroundService) -> A
                     "is_running": is_running
                 }
             )
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get detection status: {str(e)}"
             )
 
+    @router.get(
+        "/lag", # Endpoint path: GET /lag
+        description="Get the frames dropped to keep up with the camera and the age of the results since their capture, per camera.",
+        response_model=StandardResponse
+    )
+    def detection_lag(camera_id: Optional[str] = None):
+        # Handler to fetch how far behind the camera the published results are
+        try:
+            return StandardResponse(
+                status="success",
+                message="Detection lag statistics.",
+                data=detection_service.lag_stats(camera_id)
+            )
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get detection lag: {str(e)}"
+            )
+
     return router
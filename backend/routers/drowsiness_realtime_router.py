@@ -1,6 +1,8 @@
 import asyncio # For async utilities like sleep and running blocking code in threads
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect # FastAPI router and WebSocket types
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect # FastAPI router and WebSocket types
 from fastapi.responses import StreamingResponse # For streaming HTTP responses (e.g., MJPEG video)
 
 
@@ -9,23 +11,42 @@ from backend.streaming.drowsiness_streaming import (
     stream_processed_drowsiness_feed,# Generator that yields processed (annotated) MJPEG frames
     stream_raw_camera_feed,# Generator that yields raw MJPEG frames
 )
+from backend.streaming.stream_hub import StreamHub # Encodes each frame of a stream once for all its clients
 from backend.utils.frame_buffer import FrameBuffer # Shared buffer providing frames/metrics between producer and API
 from backend.utils.logging import logging_default # App-wide logger
 
 
-def drowsiness_realtime_router(frame_buffer : FrameBuffer):
-    # Factory that receives a FrameBuffer dependency and returns a configured APIRouter
+def drowsiness_realtime_router(frame_buffers : dict[str, FrameBuffer]):
+    # Factory that receives the FrameBuffer of each camera, by camera id, and returns a configured APIRouter
     router = APIRouter() # Create router to register HTTP and WebSocket endpoints
+    default_camera_id = next(iter(frame_buffers))
+
+    # One broadcast hub per stream of each camera, shared by all the clients of the stream
+    hubs = {
+        (camera_id, stream): StreamHub(frame_buffer, stream)
+        for camera_id, frame_buffer in frame_buffers.items()
+        for stream in ("raw", "processed", "debug")
+    }
+
+    def get_frame_buffer(camera_id : Optional[str]) -> Optional[FrameBuffer]:
+        # The endpoints take the camera as a camera_id query parameter, the first camera by default
+        return frame_buffers.get(camera_id or default_camera_id)
+
+    def get_stream_hub(camera_id : Optional[str], stream : str) -> StreamHub:
+        hub = hubs.get((camera_id or default_camera_id, stream))
+        if hub is None:
+            raise HTTPException(status_code=404, detail=f"Unknown camera {camera_id}")
+        return hub
 
     @router.get(
         "/video/raw", # HTTP route serving the raw camera stream
         summary="Live un-edit and raw data of video feed from the camera",
         description="Returns a live video stream (MJPEG). Use a browser instead of Swagger to view."
     )
-    def video_feed():
+    def video_feed(camera_id : Optional[str] = None):
         # Returns a streaming MJPEG response from the raw camera feed
         return StreamingResponse(
-            stream_raw_camera_feed(frame_buffer),
+            stream_raw_camera_feed(get_stream_hub(camera_id, "raw")),
             media_type="multipart/x-mixed-replace; boundary=frame"
         )
 
@@ -34,10 +55,10 @@ def drowsiness_realtime_router(frame_buffer : FrameBuffer):
         summary="Live of processed detection result frame of video feed from the camera",
         description="Returns a live video stream (MJPEG). Use a browser instead of Swagger to view."
     )
-    def video_drowsiness_feed():
+    def video_drowsiness_feed(camera_id : Optional[str] = None):
         # Returns a streaming MJPEG response from the processed drowsiness feed
         return StreamingResponse(
-            stream_processed_drowsiness_feed(frame_buffer), # Generator for annotated frames (e.g., boxes/labels)
+            stream_processed_drowsiness_feed(get_stream_hub(camera_id, "processed")), # Generator for annotated frames (e.g., boxes/labels)
             media_type="multipart/x-mixed-replace; boundary=frame" # MJPEG content type
         )
     
@@ -46,15 +67,20 @@ def drowsiness_realtime_router(frame_buffer : FrameBuffer):
         summary="Live of debug one of detection result frame of video feed from the camera",
         description="Returns a live video stream (MJPEG). Use a browser instead of Swagger to view."
     )
-    def video_debug_feed():
+    def video_debug_feed(camera_id : Optional[str] = None):
         # Returns a streaming MJPEG response for debugging frames
         return StreamingResponse(
-            stream_debug_camera_feed(frame_buffer), # Generator for debug frames
+            stream_debug_camera_feed(get_stream_hub(camera_id, "debug")), # Generator for debug frames
             media_type="multipart/x-mixed-replace; boundary=frame" # MJPEG content type
         )
      
     @router.websocket("/data/facialmetrics") # WebSocket route streaming facial metric data in realtime
-    async def stream_facial_metrics_data(websocket: WebSocket):
+    async def stream_facial_metrics_data(websocket: WebSocket, camera_id : Optional[str] = None):
+        frame_buffer = get_frame_buffer(camera_id)
+        if frame_buffer is None:
+            # Unknown camera: refuse the handshake
+            await websocket.close(code=1008)
+            return
         await websocket.accept() # Accept the WebSocket handshake
         logging_default.info("A client has been connected to WebSocket Facial Metrics")
         try:
@@ -78,7 +104,11 @@ def drowsiness_realtime_router(frame_buffer : FrameBuffer):
             logging_default.info("A client has been disconnected from WebSocket Facial Metrics")
     
     @router.websocket("/notification/drowsiness") # WebSocket route pushing recent drowsiness/yawning events
-    async def stream_recent_drowsiness_data(websocket: WebSocket):
+    async def stream_recent_drowsiness_data(websocket: WebSocket, camera_id : Optional[str] = None):
+        frame_buffer = get_frame_buffer(camera_id)
+        if frame_buffer is None:
+            await websocket.close(code=1008)
+            return
         await websocket.accept() # Accept WebSocket connection
         logging_default.info("A client has been connected to WebSocket Drowsiness Recent Event")
         try:
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.utils.metrics import MetricsRegistry
+
+
+def metrics_router(registry : MetricsRegistry):
+    router = APIRouter()
+
+    @router.get(
+        "/",
+        summary="Get the application metrics",
+        response_class=PlainTextResponse,
+        description="""
+        Latency histograms of the detection stages, models, rendering, encoding and storage,
+        and the frame counters, in the Prometheus text format.
+        """
+    )
+    def get_metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    return router
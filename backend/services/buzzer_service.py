@@ -1,4 +1,5 @@
 import threading
+from typing import Optional
 
 from backend.hardware.buzzer.base_buzzer import BaseBuzzer
 
@@ -13,6 +14,10 @@ class BuzzerService:
         self.buzzer_function = None
         # The background thread that runs the buzzer function
         self.buzzer_thread = None
+        # The buzzer function requested by each camera, the buzzer only stops once none is left
+        self.camera_functions = {}
+        # The cameras run on their own threads and share the buzzer
+        self.lock = threading.Lock()
 
     def beep_buzzer(self, times: int, duration: int, pause: float, frequency: int):
         """
@@ -21,9 +26,10 @@ class BuzzerService:
         """
         self.buzzer.beep(times, duration, pause, frequency)
 
-    def start_buzzer(self, buzzer_function: callable):
+    def start_buzzer(self, buzzer_function: callable, camera_id: str = "default"):
         """
-        Start or update the background buzzer loop with the provided function.
+        Start or update the background buzzer loop with the provided function,
+        on behalf of the camera `camera_id`.
 
         - If no thread is running, create and start a daemon thread that will
           repeatedly call `buzzer_function()` until `stop_buzzer()` is called.
@@ -31,6 +37,11 @@ class BuzzerService:
           - If the new function differs from the current one, swap it in.
           - If it's the same function, do nothing (avoid restarting).
         """
+        with self.lock:
+            self.camera_functions[camera_id] = buzzer_function
+            self._play(buzzer_function)
+
+    def _play(self, buzzer_function: callable):
         # If a background thread is already active...
         if self.buzzer_thread and self.buzzer_thread.is_alive():
             # ...and the requested function differs, update it in-place (hot-swap behavior)
@@ -47,10 +58,13 @@ class BuzzerService:
         self.buzzer_thread = threading.Thread(target=self._buzzer_loop, daemon=True)
         self.buzzer_thread.start()
 
-    def stop_buzzer(self):
+    def stop_buzzer(self, camera_id: Optional[str] = None):
         """
         Stop the background buzzer loop and clean up hardware state.
 
+        - Given a `camera_id`, only withdraw the request of that camera: the buzzer
+          keeps ringing with the function of another camera still requesting it.
+          Without one, stop whatever the cameras requested.
         - Set `keep_beeping` to False so the loop exits gracefully.
         - Clear the function reference.
         - Call `buzzer.cleanup()` to reset/quiet the hardware.
@@ -58,8 +72,18 @@ class BuzzerService:
         Note: We don't join the thread here; since it's a daemon, it will end when the loop exits.
               If you need deterministic shutdown, consider joining the thread.
         """
-        self.keep_beeping = False
-        self.buzzer_function = None
+        with self.lock:
+            if camera_id is None:
+                self.camera_functions.clear()
+            else:
+                self.camera_functions.pop(camera_id, None)
+
+            if self.camera_functions:
+                self._play(next(reversed(self.camera_functions.values())))
+                return
+
+            self.keep_beeping = False
+            self.buzzer_function = None
         # Optional: You could join the thread here to ensure the loop has fully stopped:
         # if self.buzzer_thread and self.buzzer_thread.is_alive():
         #     self.buzzer_thread.join(timeout=1.0)
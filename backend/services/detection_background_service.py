@@ -1,11 +1,7 @@
 import threading
+from typing import Optional
 
-from backend.hardware.camera.base_camera import BaseCamera
-from backend.services.drowsiness_detection_service import DrowsinessDetectionService
-from backend.services.hand_detection_service import HandsDetectionService
-from backend.services.phone_detection_service import PhoneDetectionService
-from backend.tasks.detection_task import DetectionTask
-from backend.utils.frame_buffer import FrameBuffer
+from backend.domain.dto.camera_pipeline import CameraPipeline
 from backend.utils.logging import logging_default
 
 
@@ -19,42 +15,47 @@ class DetectionBackgroundService:
     This class serves as a controller that handles starting, pausing, resuming, 
     and stopping the detection loop.
 
+    Each camera has its own pipeline: detection task, services, frame buffer and thread, the
+    services of each camera having their own models. Every method applies to all the cameras,
+    or to a single one when given its `camera_id`.
+
     Parameters
     ----------
-    detection_task : DetectionTask
-        The task object that contains the core detection loop to be executed.
-    drowsiness_service : DrowsinessDetectionService
-        Service for detecting signs of driver drowsiness.
-    phone_detection_service : PhoneDetectionService
-        Service for detecting phone usage while driving.
-    hand_service : HandsDetectionService
-        Service for detecting hand presence, position, or gestures.
-    camera : BaseCamera
-        Camera interface used to capture video frames in real-time.
-    frame_buffer : FrameBuffer
-        Buffer that holds the latest raw and processed frames for use by other components.
+    pipelines : list[CameraPipeline]
+        The pipeline of each camera, with the task running its detection loop, the detection
+        services, the camera and the frame buffer its frames are published to.
     """
 
-    def __init__(
-        self,
-        detection_task: DetectionTask,
-        drowsiness_service: DrowsinessDetectionService,
-        phone_detection_service: PhoneDetectionService,
-        hand_service: HandsDetectionService,
-        camera: BaseCamera,
-        frame_buffer: FrameBuffer
-    ):
-        self.detection_task = detection_task
-        self.drowsiness_service = drowsiness_service
-        self.phone_detection_service = phone_detection_service
-        self.hand_service = hand_service
-        self.camera = camera
-        self.frame_buffer = frame_buffer
-
-        self.thread = None
-        self.is_running = False
-
-    def start(self) -> bool:
+    def __init__(self, pipelines: list[CameraPipeline]):
+        self.pipelines = {pipeline.camera_id: pipeline for pipeline in pipelines}
+
+    def get_pipeline(self, camera_id: str) -> CameraPipeline:
+        """
+        Returns the pipeline of the camera.
+
+        Raises
+        ------
+        KeyError
+            If there is no camera with this id.
+        """
+        if camera_id not in self.pipelines:
+            raise KeyError(f"Unknown camera {camera_id}")
+        return self.pipelines[camera_id]
+
+    def selected_pipelines(self, camera_id: Optional[str] = None) -> list[CameraPipeline]:
+        if camera_id is None:
+            return list(self.pipelines.values())
+        return [self.get_pipeline(camera_id)]
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the detection of any camera is running, and not paused."""
+        return self.running()
+
+    def running(self, camera_id: Optional[str] = None) -> bool:
+        return any(pipeline.is_running for pipeline in self.selected_pipelines(camera_id))
+
+    def start(self, camera_id: Optional[str] = None) -> bool:
         """
         Starts the detection loop in a background thread.
 
@@ -62,103 +63,127 @@ class DetectionBackgroundService:
         The thread runs the `detection_loop` method of the `DetectionTask`,
         passing all required services and components.
         """
+        return all([self.start_pipeline(pipeline) for pipeline in self.selected_pipelines(camera_id)])
+
+    def start_pipeline(self, pipeline: CameraPipeline) -> bool:
         try:
-            if self.thread and self.thread.is_alive():
-                logging_default.warning("Attempted to start detection, but thread is already running.")
+            if pipeline.thread and pipeline.thread.is_alive():
+                logging_default.warning(f"Attempted to start detection of camera {pipeline.camera_id}, but thread is already running.")
                 return False
             
-            self.is_running = True
-            self.thread = threading.Thread(
-                target=self.detection_task.detection_loop,
+            pipeline.is_running = True
+            pipeline.thread = threading.Thread(
+                target=pipeline.detection_task.detection_loop,
                 args=(
-                    self.drowsiness_service,
-                    self.phone_detection_service,
-                    self.hand_service,
-                    self.camera,
-                    self.frame_buffer,
-                    self
+                    pipeline.drowsiness_service,
+                    pipeline.phone_detection_service,
+                    pipeline.hand_service,
+                    pipeline.camera,
+                    pipeline.frame_buffer,
+                    pipeline
                 ),
+                name=f"detection-{pipeline.camera_id}",
                 daemon=True  # Ensure the thread exits when the main program exits
             )
-            self.thread.start()
-            logging_default.info("Started detection thread.")
+            pipeline.thread.start()
+            logging_default.info(f"Started detection thread of camera {pipeline.camera_id}.")
             return True
         except Exception:
             return False
 
-    def restart(self) -> bool:
+    def restart(self, camera_id: Optional[str] = None) -> bool:
         """
         Restarts the detection background thread by stopping any existing thread
         and then starting a new one.
         """
+        return all([self.restart_pipeline(pipeline) for pipeline in self.selected_pipelines(camera_id)])
+
+    def restart_pipeline(self, pipeline: CameraPipeline) -> bool:
         try:
             # Signal the thread to stop
-            logging_default.info("Restarting detection thread")
-            self.is_running = False
+            logging_default.info(f"Restarting detection thread of camera {pipeline.camera_id}")
+            pipeline.is_running = False
+            pipeline.detection_task.stop()
 
             # Check whether old thread is active, if it's true
-            # kill the thread, and make the new thread
-            if self.thread and self.thread.is_alive():
+            # wait for it to stop its stages before making the new thread
+            if pipeline.thread and pipeline.thread.is_alive():
                 logging_default.info("Waiting for existing thread to finish.")
-                self.thread.join(timeout=1)
+                pipeline.thread.join(timeout=5)
+                if pipeline.thread.is_alive():
+                    logging_default.warning(f"Detection thread of camera {pipeline.camera_id} didn't stop, not restarting it.")
+                    return False
 
-            self.thread = None
+            pipeline.thread = None
             # Now start a new detection thread
-            return self.start()
+            return self.start_pipeline(pipeline)
         except Exception:
             return False
         
-    def pause(self) -> bool:
+    def pause(self, camera_id: Optional[str] = None) -> bool:
         """
         Pauses the detection loop.
 
         Sets the `is_running` flag to False. It is up to the detection loop
         to periodically check this flag and pause processing accordingly.
         """
-        self.is_running = False
-        self.drowsiness_service.buzzer_service.stop_buzzer()
-        logging_default.info("Detection paused.")
-        return not self.is_running
+        for pipeline in self.selected_pipelines(camera_id):
+            pipeline.is_running = False
+            pipeline.drowsiness_service.buzzer_service.stop_buzzer(pipeline.camera_id)
+        logging_default.info(f"Detection paused ({camera_id or 'all cameras'}).")
+        return not self.running(camera_id)
 
-    def resume(self) -> bool:
+    def resume(self, camera_id: Optional[str] = None) -> bool:
         """
         Resumes the detection loop if it has been paused.
 
         Sets the `is_running` flag to True. The detection loop should use
         this flag to determine whether to continue processing.
         """
-        self.is_running = True
-        logging_default.info("Detection resumed.")
-        return self.is_running
+        for pipeline in self.selected_pipelines(camera_id):
+            pipeline.is_running = True
+        logging_default.info(f"Detection resumed ({camera_id or 'all cameras'}).")
+        return self.running(camera_id)
 
-    def stop(self):
+    def stop(self, camera_id: Optional[str] = None):
         """
         Stops the detection loop and attempts to join the thread.
 
         Sets the `is_running` flag to False and waits for the thread to finish.
         A timeout is used to prevent indefinite blocking.
         """
+        pipelines = self.selected_pipelines(camera_id)
         try:
-            logging_default.info("Stopping detection thread.")
-            self.is_running = False
-            if self.thread:
-                self.thread.join(timeout=5)
-                logging_default.info("Detection thread joined successfully.")
-            self.thread = None
+            # Signal every camera first, so their threads wind down together
+            for pipeline in pipelines:
+                logging_default.info(f"Stopping detection thread of camera {pipeline.camera_id}.")
+                pipeline.is_running = False
+                pipeline.detection_task.stop()
+            for pipeline in pipelines:
+                if pipeline.thread:
+                    pipeline.thread.join(timeout=5)
+                    logging_default.info(f"Detection thread of camera {pipeline.camera_id} joined successfully.")
+                pipeline.thread = None
             return True
         except Exception:
             return False
 
-    def is_active(self) -> bool:
+    def lag_stats(self, camera_id: Optional[str] = None) -> dict[str, dict]:
+        """
+        Returns the dropped frames and the capture to result age of each camera, see `DetectionTask.lag_stats`.
+        """
+        return {pipeline.camera_id: pipeline.detection_task.lag_stats() for pipeline in self.selected_pipelines(camera_id)}
+
+    def is_active(self, camera_id: Optional[str] = None) -> bool:
         """
         Checks whether the detection loop is currently running in a thread.
 
         Returns
         -------
         bool
-            True if the background thread is alive and the detection is active; 
-            False otherwise.
+            True if the background thread of the camera, or of any camera when no
+            `camera_id` is given, is alive; False otherwise.
         """
-        active = self.thread is not None and self.thread.is_alive()
+        active = any(pipeline.thread is not None and pipeline.thread.is_alive() for pipeline in self.selected_pipelines(camera_id))
         logging_default.debug(f"Detection thread active: {active}")
-        return active
\ No newline at end of file
+        return active
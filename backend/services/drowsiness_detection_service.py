@@ -1,5 +1,6 @@
 import datetime
 import time
+from typing import Optional
 
 import cv2
 import numpy as np
@@ -8,6 +9,7 @@ from uuid6 import uuid7
 from backend.domain.dto.drowsiness_detection_result import DrowsinessDetectionResult
 from backend.domain.entity.drowsiness_event import DrowsinessEvent
 from backend.lib.drowsiness_detection import DrowsinessDetection
+from backend.lib.model_process import model_processes, model_processes_enabled
 from backend.lib.socket_trigger import SocketTrigger
 from backend.services.buzzer_service import BuzzerService
 from backend.services.drowsiness_event_service import DrowsinessEventService
@@ -18,7 +20,10 @@ from backend.utils.drawing_utils import (
     draw_face_bounding_box,
     draw_head_pose_direction,
     draw_landmarks,
+    draw_triangle_masking,
 )
+from backend.utils.frame_context import FrameContext
+from backend.utils.frame_pool import frame_pool
 from backend.utils.landmark_constants import (
     INNER_LIPS_CONNECTIONS,
     LEFT_EYE_CONNECTIONS,
@@ -28,15 +33,22 @@ from backend.utils.landmark_constants import (
     RIGHT_EYEBROW_CONNECTIONS,
 )
 from backend.utils.logging import logging_default
+from backend.utils.metrics import timed
 
 
 class DrowsinessDetectionService:
-    def __init__(self, buzzer_service : BuzzerService, socket_trigger : SocketTrigger, drowsiness_event_service: DrowsinessEventService):
+    def __init__(self, buzzer_service : BuzzerService, socket_trigger : SocketTrigger, drowsiness_event_service: DrowsinessEventService,
+                 camera_id : str = "default"):
         logging_default.info("Initiated Drowsiness Services")
 
         self.buzzer_service = buzzer_service
         self.socket_trigger = socket_trigger
-        self.drowsiness_detector = DrowsinessDetection(model_settings.face, detection_settings.drowsiness ,inference_engine=settings.PipelineSettings.inference_engine)
+        self.camera_id = camera_id
+        if model_processes_enabled(settings.PipelineSettings):
+            self.drowsiness_detector = model_processes.get("drowsiness", settings.PipelineSettings.inference_engine, camera_id)
+        else:
+            # Each camera gets its own model, the tracking of the landmarks carries from one frame to the next
+            self.drowsiness_detector = DrowsinessDetection(model_settings.face, detection_settings.drowsiness ,inference_engine=settings.PipelineSettings.inference_engine, camera_id=camera_id)
         self.drowsiness_event_service = drowsiness_event_service
 
         self.drowsiness_start_time = None
@@ -45,7 +57,7 @@ class DrowsinessDetectionService:
         self.drowsiness_notification_flag_sent = False
         self.yawning_notification_flag_sent = False
 
-    def process_frame(self, frame : np.ndarray) -> DrowsinessDetectionResult:
+    def process_frame(self, frame : np.ndarray, context : Optional[FrameContext] = None, render_debug : bool = True) -> DrowsinessDetectionResult:
         """
         This function is to process the frame and run models to achieve the
         drowsiness detection. This class service will also hold the logic to count
@@ -65,6 +77,10 @@ class DrowsinessDetectionService:
             The image frame of which want to get drowsiness detection service result
         processed_frame : np.ndarray
             The image frame of which we want the draw happens
+        context : FrameContext, optional
+            The per frame memo of `frame`, shared with the other services run on the same frame
+        render_debug : bool, optional
+            Whether to draw the `debug_frame` of the result, skipped when nobody watches the debug stream (default is True)
 
         Return
         ----------
@@ -72,7 +88,10 @@ class DrowsinessDetectionService:
             An Image that has been process by the model, with landmark's draw has been
             draw directly to the image
         """
-        detection_result = self.drowsiness_detector.detects(frame)
+        detection_result = self.drowsiness_detector.detects(frame, context)
+
+        # The event images are saved at the capture resolution, even when the models get a downscaled frame
+        snapshot_frame = context.full_frame if context is not None else frame
         
         if detection_result.faces:
             # I'll just only buzzer the first face detected index for easier buzzer
@@ -86,15 +105,15 @@ class DrowsinessDetectionService:
                 duration = time.time() - self.drowsiness_start_time
 
                 if 2 <= duration < 5:
-                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_first_stage)
+                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_first_stage, self.camera_id)
                 elif 5 <= duration < 10:
-                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_second_stage)
+                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_second_stage, self.camera_id)
                 elif duration >= 10:
-                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_third_stage)
+                    self.buzzer_service.start_buzzer(self.buzzer_service.buzzer.beep_third_stage, self.camera_id)
 
                 if not self.drowsiness_notification_flag_sent:
                     image_uuid = uuid7()
-                    self.socket_trigger.save_image(frame, image_uuid, 'DROWSINESS', '', 'UPLOAD_IMAGE')
+                    self.socket_trigger.save_image(snapshot_frame, image_uuid, 'DROWSINESS', '', 'UPLOAD_IMAGE')
                     event = DrowsinessEvent(
                         id=image_uuid,
                         vehicle_identification=settings.ApiSettings.vehicle_id,
@@ -114,14 +133,15 @@ class DrowsinessDetectionService:
 
                 self.drowsiness_start_time = None
                 self.drowsiness_notification_flag_sent = False
-                self.buzzer_service.stop_buzzer()
+                # Only withdraw the alarm of this camera, another one may still see a drowsy driver
+                self.buzzer_service.stop_buzzer(self.camera_id)
 
             # Handle yawning logic
             if face_state.is_yawning:
                 if not self.yawning_notification_flag_sent:
                     image_uuid = uuid7()
                     logging_default.info("Driver appears to be yawning. Triggering notification.")
-                    self.socket_trigger.save_image(frame, image_uuid, 'YAWNING', '', 'UPLOAD_IMAGE')
+                    self.socket_trigger.save_image(snapshot_frame, image_uuid, 'YAWNING', '', 'UPLOAD_IMAGE')
                     event = DrowsinessEvent(
                         id=image_uuid,
                         vehicle_identification=settings.ApiSettings.vehicle_id,
@@ -138,11 +158,13 @@ class DrowsinessDetectionService:
                 self.yawning_notification_flag_sent = False
 
         # Draw the annotate in the frame to save them into the result so in task orchestrator can get them
-        detection_result.debug_frame = self.draw(frame, detection_result, detection_settings.drowsiness.apply_masking)
+        if render_debug:
+            with timed("render_seconds", frame="debug", model="face"):
+                detection_result.debug_frame = self.draw(frame, detection_result, detection_settings.drowsiness.apply_masking)
 
         return detection_result
     
-    def draw(self, frame : np.ndarray, result : DrowsinessDetectionResult, draw_masking : bool) -> np.ndarray:
+    def draw(self, frame : np.ndarray, result : DrowsinessDetectionResult, draw_masking : bool, copy : bool = True) -> np.ndarray:
         """
         Draws visual annotations on the processed video frame for detected faces, including 
         bounding boxes, facial landmarks, and detection results such as drowsiness, yawning, 
@@ -158,32 +180,26 @@ class DrowsinessDetectionService:
             information about each detected face, such as landmarks, drowsiness state, yawning state,
             and head pose angles.
 
+        draw_masking : bool
+            Whether to draw the masking triangle.
+
+        copy : bool, optional
+            Whether to draw on a copy of the frame taken from the frame pool, or directly on `frame` (default is True).
+
         Returns
         -------
         np.ndarray
             The annotated image frame with visual indicators for each detected face.
         """
-        annotated_frame = frame.copy()
+        annotated_frame = frame_pool.copy(frame) if copy else frame
 
         # Draw masking
         if draw_masking:
-            height, width = annotated_frame.shape[:2]
-            bottom_left = (0, height - 1)
-            bottom_right = (width - 1, height - 1)
-            top_middle = (width // 2, 0)
-
-            # Draw the masking and the points
-            triangle_cnt = np.array([bottom_left, bottom_right, top_middle], dtype=np.int32)
-            cv2.polylines(annotated_frame, [triangle_cnt], isClosed=True, color=(0, 255, 0), thickness=2)
-            cv2.circle(annotated_frame, top_middle, radius=6, color=(0, 0, 255), thickness=-1)
-            overlay = annotated_frame.copy()
-            cv2.fillPoly(overlay, [triangle_cnt], color=(0, 0, 0))
-            alpha = 0.5
-            annotated_frame = cv2.addWeighted(overlay, alpha, annotated_frame, 1 - alpha, 0)
+            draw_triangle_masking(annotated_frame)
 
         for face in result.faces:
             landmark = face.face_landmark
-            if not landmark:
+            if landmark is None or len(landmark) == 0:
                 continue 
 
             # Draw bounding box (you must have your own method for this)
@@ -1,5 +1,6 @@
 import datetime
 import os
+from threading import Lock
 from typing import List
 from uuid import UUID
 
@@ -7,6 +8,7 @@ from sqlmodel import Session, select
 
 from backend.domain.entity.drowsiness_event import DrowsinessEvent
 from backend.utils.logging import logging_default
+from backend.utils.metrics import timed
 
 
 class DrowsinessEventService:
@@ -23,6 +25,9 @@ class DrowsinessEventService:
         """
         self.session = session
 
+        # The detection pipelines of the cameras write their events through the same session
+        self.lock = Lock()
+
     def create_event(self, event: DrowsinessEvent) -> DrowsinessEvent:
         """
         Creates and saves a new DrowsinessEvent to the database.
@@ -43,9 +48,10 @@ class DrowsinessEventService:
             if isinstance(event.timestamp, str):
                 event.timestamp = datetime.datetime.fromisoformat(event.timestamp)
 
-            self.session.add(event)
-            self.session.commit()
-            self.session.refresh(event)
+            with self.lock, timed("db_write_seconds", table="drowsiness_event"):
+                self.session.add(event)
+                self.session.commit()
+                self.session.refresh(event)
             return event
         except Exception as e:
             logging_default.error(f"Error while creating DrowsinessEvent: {str(e)}")
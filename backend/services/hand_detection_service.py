@@ -1,28 +1,39 @@
 
+from typing import Optional
+
 import numpy as np
 
 from backend.domain.dto.hands_detection_result import HandsDetectionResult
 from backend.lib.hands_detection import HandsDetection
+from backend.lib.model_process import model_processes, model_processes_enabled
 from backend.lib.socket_trigger import SocketTrigger
 from backend.settings.app_config import settings
 from backend.settings.model_config import model_settings
 from backend.utils.drawing_utils import (
     draw_landmarks,
 )
+from backend.utils.frame_context import FrameContext
+from backend.utils.frame_pool import frame_pool
 from backend.utils.landmark_constants import (
     HAND_CONNECTIONS,
 )
 from backend.utils.logging import logging_default
+from backend.utils.metrics import timed
 
 
 class HandsDetectionService:
-    def __init__(self, socket_trigger : SocketTrigger):
+    def __init__(self, socket_trigger : SocketTrigger, camera_id : str = "default"):
         logging_default.info("Initiated Hands Detection Service")
 
-        self.hand_detector = HandsDetection(model_settings.hands, inference_engine=settings.PipelineSettings.inference_engine)
+        self.camera_id = camera_id
+        if model_processes_enabled(settings.PipelineSettings):
+            self.hand_detector = model_processes.get("hands", settings.PipelineSettings.inference_engine, camera_id)
+        else:
+            # Each camera gets its own model, the tracking of the landmarks carries from one frame to the next
+            self.hand_detector = HandsDetection(model_settings.hands, inference_engine=settings.PipelineSettings.inference_engine, camera_id=camera_id)
         self.socket_trigger = socket_trigger
     
-    def process_frame(self, frame : np.ndarray) -> HandsDetectionResult:
+    def process_frame(self, frame : np.ndarray, context : Optional[FrameContext] = None, render_debug : bool = True) -> HandsDetectionResult:
         """
         This function is to process the frame and run models to achieve the
         hands detection. This class service will also hold the logic to count
@@ -42,6 +53,10 @@ class HandsDetectionService:
             The image frame of which want to get hands detection service result
         processed_frame : np.ndarray
             The image frame of which we want the draw happens
+        context : FrameContext, optional
+            The per frame memo of `frame`, shared with the other services run on the same frame
+        render_debug : bool, optional
+            Whether to draw the `debug_frame` of the result, skipped when nobody watches the debug stream (default is True)
 
         Return
         ----------
@@ -49,14 +64,16 @@ class HandsDetectionService:
             An Image that has been process by the model, with landmark's draw has been
             draw directly to the image
         """
-        detection_result = self.hand_detector.detect(frame)
+        detection_result = self.hand_detector.detect(frame, context)
         
         # Draw the annotate in the frame to save them into the result so in task orchestrator can get them
-        detection_result.debug_frame = self.draw(frame, detection_result)
+        if render_debug:
+            with timed("render_seconds", frame="debug", model="hands"):
+                detection_result.debug_frame = self.draw(frame, detection_result)
 
         return detection_result
     
-    def draw(self, frame : np.ndarray, result : HandsDetectionResult) -> np.ndarray:
+    def draw(self, frame : np.ndarray, result : HandsDetectionResult, copy : bool = True) -> np.ndarray:
         """
         Draws hand landmarks on the processed video frame for each detected hand.
 
@@ -69,12 +86,15 @@ class HandsDetectionService:
             The detection result containing a list of hand states. Each hand state may include
             hand landmarks if a hand is detected in the frame.
 
+        copy : bool, optional
+            Whether to draw on a copy of the frame taken from the frame pool, or directly on `frame` (default is True).
+
         Returns
         -------
         np.ndarray
             The annotated image frame with hand landmarks drawn.
         """
-        annotated_frame = frame.copy()
+        annotated_frame = frame_pool.copy(frame) if copy else frame
         for hand_state in result.hands:
             if hand_state.hand_landmark is not None:
                 draw_landmarks(annotated_frame, hand_state.hand_landmark, HAND_CONNECTIONS, color_points=(0, 0, 0))
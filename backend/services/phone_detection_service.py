@@ -1,8 +1,11 @@
 
+from typing import Optional
+
 import cv2
 import numpy as np
 
 from backend.domain.dto.phone_detection_result import PhoneDetectionResult
+from backend.lib.model_process import model_processes, model_processes_enabled
 from backend.lib.phone_detection import PhoneDetection
 from backend.lib.socket_trigger import SocketTrigger
 from backend.settings.app_config import settings
@@ -11,20 +14,28 @@ from backend.settings.model_config import model_settings
 from backend.utils.drawing_utils import (
     draw_landmarks,
 )
+from backend.utils.frame_context import FrameContext
+from backend.utils.frame_pool import frame_pool
 from backend.utils.landmark_constants import (
     BODY_POSE_FACE_CONNECTIONS,
 )
 from backend.utils.logging import logging_default
+from backend.utils.metrics import timed
 
 
 class PhoneDetectionService:
-    def __init__(self, socket_trigger : SocketTrigger):
+    def __init__(self, socket_trigger : SocketTrigger, camera_id : str = "default"):
         logging_default.info("Initiated Phone Detection Service")
 
-        self.phone_detection = PhoneDetection(model_settings.pose, detection_settings.phone_detection , inference_engine=settings.PipelineSettings.inference_engine)
+        self.camera_id = camera_id
+        if model_processes_enabled(settings.PipelineSettings):
+            self.phone_detection = model_processes.get("phone", settings.PipelineSettings.inference_engine, camera_id)
+        else:
+            # Each camera gets its own model, the tracking of the landmarks carries from one frame to the next
+            self.phone_detection = PhoneDetection(model_settings.pose, detection_settings.phone_detection , inference_engine=settings.PipelineSettings.inference_engine, camera_id=camera_id)
         self.socket_trigger = socket_trigger
     
-    def process_frame(self, frame : np.ndarray) -> PhoneDetectionResult:
+    def process_frame(self, frame : np.ndarray, context : Optional[FrameContext] = None, render_debug : bool = True) -> PhoneDetectionResult:
         """
         This function is to process the frame and run models to achieve the
         phone detection. This class service will also hold the logic to count
@@ -44,6 +55,10 @@ class PhoneDetectionService:
             The image frame of which want to get phone detection service result
         processed_frame : np.ndarray
             The image frame of which we want the draw happens
+        context : FrameContext, optional
+            The per frame memo of `frame`, shared with the other services run on the same frame
+        render_debug : bool, optional
+            Whether to draw the `debug_frame` of the result, skipped when nobody watches the debug stream (default is True)
 
         Return
         ----------
@@ -51,14 +66,16 @@ class PhoneDetectionService:
             An Image that has been process by the model, with landmark's draw has been
             draw directly to the image
         """
-        detection_result = self.phone_detection.detect(frame)
+        detection_result = self.phone_detection.detect(frame, context)
 
         # Draw the annotate in the frame to save them into the result so in task orchestrator can get them
-        detection_result.debug_frame = self.draw(frame, detection_result)
+        if render_debug:
+            with timed("render_seconds", frame="debug", model="pose"):
+                detection_result.debug_frame = self.draw(frame, detection_result)
         
         return detection_result
     
-    def draw(self, frame : np.ndarray, result : PhoneDetectionResult) -> np.ndarray:
+    def draw(self, frame : np.ndarray, result : PhoneDetectionResult, copy : bool = True) -> np.ndarray:
         """
         Draws visual annotations on the processed video frame for phone usage detection,
         including call status, estimated distance to the person, and body pose landmarks.
@@ -72,12 +89,15 @@ class PhoneDetectionService:
             The result object containing phone usage detection data. Each item in `result.detection`
             may include the calling status, distance estimate, and body pose landmarks.
 
+        copy : bool, optional
+            Whether to draw on a copy of the frame taken from the frame pool, or directly on `frame` (default is True).
+
         Returns
         -------
         np.ndarray
             The annotated image frame with phone usage indicators and pose visualizations.
         """
-        annotated_frame = frame.copy()
+        annotated_frame = frame_pool.copy(frame) if copy else frame
 
         for phone_state in result.detection:
             # Draw the annotated text marking it's calling
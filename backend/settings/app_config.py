@@ -1,4 +1,5 @@
 import json
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
@@ -9,6 +10,34 @@ class PipelineSettings(BaseModel):
     phone_detection_model_run: bool
     hands_detection_model_run: bool
     inference_engine : str
+    concurrent_models : bool = False
+    model_timeout : float = 1.0
+    target_fps : float = 0.0
+    drowsiness_model_interval : int = 1
+    phone_detection_model_interval : int = 1
+    hands_detection_model_interval : int = 1
+    process_models : bool = False
+
+class CameraSettings(BaseModel):
+    camera_id : str = "driver"
+    type : Literal["live", "file", "network"] = "live"
+    source : int = 0
+    threaded_capture : bool = True
+    # Capture format asked to the live camera, 0 or "" keep the driver default
+    width : int = 0
+    height : int = 0
+    fps : float = 0.0
+    fourcc : str = ""
+    buffer_size : int = 1
+    # Largest (width, height) of the frame given to the models, None runs them at the capture resolution
+    inference_resolution : Optional[tuple[int, int]] = None
+    file_path : str = ""
+    file_mode : Literal["realtime", "max"] = "realtime"
+    file_loop : bool = True
+    file_fps : float = 0.0
+    url : str = ""
+    reconnect_backoff : float = 0.5
+    reconnect_max_backoff : float = 10.0
 
 class ConnectionStrings(BaseModel):
     db_connections: str
@@ -25,6 +54,7 @@ class AppConfig(BaseModel):
     PipelineSettings: PipelineSettings
     ConnectionStrings: ConnectionStrings
     ApiSettings: ApiSettings
+    Cameras : list[CameraSettings] = [CameraSettings()]
 
     @classmethod
     def load(cls, path: str = APP_CONFIG_PATH):
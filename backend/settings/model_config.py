@@ -10,6 +10,7 @@ class FaceMeshConfig(BaseModel):
     max_number_face_detection: int
     min_detection_confidence: float
     min_tracking_confidence: float
+    redetection_interval: int = 30
 
 class PoseConfig(BaseModel):
     min_detection_confidence: float
@@ -22,6 +23,7 @@ class PoseConfig(BaseModel):
 class HandsConfig(BaseModel):
     min_detection_confidence: float
     min_tracking_confidence: float
+    redetection_interval: int = 30
 
 class ModelConfig(BaseModel):
     face: FaceMeshConfig
@@ -0,0 +1,89 @@
+import time
+from threading import Lock
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from backend.utils.frame_buffer import FrameBuffer
+from backend.utils.metrics import metrics
+
+# Seconds between two looks at the frame buffer, caps a client at about 30 FPS
+POLL_INTERVAL = 0.03
+
+
+class StreamHub:
+    """
+    Broadcasts a stream of the frame buffer ("raw", "processed" or "debug") to all its MJPEG
+    clients, encoding each new frame once whatever the number of clients.
+
+    The first client to see a new frame encodes it, the others get the same bytes. A client only
+    ever gets the latest encoded frame: a slow client skips the frames published while it was
+    sending, nothing is queued for it, and a client joining gets the latest encoded frame at once.
+
+    The hub keeps a reference to the last encoded frame, so the frame pool doesn't reuse its buffer
+    and a new frame can be told apart by identity.
+
+    Parameters
+    ----------
+    frame_buffer : FrameBuffer
+        The frame buffer of the camera.
+    stream : str
+        The stream to broadcast, "raw", "processed" or "debug".
+    """
+    def __init__(self, frame_buffer : FrameBuffer, stream : str):
+        getters = {"raw": frame_buffer.get_raw, "processed": frame_buffer.get_processed, "debug": frame_buffer.get_debug}
+        if stream not in getters:
+            raise ValueError(f"Unknown stream {stream}, expected one of {list(getters)}")
+        self.frame_buffer = frame_buffer
+        self.stream = stream
+        self.get_frame = getters[stream]
+
+        self.frame : Optional[np.ndarray] = None
+        self.part : Optional[bytes] = None
+        self.version = 0
+        self.encode_count = 0
+        self.lock = Lock()
+
+        self.encode_histogram = metrics.histogram("jpeg_encode_seconds", stream=stream, camera=frame_buffer.camera_id)
+        self.skipped_counter = metrics.counter("stream_frames_skipped_total", stream=stream, camera=frame_buffer.camera_id)
+
+    def latest(self) -> tuple[int, Optional[bytes]]:
+        """
+        Returns the latest encoded frame as a multipart part with its version, encoding the frame
+        of the buffer first if it is a new one. The version is 0 until a frame is encoded.
+        """
+        with self.lock:
+            frame = self.get_frame()
+            if frame is not None and frame is not self.frame:
+                with self.encode_histogram.time():
+                    success, buffer = cv2.imencode('.jpg', frame)
+                if success:
+                    self.frame = frame
+                    self.part = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n'
+                    self.version += 1
+                    self.encode_count += 1
+            return self.version, self.part
+
+    def subscribe(self) -> Iterator[bytes]:
+        """
+        Yields the multipart parts of the stream for one client, until the client disconnects.
+        """
+        self.frame_buffer.acquire(self.stream)
+        try:
+            sent_version = 0
+            while True:
+                version, part = self.latest()
+                if part is None or version == sent_version:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+
+                if sent_version and version > sent_version + 1:
+                    self.skipped_counter.inc(version - sent_version - 1)
+                sent_version = version
+                yield part
+
+                time.sleep(POLL_INTERVAL)
+        finally:
+            # Reached when the client disconnects and the response closes the generator
+            self.frame_buffer.release(self.stream)
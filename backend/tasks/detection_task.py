@@ -1,9 +1,14 @@
 import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
 
 import cv2
 import numpy as np
 
+from backend.domain.dto.frame_packet import FramePacket
 from backend.hardware.camera.base_camera import BaseCamera
 from backend.services.drowsiness_detection_service import DrowsinessDetectionService
 from backend.services.hand_detection_service import HandsDetectionService
@@ -14,35 +19,98 @@ from backend.utils.drawing_utils import (
     draw_timestamp,
 )
 from backend.utils.frame_buffer import FrameBuffer
+from backend.utils.frame_context import FrameContext
+from backend.utils.frame_pacer import FramePacer
+from backend.utils.frame_pool import frame_pool
+from backend.utils.latest_value_queue import LatestValueQueue
 from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
+
+MODEL_NAMES = ("drowsiness", "phone", "hands")
+
+# Number of the latest published frames the lag statistics are computed on
+LAG_WINDOW = 100
 
 
 class DetectionTask:
-    def __init__(self):
+    def __init__(self, camera_id : str = "default", inference_resolution : Optional[tuple[int, int]] = None):
+        self.camera_id = camera_id
+        # Largest (width, height) of the frame given to the models, the streams keep the capture resolution
+        self.inference_resolution = inference_resolution
+        self.pacer = FramePacer()
         self.load_configuration()
 
+        # Stop event and stage queues of the latest run of the detection loop
+        self.stop_event, self.queues = self.create_run()
+        # Last frame published to the frame buffer for each stream, the publish stage owns them
+        self.published_frames : dict[str, Optional[np.ndarray]] = {}
+
+        self.stage_histograms = {name: metrics.histogram("detection_stage_seconds", stage=name, camera=camera_id) for name in ("capture", "inference", "render", "publish")}
+        self.captured_counter = metrics.counter("frames_captured_total", camera=camera_id)
+        self.processed_render_histogram = metrics.histogram("render_seconds", frame="processed", camera=camera_id)
+        self.debug_render_histogram = metrics.histogram("render_seconds", frame="debug_combine", camera=camera_id)
+
+        # Age of the frames since their capture, when the models start on them and once their result is published
+        self.inference_age_histogram = metrics.histogram("frame_age_seconds", point="inference", camera=camera_id)
+        self.result_age_histogram = metrics.histogram("frame_age_seconds", point="result", camera=camera_id)
+        self.captured_count = 0
+        self.published_count = 0
+        self.result_ages : deque[float] = deque(maxlen=LAG_WINDOW)
+
+        # Worker pool of the concurrent models mode, and the last future submitted for each model
+        self.executor : Optional[ThreadPoolExecutor] = None
+        self.model_futures : dict[str, Future] = {}
+        self.model_timeout_count = 0
+        self.model_busy_skip_count = 0
+
+        # Index of the frames run by the inference stage, and the latest result of each model
+        self.frame_index = 0
+        self.latest_results : dict[str, Any] = {}
+
     def load_configuration(self):
         self.drowsiness_model_run = settings.PipelineSettings.drowsiness_model_run
         self.phone_detection_model_run = settings.PipelineSettings.phone_detection_model_run
         self.hands_detection_model_run = settings.PipelineSettings.hands_detection_model_run
+        self.concurrent_models = settings.PipelineSettings.concurrent_models
+        self.model_timeout = settings.PipelineSettings.model_timeout
+        self.model_intervals = {
+            "drowsiness": max(1, settings.PipelineSettings.drowsiness_model_interval),
+            "phone": max(1, settings.PipelineSettings.phone_detection_model_interval),
+            "hands": max(1, settings.PipelineSettings.hands_detection_model_interval),
+        }
+        self.pacer.set_target_fps(settings.PipelineSettings.target_fps)
 
         logging_default.info(
-            "Loaded config - drowsiness_model_run: {drowsiness_model_run}, phone_detection_model_run: {phone_detection_model_run}, hands_detection_model_run: {hands_detection_model_run}",
+            "Loaded config - drowsiness_model_run: {drowsiness_model_run}, phone_detection_model_run: {phone_detection_model_run}, hands_detection_model_run: {hands_detection_model_run}, concurrent_models: {concurrent_models}, target_fps: {target_fps}, model_intervals: {model_intervals}",
             drowsiness_model_run=self.drowsiness_model_run,
             phone_detection_model_run=self.phone_detection_model_run,
-            hands_detection_model_run=self.hands_detection_model_run
+            hands_detection_model_run=self.hands_detection_model_run,
+            concurrent_models=self.concurrent_models,
+            target_fps=self.pacer.target_fps,
+            model_intervals=self.model_intervals
         )
     
     def reinitialize_configuration(self):
         self.drowsiness_model_run = settings.PipelineSettings.drowsiness_model_run
         self.phone_detection_model_run = settings.PipelineSettings.phone_detection_model_run
         self.hands_detection_model_run = settings.PipelineSettings.hands_detection_model_run
+        self.concurrent_models = settings.PipelineSettings.concurrent_models
+        self.model_timeout = settings.PipelineSettings.model_timeout
+        self.model_intervals = {
+            "drowsiness": max(1, settings.PipelineSettings.drowsiness_model_interval),
+            "phone": max(1, settings.PipelineSettings.phone_detection_model_interval),
+            "hands": max(1, settings.PipelineSettings.hands_detection_model_interval),
+        }
+        self.pacer.set_target_fps(settings.PipelineSettings.target_fps)
 
         logging_default.info(
-            "Re-Loaded config - drowsiness_model_run: {drowsiness_model_run}, phone_detection_model_run: {phone_detection_model_run}, hands_detection_model_run: {hands_detection_model_run}",
+            "Re-Loaded config - drowsiness_model_run: {drowsiness_model_run}, phone_detection_model_run: {phone_detection_model_run}, hands_detection_model_run: {hands_detection_model_run}, concurrent_models: {concurrent_models}, target_fps: {target_fps}, model_intervals: {model_intervals}",
             drowsiness_model_run=self.drowsiness_model_run,
             phone_detection_model_run=self.phone_detection_model_run,
-            hands_detection_model_run=self.hands_detection_model_run
+            hands_detection_model_run=self.hands_detection_model_run,
+            concurrent_models=self.concurrent_models,
+            target_fps=self.pacer.target_fps,
+            model_intervals=self.model_intervals
         )
 
     def detection_loop(self, drowsiness_service : DrowsinessDetectionService, 
@@ -53,6 +121,11 @@ class DetectionTask:
         """
         This function serves as the main inference of the loop of the machine learning models.
 
+        The loop is split into four stages, each on its own thread and connected by latest value
+        queues: capture -> inference -> render -> publish. Camera I/O, drawing and the buffer
+        publication run alongside the models, and a stage that falls behind drops the stale
+        frames rather than delaying the others.
+
         Parameters
         ----------
         drowsiness_service (DrowsinessDetectionService):
@@ -66,96 +139,361 @@ class DetectionTask:
         frame_buffer (FrameBuffer):
             Shared object for storing the latest raw and processed frames 
             for access by other components (e.g., HTTP endpoints).
-        background (DetectionBackgroundService):
-            Service managing background tasks such as periodic logging, system health monitoring, 
-            or asynchronous handling of detection results.
+        background (CameraPipeline):
+            The pipeline of the camera in the DetectionBackgroundService, its `is_running` flag
+            pauses the capture.
         
         Notes
         ----------
-        - This method is intended to be run in a background thread.
+        - This method is intended to be run in a background thread, it runs the capture stage itself
+          and returns once `stop` is called.
         - Detection modules are only invoked if enabled in the config (pipeline_settings.json).
-        - To prevent CPU overload, the loop includes a short sleep (~10ms) between iterations.
         """
-    
-        self.prev_time = time.time()
+        # Each run has its own stop event and queues, so the stages of a previous run still
+        # finishing after a restart stay stopped instead of resuming along the new ones
+        self.stop_event, self.queues = self.create_run()
+        stop_event, queues = self.stop_event, self.queues
+
+        stages = [
+            threading.Thread(target=self.run_stage, args=("inference", self.inference_stage, stop_event, queues, drowsiness_service, phone_detection_service, hand_detection_service, frame_buffer), daemon=True),
+            threading.Thread(target=self.run_stage, args=("render", self.render_stage, stop_event, queues, drowsiness_service, phone_detection_service, hand_detection_service, frame_buffer), daemon=True),
+            threading.Thread(target=self.run_stage, args=("publish", self.publish_stage, stop_event, queues, frame_buffer), daemon=True),
+        ]
+        self.executor = ThreadPoolExecutor(max_workers=len(MODEL_NAMES), thread_name_prefix="detection-model")
+        self.model_futures = {}
+        self.frame_index = 0
+        self.latest_results = {}
+        self.captured_count = 0
+        self.published_count = 0
+        self.result_ages.clear()
+        for stage in stages:
+            stage.start()
+
+        self.run_stage("capture", self.capture_stage, stop_event, queues, camera, background_service, frame_buffer)
 
-        while True:
+        for queue in queues.values():
+            queue.close()
+        for stage in stages:
+            stage.join(timeout=1)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        logging_default.info(
+            "Detection stages of camera {camera_id} stopped - dropped frames: {dropped}",
+            camera_id=self.camera_id,
+            dropped={name: queue.dropped_count for name, queue in queues.items()}
+        )
+
+    def create_run(self) -> tuple[threading.Event, dict[str, LatestValueQueue]]:
+        """
+        Creates the stop event and the stage queues of a run of the detection loop.
+        """
+        # A stage always takes the newest frame, the older ones waiting for it are discarded
+        queues = {name: LatestValueQueue(name, on_drop=self.discard_packet, camera=self.camera_id) for name in ("inference", "render", "publish")}
+        return threading.Event(), queues
+
+    def stop(self):
+        """Signal every stage of the detection loop to stop."""
+        self.stop_run(self.stop_event, self.queues)
+
+    @staticmethod
+    def stop_run(stop_event : threading.Event, queues : dict[str, LatestValueQueue]):
+        stop_event.set()
+        for queue in queues.values():
+            queue.close()
+
+    def run_stage(self, name : str, stage, stop_event : threading.Event, queues : dict[str, LatestValueQueue], *args):
+        """
+        Run a stage loop, an error in one stage stops the whole pipeline instead of leaving the
+        other stages waiting for frames that will never come.
+        """
+        try:
+            stage(stop_event, queues, *args)
+        except Exception:
+            logging_default.exception(f"Detection {name} stage failed, stopping the detection loop")
+            self.stop_run(stop_event, queues)
+
+    def capture_stage(self, stop_event : threading.Event, queues : dict[str, LatestValueQueue],
+                      camera : BaseCamera, background_service, frame_buffer : FrameBuffer):
+        """
+        Reads the frames from the camera and hands them to the inference stage. The copy to draw
+        the processed frame on is only made while someone watches the processed stream, into a
+        buffer of the frame pool released by the publish stage once a newer frame replaces it.
+        """
+        while not stop_event.is_set():
             if not background_service.is_running:
-                # Paused state: just sleep briefly and continue the loop without processing
-                time.sleep(0.01)
+                # Paused state: just wait briefly without capturing
+                stop_event.wait(0.01)
                 continue
-            
-            ret, original_frame = camera.get_capture()
-            if not ret:
-                time.sleep(0.01)
+
+            with self.stage_histograms["capture"].time():
+                captured = camera.get_frame()
+            if captured is None:
+                stop_event.wait(0.01)
                 continue
-            
+            original_frame = captured.frame
+            self.captured_count += 1
+            self.captured_counter.inc()
+
             # Don't flip when in Raspberry Pi or in Linux, as it use 3rd Party Camera rather Built-in Camera
             if os.name == "nt":
                 original_frame = cv2.flip(original_frame, 1)
 
-            processed_frame = original_frame.copy()
-            # Draw the result
-            debug_frames = []
+            processed_frame = frame_pool.copy(original_frame) if frame_buffer.has_consumers("processed") else None
 
             # Draw timestamp on original frame
             draw_timestamp(original_frame)
 
-            # Run them into detection service
-            drowsiness_detection_result = None
-            phone_detection_result = None
-            hands_detection_result = None
+            queues["inference"].put(FramePacket(captured.sequence, captured.timestamp, original_frame, processed_frame))
 
-            if self.drowsiness_model_run:
-                drowsiness_detection_result = drowsiness_service.process_frame(original_frame)
-                debug_frames.append(drowsiness_detection_result.debug_frame)
+    def inference_stage(self, stop_event : threading.Event, queues : dict[str, LatestValueQueue],
+                        drowsiness_service : DrowsinessDetectionService,
+                        phone_detection_service : PhoneDetectionService,
+                        hand_detection_service : HandsDetectionService,
+                        frame_buffer : FrameBuffer):
+        """
+        Runs the enabled detection services on the latest captured frame, each at its own
+        cadence, paced to `target_fps`. The services only draw their debug frame while someone
+        watches the debug stream.
+        """
+        while not stop_event.is_set():
+            packet = queues["inference"].get(timeout=0.1)
+            if packet is None:
+                continue
+            self.inference_age_histogram.observe(time.monotonic() - packet.captured_at)
 
+            services = []
+            if self.drowsiness_model_run:
+                services.append(("drowsiness", drowsiness_service))
             if self.phone_detection_model_run:
-                phone_detection_result = phone_detection_service.process_frame(original_frame)
-                debug_frames.append(phone_detection_result.debug_frame)
-
+                services.append(("phone", phone_detection_service))
             if self.hands_detection_model_run:
-                hands_detection_result = hand_detection_service.process_frame(original_frame)
-                debug_frames.append(hands_detection_result.debug_frame)
+                services.append(("hands", hand_detection_service))
 
-            # Draw the result
-            if drowsiness_detection_result:
-                processed_frame = drowsiness_service.draw(processed_frame, drowsiness_detection_result, False)
-            if phone_detection_result:
-                processed_frame = phone_detection_service.draw(processed_frame, phone_detection_result)
-            if hands_detection_result:
-                processed_frame = hand_detection_service.draw(processed_frame, hands_detection_result)
+            # Only the models due on this frame run, the others reuse their latest result
+            due_services = [(name, service) for name, service in services if self.frame_index % self.model_intervals[name] == 0]
+            render_debug = frame_buffer.has_consumers("debug")
+            with self.stage_histograms["inference"].time():
+                model_frame = self.downscale_for_inference(packet.raw_frame)
+                context = FrameContext(model_frame, full_frame=packet.raw_frame)
+                fresh_results = self.run_models(model_frame, due_services, context, render_debug)
+            for name, result in fresh_results.items():
+                if result is not None:
+                    self.latest_results[name] = result
+                    packet.fresh_models.add(name)
+            self.frame_index += 1
 
-            # Process the debug frame
-            debug_frame = self.combine_debug_frames(debug_frames)
+            enabled = [name for name, _ in services]
+            packet.drowsiness_result = self.latest_results.get("drowsiness") if "drowsiness" in enabled else None
+            packet.phone_result = self.latest_results.get("phone") if "phone" in enabled else None
+            packet.hands_result = self.latest_results.get("hands") if "hands" in enabled else None
+
+            queues["render"].put(packet)
+
+            # Sleep only for what remains of the frame budget
+            self.pacer.wait(stop_event)
+
+    def downscale_for_inference(self, frame : np.ndarray) -> np.ndarray:
+        """
+        Returns the frame the models run on: the captured frame downscaled to fit within
+        `inference_resolution`, keeping its aspect ratio, or the frame itself when it already fits.
+        The landmarks are normalized to the frame size, so the results apply to the full frame as is.
+        """
+        if self.inference_resolution is None:
+            return frame
+        max_width, max_height = self.inference_resolution
+        height, width = frame.shape[:2]
+        scale = min(max_width / width, max_height / height)
+        if scale >= 1:
+            return frame
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def run_models(self, frame : np.ndarray, services : list[tuple[str, Any]], context : Optional[FrameContext] = None,
+                   render_debug : bool = True) -> dict[str, Any]:
+        """
+        Runs the detection services on a frame, one after another or on the worker pool when
+        `concurrent_models` is enabled.
 
-            # Draw the FPS
-            # FPS calculation
+        In the concurrent mode the results are joined in the order of `services` whatever the
+        order the models finish in. A model that doesn't finish within `model_timeout` has no
+        result for this frame, and isn't submitted again until its previous call returns, as
+        a service must never process two frames at once. This holds even when a single model
+        is due on the frame, so it also goes through the worker pool.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            The frame to run the models on.
+        services : list[tuple[str, Any]]
+            The enabled services with their model name, each having a `process_frame` method.
+        context : FrameContext, optional
+            The per frame memo of `frame`, so the preprocessing common to the models runs once.
+        render_debug : bool, optional
+            Whether the services draw the debug frame of their result (default is True).
+
+        Returns
+        -------
+        dict[str, Any]
+            The result of each model, None when it timed out or is still busy with a previous frame.
+        """
+        if not self.concurrent_models or self.executor is None:
+            return {name: service.process_frame(frame, context=context, render_debug=render_debug) for name, service in services}
+
+        futures = {}
+        for name, service in services:
+            previous = self.model_futures.get(name)
+            if previous is not None and not previous.done():
+                continue
+            futures[name] = self.model_futures[name] = self.executor.submit(service.process_frame, frame, context=context, render_debug=render_debug)
+
+        wait(futures.values(), timeout=self.model_timeout)
+
+        results = {}
+        for name, _ in services:
+            future = futures.get(name)
+            if future is None:
+                # Nothing submitted on this frame, the model is still busy with an earlier one
+                self.model_busy_skip_count += 1
+                metrics.counter("model_busy_skips_total", model=name, camera=self.camera_id).inc()
+                logging_default.debug(f"Model {name} of camera {self.camera_id} is still busy with a previous frame, skipping this frame")
+                results[name] = None
+                continue
+            if not future.done():
+                self.model_timeout_count += 1
+                metrics.counter("model_timeouts_total", model=name, camera=self.camera_id).inc()
+                logging_default.warning(f"Model {name} of camera {self.camera_id} didn't return within {self.model_timeout}s, skipping its result for this frame")
+                results[name] = None
+                continue
+            results[name] = future.result()
+        return results
+
+    def render_stage(self, stop_event : threading.Event, queues : dict[str, LatestValueQueue],
+                     drowsiness_service : DrowsinessDetectionService,
+                     phone_detection_service : PhoneDetectionService,
+                     hand_detection_service : HandsDetectionService,
+                     frame_buffer : FrameBuffer):
+        """
+        Draws the results on the processed frame and composes the debug frame, each only while
+        its stream has consumers.
+        """
+        self.prev_time = time.time()
+
+        while not stop_event.is_set():
+            packet = queues["render"].get(timeout=0.1)
+            if packet is None:
+                continue
+
+            # FPS of the frames coming out of the inference stage
             current_time = time.time()
-            fps = 1 / (current_time - self.prev_time)
+            fps = 1 / max(current_time - self.prev_time, 1e-6)
             self.prev_time = current_time
-            draw_fps(processed_frame, f"FPS : {fps:.2f}")
 
-            # Draw timestamp on processed frame
-            draw_timestamp(processed_frame)
+            start = time.perf_counter()
+
+            # Draw the result
+            if packet.processed_frame is not None:
+                if packet.drowsiness_result:
+                    packet.processed_frame = drowsiness_service.draw(packet.processed_frame, packet.drowsiness_result, False, copy=False)
+                if packet.phone_result:
+                    packet.processed_frame = phone_detection_service.draw(packet.processed_frame, packet.phone_result, copy=False)
+                if packet.hands_result:
+                    packet.processed_frame = hand_detection_service.draw(packet.processed_frame, packet.hands_result, copy=False)
+
+                draw_fps(packet.processed_frame, f"FPS : {fps:.2f}")
+
+                # Draw timestamp on processed frame
+                draw_timestamp(packet.processed_frame)
 
-            # Save the frame to the shared global instance
-            frame_buffer.update_raw(original_frame)
-            frame_buffer.update_processed(processed_frame)
-            frame_buffer.update_debug(debug_frame)
+                self.processed_render_histogram.observe(time.perf_counter() - start)
+
+            # Process the debug frame
+            if frame_buffer.has_consumers("debug"):
+                with self.debug_render_histogram.time():
+                    results = (packet.drowsiness_result, packet.phone_result, packet.hands_result)
+                    debug_frames = [result.debug_frame for result in results if result and result.debug_frame is not None]
+                    packet.debug_frame = self.combine_debug_frames(debug_frames)
+
+                # The pool only reuses them once the results holding them are gone
+                for debug_frame in debug_frames:
+                    frame_pool.release(debug_frame)
+            self.stage_histograms["render"].observe(time.perf_counter() - start)
+
+            queues["publish"].put(packet)
+
+    def publish_stage(self, stop_event : threading.Event, queues : dict[str, LatestValueQueue], frame_buffer : FrameBuffer):
+        """
+        Saves the frames and the metrics of the latest rendered frame to the shared frame buffer.
+        """
+        while not stop_event.is_set():
+            packet = queues["publish"].get(timeout=0.1)
+            if packet is None:
+                continue
+
+            start = time.perf_counter()
+
+            # Save the frame to the shared global instance, and give the frames it replaces back to the pool
+            frame_buffer.update_raw(packet.raw_frame)
+            self.publish_frame(frame_buffer.update_processed, "processed", packet.processed_frame)
+            self.publish_frame(frame_buffer.update_debug, "debug", packet.debug_frame)
 
             # Exposing facial metrics to websocket communication
-            if drowsiness_detection_result.faces:
+            drowsiness_detection_result = packet.drowsiness_result
+            if drowsiness_detection_result and drowsiness_detection_result.faces:
                 face = drowsiness_detection_result.faces[0]
                 frame_buffer.update_facial_metrics(face.ear, face.mar, face.is_drowsy, face.is_yawning)
             else:
                 frame_buffer.update_facial_metrics(0, 0, False, False)
 
-            # Exposing recent detected event to websocket communication
-            if drowsiness_detection_result:
+            # Exposing recent detected event to websocket communication, only once: a result reused
+            # on the frames the model skips would send its event again
+            if drowsiness_detection_result and "drowsiness" in packet.fresh_models:
                 frame_buffer.update_drowsiness_event_recent(drowsiness_detection_result.drowsiness_event, drowsiness_detection_result.yawning_event)
 
-            time.sleep(0.01)
+            result_age = time.monotonic() - packet.captured_at
+            self.result_age_histogram.observe(result_age)
+            self.result_ages.append(result_age)
+            self.published_count += 1
+
+            self.stage_histograms["publish"].observe(time.perf_counter() - start)
+
+    def discard_packet(self, packet : FramePacket):
+        """
+        Gives the pooled frames of a packet overwritten in a stage queue back to the frame pool.
+        """
+        frame_pool.release(packet.processed_frame)
+        frame_pool.release(packet.debug_frame)
+
+    def lag_stats(self) -> dict:
+        """
+        The frames dropped to keep up with the camera and the age of the published results, since
+        the detection loop started.
+
+        Returns
+        -------
+        dict
+            The captured, published and dropped frame counts, the drops of each stage queue, and the
+            last, mean and max age in seconds from the capture to the published result over the
+            latest frames.
+        """
+        ages = list(self.result_ages)
+        return {
+            "captured_frames": self.captured_count,
+            "published_frames": self.published_count,
+            "dropped_frames": {name: queue.dropped_count for name, queue in self.queues.items()},
+            "last_result_age": ages[-1] if ages else None,
+            "mean_result_age": sum(ages) / len(ages) if ages else None,
+            "max_result_age": max(ages) if ages else None,
+        }
+
+    def publish_frame(self, update : Callable[[np.ndarray], None], stream : str, frame : Optional[np.ndarray]):
+        """
+        Publishes the frame of a stream with `update`, releasing the frame it replaces to the frame pool.
+        """
+        update(frame)
+        previous = self.published_frames.get(stream)
+        if previous is not None and previous is not frame:
+            frame_pool.release(previous)
+        self.published_frames[stream] = frame
 
     def combine_debug_frames(self, frames: list[np.ndarray], concat_axis: str = "horizontal") -> np.ndarray:
         """
@@ -172,6 +510,19 @@ class DetectionTask:
             return None
         
         try:
+            # Frames of the same size are stacked straight into a buffer of the frame pool
+            if len({f.shape for f in frames}) == 1 and frames[0].ndim == 3 and concat_axis in ("horizontal", "vertical"):
+                height, width, channels = frames[0].shape
+                if concat_axis == "horizontal":
+                    combined = frame_pool.acquire((height, width * len(frames), channels), frames[0].dtype)
+                    for index, f in enumerate(frames):
+                        combined[:, index * width:(index + 1) * width] = f
+                else:
+                    combined = frame_pool.acquire((height * len(frames), width, channels), frames[0].dtype)
+                    for index, f in enumerate(frames):
+                        combined[index * height:(index + 1) * height] = f
+                return combined
+
             if concat_axis == "horizontal":
                 target_height = min(f.shape[0] for f in frames)
                 resized = [cv2.resize(f, (int(f.shape[1] * target_height / f.shape[0]), target_height)) for f in frames]
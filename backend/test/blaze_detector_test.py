@@ -0,0 +1,181 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend.benchmark.wnms_benchmark import (
+    CANDIDATE_COUNTS,
+    generate_candidates,
+    greedy_weighted_non_max_suppression,
+)
+from backend.models.hailo.blaze_model.blaze_detector_base import BlazeDetectorBase
+from backend.models.hailo.blaze_model.box_utils import calculate_scale
+from backend.models.hailo.blaze_model.utils import (
+    get_anchor_options,
+    get_anchors_cache_path,
+)
+
+FACE_ANCHORS_CONFIG = "hailo_model/hailo8l/anchors/face_detection_full_option.json"
+HANDS_ANCHORS_CONFIG = "hailo_model/hailo8l/anchors/hands_detection_full_option.json"
+FACE_INFERENCE_CONFIG = "hailo_model/hailo8l/configs/face_detection_full_config.json"
+
+
+def reference_detector_anchors(options : dict) -> np.ndarray:
+    """
+    The original loop based anchors generation, kept to check the vectorized one against it.
+    """
+    strides_size = len(options["strides"])
+    anchors = []
+    layer_id = 0
+    while layer_id < strides_size:
+        anchor_height = []
+        anchor_width = []
+        aspect_ratios = []
+        scales = []
+
+        last_same_stride_layer = layer_id
+        while (last_same_stride_layer < strides_size) and \
+            (options["strides"][last_same_stride_layer] == options["strides"][layer_id]):
+            scale = calculate_scale(options["min_scale"], options["max_scale"], last_same_stride_layer, strides_size)
+            if last_same_stride_layer == 0 and options["reduce_boxes_in_lowest_layer"]:
+                aspect_ratios += [1.0, 2.0, 0.5]
+                scales += [0.1, scale, scale]
+            else:
+                for aspect_ratio in options["aspect_ratios"]:
+                    aspect_ratios.append(aspect_ratio)
+                    scales.append(scale)
+                if options["interpolated_scale_aspect_ratio"] > 0.0:
+                    scale_next = 1.0 if last_same_stride_layer == strides_size - 1 \
+                        else calculate_scale(options["min_scale"], options["max_scale"], last_same_stride_layer + 1, strides_size)
+                    scales.append(np.sqrt(scale * scale_next))
+                    aspect_ratios.append(options["interpolated_scale_aspect_ratio"])
+            last_same_stride_layer += 1
+
+        for i in range(len(aspect_ratios)):
+            ratio_sqrts = np.sqrt(aspect_ratios[i])
+            anchor_height.append(scales[i] / ratio_sqrts)
+            anchor_width.append(scales[i] * ratio_sqrts)
+
+        stride = options["strides"][layer_id]
+        feature_map_height = int(np.ceil(options["input_size_height"] / stride))
+        feature_map_width = int(np.ceil(options["input_size_width"] / stride))
+        for y in range(feature_map_height):
+            for x in range(feature_map_width):
+                for anchor_id in range(len(anchor_height)):
+                    x_center = (x + options["anchor_offset_x"]) / feature_map_width
+                    y_center = (y + options["anchor_offset_y"]) / feature_map_height
+                    if options["fixed_anchor_size"]:
+                        anchors.append([x_center, y_center, 1.0, 1.0])
+                    else:
+                        anchors.append([x_center, y_center, anchor_width[anchor_id], anchor_height[anchor_id]])
+        layer_id = last_same_stride_layer
+
+    return np.asarray(anchors)
+
+def reference_tensors_to_detections(detector : BlazeDetectorBase, raw_box_tensor : np.ndarray, raw_score_tensor : np.ndarray) -> list:
+    """
+    The original dense decoding, every anchor is decoded in float64 before the score mask is applied.
+    """
+    anchors = detector.anchors
+    boxes = np.zeros(raw_box_tensor.shape)
+    x_center = raw_box_tensor[..., 0] / detector.x_scale * anchors[:, 2] + anchors[:, 0]
+    y_center = raw_box_tensor[..., 1] / detector.y_scale * anchors[:, 3] + anchors[:, 1]
+    w = raw_box_tensor[..., 2] / detector.w_scale * anchors[:, 2]
+    h = raw_box_tensor[..., 3] / detector.h_scale * anchors[:, 3]
+    boxes[..., 0] = y_center - h / 2.
+    boxes[..., 1] = x_center - w / 2.
+    boxes[..., 2] = y_center + h / 2.
+    boxes[..., 3] = x_center + w / 2.
+    for k in range(detector.num_keypoints):
+        offset = 4 + k*2
+        boxes[..., offset] = raw_box_tensor[..., offset] / detector.x_scale * anchors[:, 2] + anchors[:, 0]
+        boxes[..., offset + 1] = raw_box_tensor[..., offset + 1] / detector.y_scale * anchors[:, 3] + anchors[:, 1]
+
+    thresh = detector.score_clipping_thresh
+    scores = np.squeeze(1/(1 + np.exp(-np.clip(raw_score_tensor, -thresh, thresh))), axis=-1)
+    mask = scores >= detector.min_score_thresh
+    return [np.concatenate((boxes[i, mask[i]], scores[i, mask[i], np.newaxis]), axis=-1) for i in range(raw_box_tensor.shape[0])]
+
+
+class BlazeDetectorTest(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup the detector base, which doesn't need the Hailo device for the postprocess.
+        """
+        self.detector = BlazeDetectorBase()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_anchors_identical_to_reference(self):
+        """
+        Test if the vectorized anchors are identical to the loop based generation.
+        """
+        for anchors_config in (FACE_ANCHORS_CONFIG, HANDS_ANCHORS_CONFIG):
+            options = get_anchor_options(anchors_config)
+            for fixed_anchor_size in (True, False):
+                options["fixed_anchor_size"] = fixed_anchor_size
+                anchors = self.detector.generate_detector_anchors(options)
+                np.testing.assert_array_equal(anchors, reference_detector_anchors(options))
+
+        self.assertEqual(self.detector.generate_detector_anchors(get_anchor_options(FACE_ANCHORS_CONFIG)).shape, (2304, 4))
+        self.assertEqual(self.detector.generate_detector_anchors(get_anchor_options(HANDS_ANCHORS_CONFIG)).shape, (2016, 4))
+
+    def test_anchors_cache(self):
+        """
+        Test if the anchors are saved to the cache on the first load and memory mapped on the next one.
+        """
+        anchors_config = shutil.copy(HANDS_ANCHORS_CONFIG, self.tmp_dir)
+        options = get_anchor_options(anchors_config)
+        cache_path = get_anchors_cache_path(anchors_config, options)
+
+        anchors = self.detector.load_detector_anchors(anchors_config, options)
+        self.assertTrue(os.path.exists(cache_path))
+
+        cached_anchors = self.detector.load_detector_anchors(anchors_config, options)
+        self.assertIsInstance(cached_anchors, np.memmap)
+        np.testing.assert_array_equal(cached_anchors, anchors)
+
+        # Other options must never hit the same cache
+        options["anchor_offset_x"] = 0.0
+        self.assertNotEqual(get_anchors_cache_path(anchors_config, options), cache_path)
+
+    def test_sparse_decoding_matches_dense_decoding(self):
+        """
+        Test if decoding only the anchors above the score threshold gives the same detections
+        as decoding every anchor and masking afterward.
+        """
+        self.detector.config_model(FACE_ANCHORS_CONFIG, FACE_INFERENCE_CONFIG)
+
+        rng = np.random.default_rng(0)
+        raw_box_tensor = rng.normal(0, 20, (2, 2304, 16)).astype(np.float32)
+        raw_score_tensor = rng.normal(-4, 3, (2, 2304, 1)).astype(np.float32)
+
+        detections = self.detector.tensors_to_detections(raw_box_tensor, raw_score_tensor, self.detector.anchors)
+        reference = reference_tensors_to_detections(self.detector, raw_box_tensor, raw_score_tensor)
+
+        self.assertEqual(len(detections), len(reference))
+        for detection, expected in zip(detections, reference):
+            self.assertEqual(detection.dtype, np.float32)
+            self.assertGreater(len(expected), 0)
+            np.testing.assert_allclose(detection, expected, rtol=1e-5, atol=1e-6)
+
+    def test_weighted_nms_identical_to_greedy(self):
+        """
+        Test if the vectorized weighted NMS gives exactly the same detections as the greedy one.
+        """
+        self.detector.config_model(FACE_ANCHORS_CONFIG, FACE_INFERENCE_CONFIG)
+
+        for count in CANDIDATE_COUNTS:
+            for seed in range(3):
+                detections = generate_candidates(count, seed=seed)
+                expected = greedy_weighted_non_max_suppression(detections, self.detector.num_coords, self.detector.min_suppression_threshold)
+                np.testing.assert_array_equal(self.detector.weighted_non_max_suppression(detections), np.asarray(expected))
+
+        self.assertEqual(len(self.detector.weighted_non_max_suppression(np.zeros((0, 17), dtype=np.float32))), 0)
+
+if __name__ == "__main__":
+    unittest.main()
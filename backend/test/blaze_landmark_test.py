@@ -0,0 +1,112 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.models.hailo.blaze_model.blaze_landmark_base import BlazeLandmarkBase
+
+
+def reference_extract_roi(frame : np.ndarray, xc : np.ndarray, yc : np.ndarray, theta : np.ndarray, scale : np.ndarray, res : int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The original per ROI extraction, with getAffineTransform and invertAffineTransform.
+    """
+    imgs = []
+    affines = []
+    for i in range(len(theta)):
+        R = np.array([[np.cos(theta[i]), -np.sin(theta[i])], [np.sin(theta[i]), np.cos(theta[i])]])
+        points = R @ (np.array([[-1, -1, 1], [-1, 1, -1]]) * scale[i] / 2) + np.array([[xc[i]], [yc[i]]])
+        M = cv2.getAffineTransform(points.T.astype(np.float32), np.array([[0, 0], [0, res-1], [res-1, 0]], dtype=np.float32))
+        imgs.append(cv2.warpAffine(frame, M, (res, res)))
+        affines.append(cv2.invertAffineTransform(M))
+    return np.stack(imgs), np.stack(affines)
+
+
+class BlazeLandmarkTest(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup the landmark base with a face landmark resolution, no Hailo device is needed to extract the ROIs.
+        """
+        self.landmark_model = BlazeLandmarkBase()
+        self.landmark_model.resolution = 192
+
+        # Smooth image so a sub pixel difference in the affine can't flip more than one gray level
+        x, y = np.meshgrid(np.arange(640), np.arange(480))
+        self.frame = np.stack((x * 255 // 639, y * 255 // 479, (x + y) * 255 // 1118), axis=-1).astype(np.uint8)
+
+        rng = np.random.default_rng(0)
+        self.xc = rng.uniform(200, 440, 3)
+        self.yc = rng.uniform(150, 330, 3)
+        self.theta = rng.uniform(-np.pi, np.pi, 3)
+        self.scale = rng.uniform(80, 250, 3)
+
+    def test_extract_roi_matches_reference(self):
+        """
+        Test if the closed form affines and the uint8 crops match the per ROI OpenCV extraction.
+        """
+        imgs, affines, points = self.landmark_model.extract_roi(self.frame, self.xc, self.yc, self.theta, self.scale)
+        expected_imgs, expected_affines = reference_extract_roi(self.frame, self.xc, self.yc, self.theta, self.scale, 192)
+
+        self.assertEqual(imgs.shape, (3, 192, 192, 3))
+        self.assertEqual(imgs.dtype, np.uint8)
+        self.assertEqual(points.shape, (3, 2, 4))
+        np.testing.assert_allclose(affines, expected_affines, rtol=1e-4, atol=1e-3)
+        self.assertLessEqual(np.abs(imgs.astype(int) - expected_imgs.astype(int)).max(), 1)
+
+    def test_extract_roi_reuses_buffer(self):
+        """
+        Test if the crops are written into the same preallocated buffer from one frame to the next.
+        """
+        imgs, _, _ = self.landmark_model.extract_roi(self.frame, self.xc, self.yc, self.theta, self.scale)
+        buffer = self.landmark_model.roi_buffer
+        self.assertIs(imgs.base, buffer)
+
+        imgs, _, _ = self.landmark_model.extract_roi(self.frame, self.xc[:1], self.yc[:1], self.theta[:1], self.scale[:1])
+        self.assertIs(self.landmark_model.roi_buffer, buffer)
+        self.assertEqual(imgs.shape, (1, 192, 192, 3))
+
+        imgs, affines, _ = self.landmark_model.extract_roi(self.frame, self.xc[:0], self.yc[:0], self.theta[:0], self.scale[:0])
+        self.assertEqual(imgs.shape, (0, 192, 192, 3))
+        self.assertEqual(affines.shape, (0, 2, 3))
+
+    def test_denormalize_landmarks_matches_reference(self):
+        """
+        Test if the batched landmarks transform gives the same result as the per ROI matmul.
+        """
+        _, affines, _ = self.landmark_model.extract_roi(self.frame, self.xc, self.yc, self.theta, self.scale)
+        landmarks = np.random.default_rng(1).random((3, 468, 3), dtype=np.float32)
+
+        expected = landmarks.copy()
+        expected[:, :, :2] *= 192
+        for i in range(len(expected)):
+            expected[i, :, :2] = (affines[i, :, :2] @ expected[i, :, :2].T + affines[i, :, 2:]).T
+        expected[:, :, 0] /= 640
+        expected[:, :, 1] /= 480
+
+        denormalized = self.landmark_model.denormalize_landmarks(landmarks, affines)
+        normalized = self.landmark_model.normalized_landmark_to_orginal_image_space(denormalized, self.frame.shape)
+        self.assertEqual(normalized.dtype, np.float32)
+        np.testing.assert_allclose(normalized, expected, rtol=1e-5, atol=1e-5)
+
+    def test_landmarks2roi_recovers_roi(self):
+        """
+        Test if the ROI derived from the landmarks of a ROI is that same ROI, for the tracking mode.
+        """
+        _, affines, _ = self.landmark_model.extract_roi(self.frame, self.xc, self.yc, self.theta, self.scale)
+
+        # A square covering half of the ROI, kp2 on its left and kp1 on its right
+        landmarks = np.zeros((3, 4, 3), dtype=np.float32)
+        landmarks[:, :, :2] = np.array([[0.25, 0.5], [0.75, 0.5], [0.5, 0.25], [0.5, 0.75]])
+        landmarks = self.landmark_model.denormalize_landmarks(landmarks, affines)
+
+        self.landmark_model.roi_kp1 = 1
+        self.landmark_model.roi_kp2 = 0
+        self.landmark_model.roi_dscale = 2.0
+        xc, yc, scale, theta = self.landmark_model.landmarks2roi(landmarks)
+
+        np.testing.assert_allclose(xc, self.xc, atol=1.0)
+        np.testing.assert_allclose(yc, self.yc, atol=1.0)
+        np.testing.assert_allclose(scale, self.scale, rtol=1e-2)
+        np.testing.assert_allclose(np.angle(np.exp(1j * (theta - self.theta))), 0, atol=1e-4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import queue
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend.models.hailo.blaze_model.face_mesh.blaze_face_pipeline import (
+    BlazeFacePipeline,
+)
+from backend.models.hailo.blaze_model.hands.blaze_hands_pipeline import (
+    BlazeHandsPipeline,
+)
+from backend.models.hailo.hailo_runtime.replay_inference_engine import (
+    RecordingInferenceEngine,
+    ReplayInferenceEngine,
+)
+from backend.utils.frame_context import FrameContext
+
+
+class BlazePipelineTest(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup the pipelines on the replay engine, with synthetic outputs so no Hailo device is needed.
+        """
+        self.frame = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_pipelines_end_to_end(self):
+        """
+        Test if both pipelines run end to end and return normalized landmarks in both output formats.
+        """
+        for pipeline_class, nb_landmarks in ((BlazeFacePipeline, 468), (BlazeHandsPipeline, 21)):
+            landmarks = pipeline_class(ReplayInferenceEngine(), landmarks_as_array=True).inference(self.frame, preprocessed=False)
+            coordinates = pipeline_class(ReplayInferenceEngine()).inference(self.frame, preprocessed=False)
+
+            self.assertEqual(landmarks.shape, (1, nb_landmarks, 3))
+            self.assertEqual(landmarks.dtype, np.float32)
+            self.assertTrue(np.all((landmarks[:, :, :2] > -0.5) & (landmarks[:, :, :2] < 1.5)))
+            np.testing.assert_array_equal(np.asarray(coordinates), landmarks)
+
+    def test_tracking_skips_detector(self):
+        """
+        Test if the tracking mode only runs the detector every redetection interval.
+        """
+        engine = ReplayInferenceEngine()
+        pipeline = BlazeFacePipeline(engine, landmarks_as_array=True, redetection_interval=4)
+
+        for _ in range(10):
+            self.assertEqual(len(pipeline.inference(self.frame, preprocessed=False)), 1)
+
+        # Detections on frames 0, 5 and the landmark model on every frame
+        self.assertEqual(engine.call_count_list[pipeline.detector.hef_id], 2)
+        self.assertEqual(engine.call_count_list[pipeline.landmark_model.hef_id], 10)
+
+    def test_recording_replay(self):
+        """
+        Test if the outputs recorded by the recording engine are replayed identically.
+        """
+        recorder = RecordingInferenceEngine(ReplayInferenceEngine(seed=1), self.tmp_dir)
+        expected = BlazeHandsPipeline(recorder, landmarks_as_array=True).inference(self.frame, preprocessed=False)
+        recorder.save()
+
+        replay = BlazeHandsPipeline(ReplayInferenceEngine(self.tmp_dir), landmarks_as_array=True)
+        np.testing.assert_array_equal(replay.inference(self.frame, preprocessed=False), expected)
+
+    def test_shared_frame_context(self):
+        """
+        Test if the pipelines sharing a frame context give the same landmarks as without it, while
+        the RGB conversion and the letterbox input of the detectors are only computed once.
+        """
+        context = FrameContext(self.frame)
+        for pipeline_class in (BlazeFacePipeline, BlazeHandsPipeline):
+            expected = pipeline_class(ReplayInferenceEngine(), landmarks_as_array=True).inference(self.frame, preprocessed=False)
+            landmarks = pipeline_class(ReplayInferenceEngine(), landmarks_as_array=True).inference(self.frame, preprocessed=False, context=context)
+            np.testing.assert_array_equal(landmarks, expected)
+
+        # Both detectors take 192x192 inputs, the palm detector reuses the face detector letterbox
+        self.assertEqual(set(context.cache), {"rgb", ("resized", 192, 144), ("letterbox", 192, 192)})
+        self.assertEqual(context.miss_count, 3)
+
+    def frames(self, count : int) -> list[np.ndarray]:
+        rng = np.random.default_rng(1)
+        return [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+
+    def test_async_same_results_in_order(self):
+        """
+        Test if the asynchronous mode collects the same landmarks as `inference`, in the order the
+        frames were submitted, with the detector and landmark stages overlapping or with tracking.
+        """
+        frames = self.frames(8)
+        # Tracking lags by the frames in flight, so it is compared with one frame in flight
+        for redetection_interval, max_in_flight in ((0, 2), (3, 1)):
+            expected_pipeline = BlazeFacePipeline(ReplayInferenceEngine(), landmarks_as_array=True, redetection_interval=redetection_interval)
+            expected = [expected_pipeline.inference(frame, preprocessed=False) for frame in frames]
+
+            pipeline = BlazeFacePipeline(ReplayInferenceEngine(), landmarks_as_array=True, redetection_interval=redetection_interval)
+            pipeline.start_async(max_in_flight)
+            self.addCleanup(pipeline.stop_async)
+
+            collected = []
+            for frame in frames:
+                while not pipeline.submit(frame, preprocessed=False, timeout=0):
+                    collected.append(pipeline.collect(timeout=5))
+            while len(collected) < len(frames):
+                collected.append(pipeline.collect(timeout=5))
+
+            self.assertEqual(len(collected), len(expected))
+            for landmarks, expected_landmarks in zip(collected, expected):
+                np.testing.assert_array_equal(landmarks, expected_landmarks)
+
+    def test_submit_times_out_when_full(self):
+        """
+        Test if `submit` gives up after its timeout once `max_in_flight` frames wait to be collected,
+        and takes a frame again once one is collected.
+        """
+        pipeline = BlazeFacePipeline(ReplayInferenceEngine(), landmarks_as_array=True)
+        pipeline.start_async(max_in_flight=2)
+        self.addCleanup(pipeline.stop_async)
+
+        self.assertTrue(pipeline.submit(self.frame, preprocessed=False, timeout=1))
+        self.assertTrue(pipeline.submit(self.frame, preprocessed=False, timeout=1))
+        self.assertFalse(pipeline.submit(self.frame, preprocessed=False, timeout=0.05))
+
+        pipeline.collect(timeout=5)
+        self.assertTrue(pipeline.submit(self.frame, preprocessed=False, timeout=1))
+
+    def test_stage_error_raised_by_collect(self):
+        """
+        Test if an error in a stage is raised by `collect` for its frame, and the next frames still run.
+        """
+        pipeline = BlazeFacePipeline(ReplayInferenceEngine(), landmarks_as_array=True)
+        pipeline.start_async(max_in_flight=2)
+        self.addCleanup(pipeline.stop_async)
+
+        def failing_detect(image, context=None):
+            raise ValueError("detector failed")
+        pipeline.detect = failing_detect
+        pipeline.submit(self.frame, preprocessed=False)
+        with self.assertRaisesRegex(ValueError, "detector failed"):
+            pipeline.collect(timeout=5)
+
+        del pipeline.detect
+        pipeline.submit(self.frame, preprocessed=False)
+        self.assertEqual(len(pipeline.collect(timeout=5)), 1)
+        with self.assertRaises(queue.Empty):
+            pipeline.collect(timeout=0.05)
+
+if __name__ == "__main__":
+    unittest.main()
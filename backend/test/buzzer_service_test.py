@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from backend.hardware.buzzer.base_buzzer import BaseBuzzer
+from backend.services.buzzer_service import BuzzerService
+
+
+class FakeBuzzer(BaseBuzzer):
+    def __init__(self):
+        self.cleanup_count = 0
+
+    def beep(self, times, duration, pause, frequency=None):
+        time.sleep(0.01)
+
+    def beep_first_stage(self):
+        time.sleep(0.01)
+
+    def beep_second_stage(self):
+        time.sleep(0.01)
+
+    def beep_third_stage(self):
+        time.sleep(0.01)
+
+    def cleanup(self):
+        self.cleanup_count += 1
+
+
+class BuzzerServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.buzzer = FakeBuzzer()
+        self.service = BuzzerService(self.buzzer)
+        self.addCleanup(self.service.stop_buzzer)
+
+    def test_camera_only_stops_its_own_alarm(self):
+        """
+        Test if a camera without a drowsy driver doesn't silence the alarm started by another camera.
+        """
+        self.service.start_buzzer(self.buzzer.beep_second_stage, "driver")
+        self.service.stop_buzzer("cabin")
+        self.assertTrue(self.service.keep_beeping)
+        self.assertEqual(self.service.buzzer_function, self.buzzer.beep_second_stage)
+        self.assertEqual(self.buzzer.cleanup_count, 0)
+
+        self.service.start_buzzer(self.buzzer.beep_first_stage, "cabin")
+        self.service.stop_buzzer("cabin")
+        self.assertEqual(self.service.buzzer_function, self.buzzer.beep_second_stage)
+
+        self.service.stop_buzzer("driver")
+        self.assertFalse(self.service.keep_beeping)
+        self.assertEqual(self.buzzer.cleanup_count, 1)
+
+    def test_stop_without_camera_stops_every_alarm(self):
+        """
+        Test if stopping the buzzer without a camera silences the alarms of all the cameras.
+        """
+        self.service.start_buzzer(self.buzzer.beep_first_stage, "driver")
+        self.service.start_buzzer(self.buzzer.beep_third_stage, "cabin")
+        self.service.stop_buzzer()
+        self.assertFalse(self.service.keep_beeping)
+        self.assertEqual(self.service.camera_functions, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.domain.dto.camera_pipeline import CameraPipeline
+from backend.domain.dto.drowsiness_detection_result import (
+    DrowsinessDetectionResult,
+    FaceDrowsinessState,
+)
+from backend.domain.dto.frame_packet import FramePacket
+from backend.domain.dto.hands_detection_result import HandsDetectionResult
+from backend.domain.dto.phone_detection_result import PhoneDetectionResult
+from backend.hardware.camera.base_camera import BaseCamera
+from backend.hardware.camera.threaded_camera import ThreadedCamera
+from backend.services.detection_background_service import DetectionBackgroundService
+from backend.tasks.detection_task import DetectionTask
+from backend.utils.frame_buffer import FrameBuffer
+from backend.utils.frame_pacer import FramePacer
+from backend.utils.latest_value_queue import LatestValueQueue
+
+
+class FakeCamera(BaseCamera):
+    def __init__(self):
+        self.frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    def get_capture(self):
+        time.sleep(0.001)
+        return True, self.frame.copy()
+
+    def release(self):
+        pass
+
+class FakeService:
+    """
+    Stands for the three detection services, which only differ by the result type and the draw signature.
+    """
+    def __init__(self, result_class, delay : float = 0.0):
+        self.result_class = result_class
+        self.delay = delay
+        self.frame_count = 0
+
+    def process_frame(self, frame, context=None, render_debug=True):
+        time.sleep(self.delay)
+        self.frame_count += 1
+        result = self.result_class(debug_frame=frame.copy() if render_debug else None)
+        if self.result_class is DrowsinessDetectionResult:
+            result.faces = [FaceDrowsinessState(ear=0.3, mar=0.4)]
+        return result
+
+    def draw(self, frame, result, *args, copy=True):
+        return frame
+
+class FakeBackgroundService:
+    is_running = True
+
+
+class LatestValueQueueTest(unittest.TestCase):
+    def test_keeps_latest_and_counts_drops(self):
+        """
+        Test if the queue only keeps the latest value and counts and discards the overwritten ones.
+        """
+        dropped = []
+        queue = LatestValueQueue(on_drop=dropped.append)
+        for value in range(3):
+            queue.put(value)
+
+        self.assertEqual(queue.get(timeout=0), 2)
+        self.assertIsNone(queue.get(timeout=0))
+        self.assertEqual(queue.dropped_count, 2)
+        self.assertEqual(dropped, [0, 1])
+
+    def test_close_wakes_up_consumer(self):
+        """
+        Test if closing the queue releases a consumer waiting without timeout.
+        """
+        queue = LatestValueQueue()
+        consumer = threading.Thread(target=queue.get)
+        consumer.start()
+        queue.close()
+        consumer.join(timeout=1)
+        self.assertFalse(consumer.is_alive())
+
+
+class ThreadedCameraTest(unittest.TestCase):
+    def test_returns_newest_frame(self):
+        """
+        Test if the threaded camera hands out the newest frame with increasing sequence numbers,
+        drops the frames not taken in time and stops reading once released.
+        """
+        camera = ThreadedCamera(FakeCamera())
+        first = camera.get_frame()
+        time.sleep(0.05)
+        second = camera.get_frame()
+
+        self.assertEqual(first.frame.shape, (120, 160, 3))
+        self.assertGreater(second.sequence, first.sequence + 1)
+        self.assertGreater(second.timestamp, first.timestamp)
+        self.assertGreater(camera.dropped_count, 0)
+
+        camera.release()
+        self.assertFalse(camera.thread.is_alive())
+
+
+class FramePacerTest(unittest.TestCase):
+    def test_sleeps_remaining_budget(self):
+        """
+        Test if the pacer holds the target frame rate and doesn't sleep when the loop is slower.
+        """
+        pacer = FramePacer(50)
+        start = time.perf_counter()
+        for _ in range(11):
+            pacer.wait()
+        self.assertAlmostEqual(time.perf_counter() - start, 0.2, delta=0.05)
+
+        time.sleep(0.05)
+        self.assertEqual(pacer.wait(), 0.0)
+
+
+class DetectionTaskTest(unittest.TestCase):
+    def run_loop(self, task : DetectionTask, services : list, frame_buffer : FrameBuffer, duration : float = 0.3):
+        loop = threading.Thread(target=task.detection_loop, args=(*services, FakeCamera(), frame_buffer, FakeBackgroundService()))
+        loop.start()
+        time.sleep(duration)
+        task.stop()
+        loop.join(timeout=2)
+        self.assertFalse(loop.is_alive())
+
+    def test_staged_loop_publishes_frames(self):
+        """
+        Test if the staged detection loop publishes the frames and the metrics, drops the frames
+        captured while the models run, runs each model at its cadence and stops when asked.
+        """
+        task = DetectionTask()
+        task.drowsiness_model_run = True
+        task.phone_detection_model_run = True
+        task.hands_detection_model_run = False
+        task.model_intervals = {"drowsiness": 1, "phone": 3, "hands": 1}
+        task.pacer.set_target_fps(0)
+
+        drowsiness_service = FakeService(DrowsinessDetectionResult, delay=0.02)
+        phone_detection_service = FakeService(PhoneDetectionResult)
+        hand_detection_service = FakeService(HandsDetectionResult)
+        frame_buffer = FrameBuffer()
+        frame_buffer.acquire("processed")
+        frame_buffer.acquire("debug")
+
+        self.run_loop(task, [drowsiness_service, phone_detection_service, hand_detection_service], frame_buffer)
+
+        self.assertGreater(drowsiness_service.frame_count, 0)
+        self.assertEqual(hand_detection_service.frame_count, 0)
+        self.assertLessEqual(phone_detection_service.frame_count, drowsiness_service.frame_count // 3 + 1)
+        self.assertGreater(task.queues["inference"].dropped_count, 0)
+
+        self.assertEqual(frame_buffer.get_processed().shape, (120, 160, 3))
+        self.assertEqual(frame_buffer.get_debug().shape, (120, 320, 3))
+        self.assertAlmostEqual(frame_buffer.get_facial_metrics().ear, 0.3)
+
+        lag = task.lag_stats()
+        self.assertGreater(lag["published_frames"], 0)
+        self.assertGreater(lag["captured_frames"], lag["published_frames"])
+        self.assertEqual(lag["dropped_frames"]["inference"], task.queues["inference"].dropped_count)
+        self.assertLess(lag["max_result_age"], 0.2)
+
+    def test_restart_keeps_previous_stages_stopped(self):
+        """
+        Test if a new run of the detection loop gets its own stop event and queues, so the stages of
+        the previous run, still busy with a slow model when it returned, don't resume along the new ones.
+        """
+        task = DetectionTask()
+        task.pacer.set_target_fps(0)
+        slow_service = FakeService(DrowsinessDetectionResult, delay=1.5)
+        services = [slow_service, FakeService(PhoneDetectionResult), FakeService(HandsDetectionResult)]
+
+        self.run_loop(task, services, FrameBuffer(), duration=0.1)
+        previous_stop_event, previous_queues = task.stop_event, task.queues
+
+        slow_service.delay = 0
+        self.run_loop(task, services, FrameBuffer(), duration=0.1)
+        self.assertIsNot(task.stop_event, previous_stop_event)
+        self.assertTrue(previous_stop_event.is_set())
+        self.assertTrue(all(queue.closed for queue in previous_queues.values()))
+
+    def test_no_rendering_without_consumers(self):
+        """
+        Test if nothing is drawn while nobody watches the processed and debug streams.
+        """
+        task = DetectionTask()
+        task.pacer.set_target_fps(0)
+        frame_buffer = FrameBuffer()
+        frame_buffer.acquire("debug")
+        frame_buffer.release("debug")
+
+        services = [FakeService(DrowsinessDetectionResult), FakeService(PhoneDetectionResult), FakeService(HandsDetectionResult)]
+        self.run_loop(task, services, frame_buffer, duration=0.1)
+
+        self.assertFalse(frame_buffer.has_consumers("debug"))
+        self.assertIsNotNone(frame_buffer.get_raw())
+        self.assertIsNone(frame_buffer.get_processed())
+        self.assertIsNone(frame_buffer.get_debug())
+        self.assertIsNone(task.latest_results["drowsiness"].debug_frame)
+
+    def test_models_run_on_downscaled_frame(self):
+        """
+        Test if the models get the frame downscaled to the inference resolution, keeping its aspect
+        ratio, while the streams keep the capture resolution.
+        """
+        task = DetectionTask(inference_resolution=(80, 80))
+        task.pacer.set_target_fps(0)
+        frame_buffer = FrameBuffer()
+        frame_buffer.acquire("debug")
+
+        services = [FakeService(DrowsinessDetectionResult), FakeService(PhoneDetectionResult), FakeService(HandsDetectionResult)]
+        self.run_loop(task, services, frame_buffer, duration=0.1)
+
+        self.assertEqual(frame_buffer.get_raw().shape, (120, 160, 3))
+        self.assertEqual(task.latest_results["drowsiness"].debug_frame.shape, (60, 80, 3))
+
+        small_frame = np.zeros((40, 60, 3), dtype=np.uint8)
+        self.assertIs(task.downscale_for_inference(small_frame), small_frame)
+
+    def test_concurrent_models(self):
+        """
+        Test if the concurrent mode joins the results in order in about the time of the slowest
+        model, and skips a model that timed out until its previous call returns.
+        """
+        task = DetectionTask()
+        task.concurrent_models = True
+        task.model_timeout = 0.2
+        task.executor = ThreadPoolExecutor(max_workers=3)
+        self.addCleanup(task.executor.shutdown)
+
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        services = [
+            ("drowsiness", FakeService(DrowsinessDetectionResult, delay=0.05)),
+            ("phone", FakeService(PhoneDetectionResult, delay=0.05)),
+            ("hands", FakeService(HandsDetectionResult, delay=0.05)),
+        ]
+
+        start = time.perf_counter()
+        results = task.run_models(frame, services)
+        self.assertLess(time.perf_counter() - start, 0.12)
+        self.assertEqual(list(results), ["drowsiness", "phone", "hands"])
+        self.assertIsInstance(results["phone"], PhoneDetectionResult)
+
+        services[2][1].delay = 0.6
+        self.assertIsNone(task.run_models(frame, services)["hands"])
+        self.assertIsNone(task.run_models(frame, services)["hands"])
+        self.assertEqual(services[2][1].frame_count, 1)
+        self.assertEqual(services[0][1].frame_count, 3)
+        # Only the call submitted and missing the deadline is a timeout, the next frame skips the busy model
+        self.assertEqual((task.model_timeout_count, task.model_busy_skip_count), (1, 1))
+
+        # Alone on a frame, the busy model is still skipped rather than run a second time
+        self.assertIsNone(task.run_models(frame, services[2:])["hands"])
+        time.sleep(0.5)
+        self.assertEqual(services[2][1].frame_count, 2)
+        self.assertEqual((task.model_timeout_count, task.model_busy_skip_count), (1, 2))
+
+    def test_reused_result_doesnt_resend_event(self):
+        """
+        Test if the drowsiness event of a result is only published by the frame the model ran on,
+        not again by the frames reusing the result while the model skips them.
+        """
+        task = DetectionTask()
+        frame_buffer = FrameBuffer()
+        publish = threading.Thread(target=task.publish_stage, args=(task.stop_event, task.queues, frame_buffer))
+        publish.start()
+        self.addCleanup(publish.join, 1)
+        self.addCleanup(task.stop)
+
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        result = DrowsinessDetectionResult(drowsiness_event="event-id")
+        for fresh_models in ({"drowsiness"}, set()):
+            published = task.published_count
+            task.queues["publish"].put(FramePacket(0, time.monotonic(), frame, None, drowsiness_result=result, fresh_models=fresh_models))
+            while task.published_count == published:
+                time.sleep(0.001)
+            if fresh_models:
+                self.assertEqual(frame_buffer.get_drowsiness_event_recent().drowsiness_event, "event-id")
+                # Taken by the websocket
+                frame_buffer.update_drowsiness_event_recent(None, None)
+
+        self.assertIsNone(frame_buffer.get_drowsiness_event_recent().drowsiness_event)
+
+
+class MultiCameraTest(unittest.TestCase):
+    def test_pipelines_run_per_camera(self):
+        """
+        Test if every camera publishes to its own frame buffer, and a camera can be paused alone.
+        """
+        pipelines = []
+        for camera_id in ("driver", "cabin"):
+            task = DetectionTask(camera_id)
+            task.pacer.set_target_fps(0)
+            services = [FakeService(DrowsinessDetectionResult), FakeService(PhoneDetectionResult), FakeService(HandsDetectionResult)]
+            pipelines.append(CameraPipeline(camera_id, FakeCamera(), FrameBuffer(camera_id), task, *services))
+        background_service = DetectionBackgroundService(pipelines)
+        self.addCleanup(background_service.stop)
+
+        self.assertTrue(background_service.start())
+        time.sleep(0.2)
+        self.assertTrue(background_service.is_active("cabin"))
+        for pipeline in pipelines:
+            self.assertIsNotNone(pipeline.frame_buffer.get_raw())
+
+        background_service.pipelines["cabin"].is_running = False
+        self.assertTrue(background_service.running("driver"))
+        self.assertFalse(background_service.running("cabin"))
+        self.assertTrue(background_service.is_running)
+        with self.assertRaises(KeyError):
+            background_service.start("rear")
+
+        self.assertTrue(background_service.stop())
+        self.assertFalse(background_service.is_active())
+
+if __name__ == "__main__":
+    unittest.main()
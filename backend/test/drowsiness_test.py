@@ -29,7 +29,7 @@ class DrowsinessTest(unittest.TestCase):
         face_landmarks = self.drowsiness_detector.detect_face_landmarks(frame)
         
         # Check if faces are detected (multi_face_landmarks is not empty)
-        if face_landmarks:
+        if len(face_landmarks) > 0:
             for face_landmark in face_landmarks:
                 # Get the left-eye and right-eye landmark
                 left_eye_landmark, right_eye_landmark = self.drowsiness_detector.extract_eye_landmark(face_landmark, LEFT_EYE_POINTS, RIGHT_EYE_POINTS, frame.shape[1], frame.shape[0])
@@ -55,7 +55,7 @@ class DrowsinessTest(unittest.TestCase):
         face_landmarks = self.drowsiness_detector.detect_face_landmarks(frame)
 
         # Check if faces are detected (multi_face_landmarks is not empty)
-        if face_landmarks:
+        if len(face_landmarks) > 0:
             for face_landmark in face_landmarks:
                 # Get the mouth landmark
                 mouth_eye_landmark = self.drowsiness_detector.extract_mouth_landmark(face_landmark, OUTER_LIPS_POINTS, frame.shape[1], frame.shape[0])
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.hardware.camera.file_camera import FileCamera
+
+
+class FileCameraTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        # Frames whose value is their index, to know which one was read
+        self.image_dir = os.path.join(self.directory.name, "images")
+        os.makedirs(self.image_dir)
+        self.video_path = os.path.join(self.directory.name, "clip.avi")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 20, (64, 48))
+        for index in range(10):
+            frame = np.full((48, 64, 3), index * 20, dtype=np.uint8)
+            cv2.imwrite(os.path.join(self.image_dir, f"{index:03d}.png"), frame)
+            writer.write(frame)
+        writer.release()
+
+    def read_index(self, camera : FileCamera) -> int:
+        ret, frame = camera.get_capture()
+        self.assertTrue(ret)
+        return int(round(frame.mean() / 20))
+
+    def test_image_directory_loops_and_seeks(self):
+        """
+        Test if the max mode plays the images in order, starts over at the end and seeks.
+        """
+        camera = FileCamera(self.image_dir, mode="max")
+        self.assertEqual([self.read_index(camera) for _ in range(12)], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 1])
+
+        camera.seek(7)
+        self.assertEqual(self.read_index(camera), 7)
+
+        camera = FileCamera(self.image_dir, mode="max", loop=False)
+        camera.seek(9)
+        self.read_index(camera)
+        self.assertEqual(camera.get_capture(), (False, None))
+
+    def test_video_realtime_follows_the_clip_fps(self):
+        """
+        Test if the realtime mode delivers the frames at the clip frame rate, and skips the frames
+        that went by while the reader was busy.
+        """
+        camera = FileCamera(self.video_path)
+        self.addCleanup(camera.release)
+        self.assertEqual(camera.fps, 20)
+
+        start = time.monotonic()
+        self.assertEqual([self.read_index(camera) for _ in range(3)], [0, 1, 2])
+        self.assertAlmostEqual(time.monotonic() - start, 0.1, delta=0.04)
+
+        time.sleep(0.2)
+        self.assertGreaterEqual(self.read_index(camera), 6)
+        self.assertGreaterEqual(camera.skipped_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
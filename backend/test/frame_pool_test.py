@@ -0,0 +1,59 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.utils.drawing_utils import draw_triangle_masking, triangle_points
+from backend.utils.frame_pool import FramePool
+
+
+class FramePoolTest(unittest.TestCase):
+    def test_released_buffer_is_reused(self):
+        """
+        Test if a released buffer is handed out again instead of allocating a new one.
+        """
+        pool = FramePool()
+        buffer = pool.copy(np.ones((48, 64, 3), dtype=np.uint8))
+        buffer_id = id(buffer)
+        pool.release(buffer)
+        pool.release(buffer)
+        del buffer
+
+        reused = pool.acquire((48, 64, 3))
+        self.assertEqual(id(reused), buffer_id)
+        self.assertEqual((pool.allocated_count, pool.reused_count), (1, 1))
+        self.assertEqual(len(pool.free[((48, 64, 3), "|u1")]), 0)
+
+    def test_referenced_buffer_is_not_reused(self):
+        """
+        Test if a released buffer still held elsewhere, like a frame being encoded for a stream, is left alone.
+        """
+        pool = FramePool()
+        streamed = pool.acquire((48, 64, 3))
+        pool.release(streamed)
+
+        other = pool.acquire((48, 64, 3))
+        self.assertIsNot(other, streamed)
+        self.assertEqual(pool.allocated_count, 2)
+
+class TriangleMaskingTest(unittest.TestCase):
+    def test_shading_matches_blend(self):
+        """
+        Test if the in place shading of the masking triangle matches the 50% blend with black it replaces.
+        """
+        frame = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+        expected = frame.copy()
+        triangle_cnt = triangle_points(120, 160)
+        cv2.polylines(expected, [triangle_cnt], isClosed=True, color=(0, 255, 0), thickness=2)
+        cv2.circle(expected, (80, 0), radius=6, color=(0, 0, 255), thickness=-1)
+        overlay = expected.copy()
+        cv2.fillPoly(overlay, [triangle_cnt], color=(0, 0, 0))
+        expected = cv2.addWeighted(overlay, 0.5, expected, 0.5, 0)
+
+        draw_triangle_masking(frame)
+        self.assertLessEqual(np.abs(frame.astype(int) - expected).max(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from backend.utils.metrics import MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_histogram_rendering(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage duration", buckets=(0.01, 0.1), stage="capture")
+        for value in (0.005, 0.05, 0.5):
+            histogram.observe(value)
+
+        text = registry.render()
+        self.assertIn("# HELP stage_seconds Stage duration", text)
+        self.assertIn("# TYPE stage_seconds histogram", text)
+        self.assertIn('stage_seconds_bucket{stage="capture",le="0.01"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="capture",le="0.1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="capture",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_count{stage="capture"} 3', text)
+
+    def test_metrics_are_shared_by_name_and_labels(self):
+        registry = MetricsRegistry()
+        registry.counter("frames_dropped_total", queue="render").inc()
+        registry.counter("frames_dropped_total", queue="render").inc(2)
+        registry.counter("frames_dropped_total", queue="publish").inc()
+
+        text = registry.render()
+        self.assertIn('frames_dropped_total{queue="render"} 3.0', text)
+        self.assertIn('frames_dropped_total{queue="publish"} 1.0', text)
+
+        with self.assertRaises(ValueError):
+            registry.gauge("frames_dropped_total", queue="render")
+
+    def test_timed_block(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("render_seconds")
+        with histogram.time():
+            pass
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.sum, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
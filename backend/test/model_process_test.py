@@ -0,0 +1,77 @@
+import gc
+import unittest
+
+import cv2
+import numpy as np
+
+from backend.lib.drowsiness_detection import DrowsinessDetection
+from backend.lib.model_process import ModelProcessPool
+from backend.settings.detection_config import detection_settings
+from backend.settings.model_config import model_settings
+from backend.utils.frame_context import FrameContext
+from backend.utils.shared_frame_ring import SharedFrameReader, SharedFrameRing
+
+
+class SharedFrameRingTest(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedFrameRing(2)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_slot_released_with_owner(self):
+        """
+        Test if the slot of a frame is held until its owner is garbage collected, and never overwritten meanwhile.
+        """
+        frame = np.arange(48 * 64 * 3, dtype=np.uint8).reshape(48, 64, 3)
+        context = FrameContext(frame)
+        name, slot, offset = self.ring.write(frame, owner=context)
+
+        other_slot = self.ring.write(frame)[1]
+        self.assertNotEqual(other_slot, slot)
+        self.ring.release(name, other_slot)
+
+        reader = SharedFrameReader()
+        view = reader.view(name, offset, frame.shape, frame.dtype.str)
+        self.assertTrue(np.array_equal(view, frame))
+        del view
+        reader.close()
+
+        del context
+        gc.collect()
+        self.assertEqual(self.ring.holders, [0, 0])
+
+    def test_bigger_frame_moves_to_new_segment(self):
+        """
+        Test if a bigger frame moves the ring to a new segment, the old one kept until its frame is released.
+        """
+        name, slot, _ = self.ring.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        new_name = self.ring.write(np.zeros((96, 128, 3), dtype=np.uint8))[0]
+
+        self.assertNotEqual(new_name, name)
+        self.assertIn(name, self.ring.retired)
+        self.ring.release(name, slot)
+        self.assertNotIn(name, self.ring.retired)
+
+class ModelProcessTest(unittest.TestCase):
+    def test_same_result_as_in_process(self):
+        """
+        Test if the drowsiness model run in a model process gives the same result as in the main process.
+        """
+        frame = cv2.imread("backend/test/test_resources/driver_yawning.jpg")
+        expected = DrowsinessDetection(model_settings.face, detection_settings.drowsiness, inference_engine="cpu").detects(frame)
+
+        pool = ModelProcessPool()
+        try:
+            result = pool.get("drowsiness").detects(frame, FrameContext(frame))
+        finally:
+            pool.close()
+
+        self.assertEqual(len(result.faces), len(expected.faces))
+        self.assertAlmostEqual(result.faces[0].mar, expected.faces[0].mar, places=6)
+        self.assertEqual(result.faces[0].is_yawning, expected.faces[0].is_yawning)
+        self.assertEqual(result.faces[0].face_landmark.dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
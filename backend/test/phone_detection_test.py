@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from backend.lib.phone_detection import PhoneDetection
+from backend.settings.detection_config import PhoneDetectionConfig
+from backend.settings.model_config import model_settings
+from backend.utils.frame_context import FrameContext
+
+
+class FakePoseModel:
+    """
+    Stands for the pose model, the wrists are a quarter of the frame height below the ears.
+    """
+    def preprocess(self, image, context=None):
+        return image
+
+    def inference(self, image, preprocessed=True, context=None):
+        landmarks = [(0.5, 0.5, 0.0)] * 33
+        landmarks[7] = landmarks[8] = (0.5, 0.25, 0.0)
+        return landmarks
+
+
+class PhoneDetectionTest(unittest.TestCase):
+    def test_threshold_applies_to_captured_frame(self):
+        """
+        Test if the pixel distance threshold is checked at the capture resolution when the model
+        gets a downscaled frame.
+        """
+        with mock.patch("backend.lib.phone_detection.get_body_pose_model", return_value=FakePoseModel()):
+            detector = PhoneDetection(model_settings.pose, PhoneDetectionConfig(distance_threshold=150))
+        full_frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        model_frame = np.zeros((240, 426, 3), dtype=np.uint8)
+
+        state = detector.detect(model_frame, FrameContext(model_frame, full_frame=full_frame)).detection[0]
+        self.assertFalse(state.is_calling)
+
+        state = detector.detect(model_frame, FrameContext(model_frame, full_shape=(240, 426, 3))).detection[0]
+        self.assertTrue(state.is_calling)
+
+    def test_metrics_per_camera(self):
+        """
+        Test if the detectors of two cameras publish their model metrics in separate series.
+        """
+        with mock.patch("backend.lib.phone_detection.get_body_pose_model", return_value=FakePoseModel()):
+            driver = PhoneDetection(model_settings.pose, PhoneDetectionConfig(distance_threshold=150), camera_id="metrics-driver")
+            cabin = PhoneDetection(model_settings.pose, PhoneDetectionConfig(distance_threshold=150), camera_id="metrics-cabin")
+
+        frame = np.zeros((240, 426, 3), dtype=np.uint8)
+        driver.detect(frame)
+        driver.detect(frame)
+        cabin.detect(frame)
+        self.assertEqual((driver.invocation_counter.value, cabin.invocation_counter.value), (2, 1))
+        self.assertEqual((driver.inference_histogram.count, cabin.inference_histogram.count), (2, 1))
+
+if __name__ == "__main__":
+    unittest.main()
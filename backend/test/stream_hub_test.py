@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from backend.streaming.stream_hub import StreamHub
+from backend.utils.frame_buffer import FrameBuffer
+
+
+class StreamHubTest(unittest.TestCase):
+    def setUp(self):
+        self.frame_buffer = FrameBuffer()
+        self.hub = StreamHub(self.frame_buffer, "raw")
+
+    def publish(self, value : int):
+        self.frame_buffer.update_raw(np.full((48, 64, 3), value, dtype=np.uint8))
+
+    def test_encodes_each_frame_once(self):
+        """
+        Test if the clients of a stream share one encoding of each frame, and a late client gets
+        the latest encoded frame at once.
+        """
+        clients = [self.hub.subscribe() for _ in range(3)]
+        self.publish(10)
+        parts = [next(client) for client in clients]
+        self.assertEqual(self.hub.encode_count, 1)
+        self.assertTrue(all(part is parts[0] for part in parts))
+        self.assertTrue(parts[0].startswith(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"))
+        self.assertEqual(self.frame_buffer.consumers["raw"], 3)
+
+        self.publish(20)
+        self.assertIsNot(next(clients[0]), parts[0])
+        late_client = self.hub.subscribe()
+        self.assertIs(next(late_client), self.hub.part)
+        self.assertEqual(self.hub.encode_count, 2)
+
+        for client in clients + [late_client]:
+            client.close()
+        self.assertEqual(self.frame_buffer.consumers["raw"], 0)
+
+    def test_slow_client_skips_frames(self):
+        """
+        Test if a client that didn't keep up gets the latest frame, skipping the ones in between.
+        """
+        skipped = self.hub.skipped_counter.value
+        fast, slow = self.hub.subscribe(), self.hub.subscribe()
+        self.publish(10)
+        next(fast)
+        next(slow)
+
+        for value in (20, 30, 40):
+            self.publish(value)
+            next(fast)
+        self.assertIs(next(slow), self.hub.part)
+        self.assertEqual(self.hub.version, 4)
+        self.assertEqual(self.hub.skipped_counter.value - skipped, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 
 import cv2
 import numpy as np
@@ -119,8 +120,8 @@ def draw_timestamp(frame : np.ndarray, position=(10, 30), font_scale=0.6, thickn
     np.ndarray
         The frame with the timestamp drawn on it.
     """
-    # Estimate brightness by converting to grayscale and taking mean pixel value
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # Estimate brightness by converting to grayscale and taking mean pixel value, one pixel out of 4 in each direction is enough
+    gray = cv2.cvtColor(np.ascontiguousarray(frame[::4, ::4]), cv2.COLOR_BGR2GRAY)
     brightness = np.mean(gray)
 
     # Choose text color: black for bright frames, white for dark ones
@@ -129,4 +130,42 @@ def draw_timestamp(frame : np.ndarray, position=(10, 30), font_scale=0.6, thickn
     # Draw timestamp
     timestamp = datetime.now().strftime(fmt)
     cv2.putText(frame, timestamp, position, cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
-    return frame
\ No newline at end of file
+    return frame
+
+def triangle_points(height : int, width : int) -> np.ndarray:
+    """Returns the bottom left, bottom right and top middle corners of the masking triangle of a frame."""
+    return np.array([(0, height - 1), (width - 1, height - 1), (width // 2, 0)], dtype=np.int32)
+
+@lru_cache(maxsize=4)
+def triangle_mask(height : int, width : int) -> np.ndarray:
+    """
+    Returns the single channel mask of the masking triangle of a frame, 1 inside and 0 outside.
+    It is computed once per frame size and shared, so it must not be modified.
+
+    Parameters:
+        height (int): Height of the frame.
+        width (int): Width of the frame.
+
+    Returns:
+        np.ndarray: The (height, width) uint8 mask.
+    """
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(mask, [triangle_points(height, width)], 1)
+    mask.flags.writeable = False
+    return mask
+
+def draw_triangle_masking(frame : np.ndarray):
+    """
+    Draws the masking triangle in place: its outline, its top point, and the inside shaded to half the brightness.
+
+    Parameters:
+        frame (ndarray): Image on which to draw.
+    """
+    height, width = frame.shape[:2]
+    triangle_cnt = triangle_points(height, width)
+    cv2.polylines(frame, [triangle_cnt], isClosed=True, color=(0, 255, 0), thickness=2)
+    cv2.circle(frame, (width // 2, 0), radius=6, color=(0, 0, 255), thickness=-1)
+
+    # Halving the pixels in place is the 50% blend with black, without the overlay copy
+    inside = triangle_mask(height, width).view(bool)
+    np.right_shift(frame, 1, out=frame, where=inside[..., None] if frame.ndim == 3 else inside)
@@ -5,10 +5,12 @@ import numpy as np
 
 from backend.domain.dto.drowsiness_event_metrics import DrowsinessEventMetrics
 from backend.domain.dto.facial_metrics import FacialMetrics
+from backend.utils.metrics import metrics
 
 
 class FrameBuffer:
-    def __init__(self):
+    def __init__(self, camera_id : str = "default"):
+        self.camera_id = camera_id
         self.raw_frame : np.ndarray = None
         self.processed_frame : np.ndarray = None
         self.debug_frame : np.ndarray = None
@@ -21,6 +23,10 @@ class FrameBuffer:
         self.facial_metrics_lock = Lock()
         self.drowsiness_event_lock = Lock()
 
+        # Number of clients watching each of the frame streams
+        self.consumers = {"raw": 0, "processed": 0, "debug": 0}
+        self.consumers_lock = Lock()
+
     def update_raw(self, frame):
         """Update the raw frame."""
         with self.raw_lock:
@@ -69,4 +75,21 @@ class FrameBuffer:
     def get_facial_metrics(self) -> Optional[FacialMetrics]:
         """Get the current FacialMetrics (EAR and MAR)."""
         with self.facial_metrics_lock:
-            return self.facial_metrics
\ No newline at end of file
+            return self.facial_metrics
+
+    def acquire(self, stream : str):
+        """Register a consumer of the stream ("raw", "processed" or "debug")."""
+        with self.consumers_lock:
+            self.consumers[stream] += 1
+            metrics.gauge("stream_clients", stream=stream, camera=self.camera_id).set(self.consumers[stream])
+
+    def release(self, stream : str):
+        """Unregister a consumer of the stream, once it stops reading the frames."""
+        with self.consumers_lock:
+            self.consumers[stream] = max(self.consumers[stream] - 1, 0)
+            metrics.gauge("stream_clients", stream=stream, camera=self.camera_id).set(self.consumers[stream])
+
+    def has_consumers(self, stream : str) -> bool:
+        """Whether anyone is watching the stream, the frames of a stream without consumers don't need to be rendered."""
+        with self.consumers_lock:
+            return self.consumers[stream] > 0
@@ -0,0 +1,99 @@
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """
+    Per frame memo of the images derived from a frame, shared by every model run on that frame.
+
+    Each derived image (RGB conversion, downscaled levels, detector letterbox inputs, ...) is computed
+    the first time a model asks for it and returned as is to the next ones, so it must be treated
+    as read only. A variant of the whole frame, like the triangle masked frame of the face model,
+    gets its own child context with `derive`.
+
+    The context is safe to share between the models running concurrently on the frame, a value
+    asked by two models at once is computed only once.
+
+    Parameters
+    ----------
+    frame : np.ndarray
+        The BGR frame the images are derived from.
+    full_frame : np.ndarray, optional
+        The captured frame `frame` was downscaled from for the models, kept for the event
+        snapshots (default is `frame` itself).
+    full_shape : tuple, optional
+        Shape of the captured frame, which the pixel thresholds of the detections are set for,
+        given alone in a model process that only gets `frame` (default is the shape of `full_frame`).
+    """
+    def __init__(self, frame : np.ndarray, full_frame : Optional[np.ndarray] = None, full_shape : Optional[tuple] = None):
+        self.frame = frame
+        self.full_frame = full_frame if full_frame is not None else frame
+        self.full_shape = tuple(full_shape) if full_shape is not None else self.full_frame.shape
+        self.cache : dict[Hashable, Any] = {}
+        self.key_locks : dict[Hashable, Lock] = {}
+        self.lock = Lock()
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get_or_compute(self, key : Hashable, compute : Callable[[], Any]) -> Any:
+        """
+        Returns the value memoized under `key`, computing it with `compute` the first time.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the derived value, including every parameter it depends on.
+        compute : Callable[[], Any]
+            Computes the value from this context's frame.
+
+        Returns
+        -------
+        Any
+            The memoized value.
+        """
+        with self.lock:
+            if key in self.cache:
+                self.hit_count += 1
+                return self.cache[key]
+            key_lock = self.key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            with self.lock:
+                if key in self.cache:
+                    self.hit_count += 1
+                    return self.cache[key]
+            value = compute()
+            with self.lock:
+                self.cache[key] = value
+                self.miss_count += 1
+            return value
+
+    def derive(self, name : str, transform : Callable[[np.ndarray], np.ndarray]) -> "FrameContext":
+        """
+        Returns the child context of a variant of the frame, computed with `transform` the first time.
+
+        Parameters
+        ----------
+        name : str
+            Name of the variant, for instance "triangle_masked".
+        transform : Callable[[np.ndarray], np.ndarray]
+            Computes the BGR variant from this context's frame.
+
+        Returns
+        -------
+        FrameContext
+            The context of the variant, with its own memoized images.
+        """
+        return self.get_or_compute(("derive", name), lambda: FrameContext(transform(self.frame)))
+
+    def rgb(self) -> np.ndarray:
+        """Returns the frame converted to RGB."""
+        return self.get_or_compute("rgb", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB))
+
+    def resized(self, width : int, height : int) -> np.ndarray:
+        """Returns the RGB frame resized to (width, height)."""
+        return self.get_or_compute(("resized", width, height), lambda: cv2.resize(self.rgb(), (width, height)))
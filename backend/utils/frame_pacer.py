@@ -0,0 +1,57 @@
+import threading
+import time
+from typing import Optional
+
+
+class FramePacer:
+    """
+    Paces a loop to a target frame rate with a deadline per frame.
+
+    `wait` only sleeps for what remains of the frame budget once the work of the frame is done,
+    so a loop slower than the target never sleeps. The deadlines are not accumulated when the
+    loop falls behind, it restarts from the current time instead of bursting to catch up.
+
+    Parameters
+    ----------
+    target_fps : float
+        Frame rate to pace to, 0 or less disables the pacing.
+    """
+    def __init__(self, target_fps : float = 0.0):
+        self.set_target_fps(target_fps)
+
+    def set_target_fps(self, target_fps : float):
+        self.target_fps = target_fps
+        self.frame_period = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.deadline : Optional[float] = None
+
+    def wait(self, stop_event : Optional[threading.Event] = None) -> float:
+        """
+        Sleep until the deadline of the next frame.
+
+        Parameters
+        ----------
+        stop_event : threading.Event, optional
+            Event interrupting the sleep when set.
+
+        Returns
+        -------
+        float
+            The time slept in seconds.
+        """
+        if self.frame_period <= 0:
+            return 0.0
+
+        now = time.perf_counter()
+        if self.deadline is None or now - self.deadline > self.frame_period:
+            # First frame or more than a frame behind, start over from now
+            self.deadline = now + self.frame_period
+            return 0.0
+
+        remaining = self.deadline - now
+        if remaining > 0:
+            if stop_event is not None:
+                stop_event.wait(remaining)
+            else:
+                time.sleep(remaining)
+        self.deadline += self.frame_period
+        return max(remaining, 0.0)
@@ -0,0 +1,92 @@
+import sys
+from collections import deque
+from threading import Lock
+
+import numpy as np
+
+
+def free_refcount(buffers : deque) -> int:
+    """Reference count of the first buffer of `buffers`, as seen from the pool."""
+    return sys.getrefcount(buffers[0])
+
+# Reference count of a buffer only held by the pool, calibrated once with an array nobody else holds
+UNREFERENCED_REFCOUNT = free_refcount(deque([np.empty(0)]))
+
+
+class FramePool:
+    """
+    Pool of reusable frame buffers, so the stages of the detection loop write their frames into
+    buffers allocated once instead of allocating a new frame on every copy.
+
+    A buffer taken with `acquire` or `copy` is owned by the caller, who writes into it and hands it
+    over to the next stage, and the last owner gives it back with `release` once it is done with it.
+    Stages only reading a frame use it as is and never release it.
+
+    A released buffer is only reused once nothing else references it anymore, so a frame released
+    while a video stream is still encoding it, or while a reused model result still holds it, is
+    left alone until then. A buffer that is never released is simply garbage collected.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Maximum number of free buffers kept per frame shape (default is 8).
+    """
+    def __init__(self, capacity : int = 8):
+        self.capacity = capacity
+        self.free : dict[tuple, deque] = {}
+        self.lock = Lock()
+
+        self.allocated_count = 0
+        self.reused_count = 0
+
+    def acquire(self, shape : tuple, dtype = np.uint8) -> np.ndarray:
+        """
+        Take a buffer of the given shape, its content is undefined.
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of the buffer, for instance (480, 640, 3).
+        dtype : optional
+            Data type of the buffer (default is uint8).
+
+        Returns
+        -------
+        np.ndarray
+            A buffer owned by the caller.
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self.lock:
+            buffers = self.free.get(key)
+            if buffers:
+                # Buffers still referenced elsewhere are moved to the back and looked at later
+                for _ in range(len(buffers)):
+                    if free_refcount(buffers) <= UNREFERENCED_REFCOUNT:
+                        self.reused_count += 1
+                        return buffers.popleft()
+                    buffers.rotate(-1)
+            self.allocated_count += 1
+        return np.empty(shape, dtype=dtype)
+
+    def copy(self, frame : np.ndarray) -> np.ndarray:
+        """Take a buffer of the frame's shape and copy the frame into it."""
+        buffer = self.acquire(frame.shape, frame.dtype)
+        np.copyto(buffer, frame)
+        return buffer
+
+    def release(self, buffer : np.ndarray):
+        """
+        Give back a buffer taken from the pool. Releasing None, a view or a buffer already released is a no-op.
+        """
+        if buffer is None or buffer.base is not None or not buffer.flags.c_contiguous:
+            return
+        key = (buffer.shape, buffer.dtype.str)
+        with self.lock:
+            buffers = self.free.setdefault(key, deque())
+            if len(buffers) >= self.capacity or any(free is buffer for free in buffers):
+                return
+            buffers.append(buffer)
+
+
+# The pool shared by the detection loop and the detection services
+frame_pool = FramePool()
@@ -0,0 +1,81 @@
+from threading import Condition
+from typing import Any, Callable, Optional
+
+from backend.utils.metrics import metrics
+
+
+class LatestValueQueue:
+    """
+    A single slot queue between two pipeline stages that always holds the most recent value.
+
+    The producer never blocks: putting a value while the previous one hasn't been taken yet
+    overwrites it and counts it as dropped, so a slow consumer always works on the freshest
+    value instead of a backlog.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the queue in the metrics.
+    on_drop : Callable[[Any], None], optional
+        Called with every overwritten value, outside of the queue lock, to free what it holds.
+    **labels
+        Extra labels of the metrics of the queue, like the camera of the pipeline.
+    """
+    def __init__(self, name : str = "", on_drop : Optional[Callable[[Any], None]] = None, **labels):
+        self.name = name
+        self.on_drop = on_drop
+        self.value : Any = None
+        self.has_value = False
+        self.closed = False
+
+        self.put_count = 0
+        self.dropped_count = 0
+        self.dropped_counter = metrics.counter("frames_dropped_total", queue=name, **labels)
+
+        self.condition = Condition()
+
+    def put(self, value : Any):
+        """Put a value, replacing the one not consumed yet if any."""
+        dropped = None
+        with self.condition:
+            if self.has_value:
+                dropped = self.value
+                self.dropped_count += 1
+                self.dropped_counter.inc()
+            self.value = value
+            self.has_value = True
+            self.put_count += 1
+            self.condition.notify()
+
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout : Optional[float] = None) -> Optional[Any]:
+        """
+        Take the latest value, waiting for one to be put.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait in seconds, waits forever when None.
+
+        Returns
+        -------
+        Any or None
+            The latest value, or None when the timeout expires or the queue is closed.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.has_value or self.closed, timeout):
+                return None
+            if not self.has_value:
+                return None
+            value = self.value
+            self.value = None
+            self.has_value = False
+            return value
+
+    def close(self):
+        """Close the queue, the waiting consumers are woken up and get None."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
@@ -0,0 +1,194 @@
+import bisect
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator, Optional
+
+# Latency buckets in seconds, from the sub millisecond host steps up to a slow upload
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Help text of the metrics published by the application
+DESCRIPTIONS = {
+    "detection_stage_seconds": "Duration of one frame in each stage of the detection loop",
+    "frames_captured_total": "Frames read from the camera",
+    "camera_decode_seconds": "Duration of the decoding of a frame of a network camera stream",
+    "camera_reconnects_total": "Reconnection attempts to a network camera stream",
+    "frames_dropped_total": "Frames overwritten in a stage queue before the next stage took them",
+    "frame_age_seconds": "Time since the capture of a frame, when the models start on it and when its result is published",
+    "model_preprocess_seconds": "Duration of the model input preprocessing",
+    "model_inference_seconds": "Duration of the model inference",
+    "model_invocations_total": "Frames each model ran on",
+    "model_timeouts_total": "Model calls of the concurrent mode that didn't return within the model timeout",
+    "model_busy_skips_total": "Frames a model skipped in the concurrent mode, still busy with a previous frame",
+    "model_process_roundtrip_seconds": "Duration of a frame sent to a model process until its result is back",
+    "feature_extraction_seconds": "Duration of the features computation from the landmarks",
+    "render_seconds": "Duration of the annotated frames drawing",
+    "jpeg_encode_seconds": "Duration of the JPEG encoding of the streamed frames",
+    "stream_clients": "Clients connected to each video stream",
+    "stream_frames_skipped_total": "Frames a slow video stream client skipped to stay on the latest frame",
+    "db_write_seconds": "Duration of the database writes",
+    "event_image_save_seconds": "Duration of the event images writes to disk",
+    "event_upload_seconds": "Duration of the event images uploads to the server",
+}
+
+
+def format_labels(labels : dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing value, like the number of frames dropped."""
+    type_name = "counter"
+
+    def __init__(self, labels : dict):
+        self.labels = labels
+        self.value = 0.0
+        self.lock = Lock()
+
+    def inc(self, amount : float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name : str) -> list[str]:
+        return [f"{name}{format_labels(self.labels)} {self.value}"]
+
+
+class Gauge:
+    """A value that goes up and down, like the number of clients connected to a stream."""
+    type_name = "gauge"
+
+    def __init__(self, labels : dict):
+        self.labels = labels
+        self.value = 0.0
+        self.lock = Lock()
+
+    def set(self, value : float):
+        with self.lock:
+            self.value = value
+
+    def inc(self, amount : float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount : float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def samples(self, name : str) -> list[str]:
+        return [f"{name}{format_labels(self.labels)} {self.value}"]
+
+
+class Histogram:
+    """
+    Distribution of durations over fixed buckets. An observation costs a binary search and an
+    increment, the cumulative counts are only computed when the metrics are rendered.
+    """
+    type_name = "histogram"
+
+    def __init__(self, labels : dict, buckets : tuple[float, ...] = DEFAULT_BUCKETS):
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = Lock()
+
+    def observe(self, value : float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the `with` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name : str) -> list[str]:
+        with self.lock:
+            bucket_counts = list(self.bucket_counts)
+            total, count = self.sum, self.count
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, float("inf")), bucket_counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{format_labels({**self.labels, 'le': le})} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(self.labels)} {total}")
+        lines.append(f"{name}_count{format_labels(self.labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric of the application, created on first use and keyed by name and labels,
+    and renders them in the Prometheus text exposition format.
+    """
+    def __init__(self):
+        self.families : dict[str, tuple[str, type, dict]] = {}
+        self.lock = Lock()
+
+    def get_or_create(self, metric_class : type, name : str, description : Optional[str], labels : dict, **kwargs):
+        key = tuple(sorted(labels.items()))
+        family = self.families.get(name)
+        if family is not None and family[1] is metric_class:
+            metric = family[2].get(key)
+            if metric is not None:
+                return metric
+
+        with self.lock:
+            _, family_class, family_metrics = self.families.setdefault(name, (description or DESCRIPTIONS.get(name, ""), metric_class, {}))
+            if family_class is not metric_class:
+                raise ValueError(f"Metric {name} is already registered as a {family_class.type_name}")
+            if key not in family_metrics:
+                family_metrics[key] = metric_class(labels, **kwargs)
+            return family_metrics[key]
+
+    def counter(self, name : str, description : Optional[str] = None, **labels) -> Counter:
+        return self.get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name : str, description : Optional[str] = None, **labels) -> Gauge:
+        return self.get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name : str, description : Optional[str] = None, buckets : Optional[tuple[float, ...]] = None, **labels) -> Histogram:
+        return self.get_or_create(Histogram, name, description, labels, buckets=buckets or DEFAULT_BUCKETS)
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text format."""
+        with self.lock:
+            families = [(name, description, metric_class, list(family_metrics.values())) for name, (description, metric_class, family_metrics) in self.families.items()]
+
+        lines = []
+        for name, description, metric_class, family_metrics in sorted(families, key=lambda family: family[0]):
+            if description:
+                lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_class.type_name}")
+            for metric in family_metrics:
+                lines.extend(metric.samples(name))
+        return "\n".join(lines) + "\n"
+
+
+# The registry shared by the whole application
+metrics = MetricsRegistry()
+
+
+def timed(name : str, **labels):
+    """
+    Times the `with` block or the decorated function into the histogram `name` of the shared registry.
+
+    Example:
+    ```
+        with timed("db_write_seconds", table="drowsiness_event"):
+            session.commit()
+    ```
+    """
+    return metrics.histogram(name, **labels).time()
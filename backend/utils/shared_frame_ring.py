@@ -0,0 +1,150 @@
+import weakref
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Ring of frame slots in a shared memory segment, to hand the frames over to the model processes
+    without pickling them: the frame is copied once into a free slot and only the slot index is sent.
+
+    A slot is held from `write` until it is released, either explicitly or when the owner given to
+    `write` is garbage collected, and a held slot is never overwritten. A frame bigger than the slots
+    moves the ring to a new, bigger segment, the old one is unlinked once its last slot is released.
+
+    Parameters
+    ----------
+    slot_count : int
+        Number of frames the ring can hold at once.
+    """
+    def __init__(self, slot_count : int):
+        self.slot_count = slot_count
+        self.segment : Optional[shared_memory.SharedMemory] = None
+        self.slot_bytes = 0
+        self.holders : list[int] = [0] * slot_count
+        self.next_slot = 0
+
+        # Previous segments still holding frames, by name, with their number of held slots
+        self.retired : dict[str, list] = {}
+        self.lock = Lock()
+
+    def write(self, frame : np.ndarray, owner : Optional[Any] = None) -> tuple[str, int, int]:
+        """
+        Copy the frame into a free slot and hold it.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            The frame to share.
+        owner : Any, optional
+            Object whose garbage collection releases the slot, like the `FrameContext` of the frame.
+
+        Returns
+        -------
+        tuple[str, int, int]
+            The name of the shared memory segment, the index of the slot and its offset in bytes.
+        """
+        with self.lock:
+            if self.segment is None or frame.nbytes > self.slot_bytes:
+                self.resize(frame.nbytes)
+
+            for _ in range(self.slot_count):
+                slot = self.next_slot
+                self.next_slot = (self.next_slot + 1) % self.slot_count
+                if self.holders[slot] == 0:
+                    break
+            else:
+                raise RuntimeError(f"All the {self.slot_count} shared frame slots are in use")
+
+            self.holders[slot] = 1
+            name, offset = self.segment.name, slot * self.slot_bytes
+            destination = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.segment.buf, offset=offset)
+            np.copyto(destination, frame)
+            del destination
+
+        if owner is not None:
+            weakref.finalize(owner, self.release, name, slot)
+        return name, slot, offset
+
+    def hold(self, name : str, slot : int):
+        """Hold an already written slot once more, each hold needs its own `release`."""
+        with self.lock:
+            holders = self.holders_of(name)
+            if holders is not None:
+                holders[slot] += 1
+
+    def release(self, name : str, slot : int):
+        """Release a hold of the slot, the slot is free once every hold is released."""
+        with self.lock:
+            holders = self.holders_of(name)
+            if holders is None or holders[slot] == 0:
+                return
+            holders[slot] -= 1
+
+            retired = self.retired.get(name)
+            if retired is not None and not any(retired[1]):
+                del self.retired[name]
+                retired[0].close()
+                retired[0].unlink()
+
+    def holders_of(self, name : str) -> Optional[list[int]]:
+        if self.segment is not None and self.segment.name == name:
+            return self.holders
+        retired = self.retired.get(name)
+        return retired[1] if retired is not None else None
+
+    def resize(self, slot_bytes : int):
+        if self.segment is not None:
+            if any(self.holders):
+                self.retired[self.segment.name] = [self.segment, self.holders]
+            else:
+                self.segment.close()
+                self.segment.unlink()
+        self.segment = shared_memory.SharedMemory(create=True, size=slot_bytes * self.slot_count)
+        self.slot_bytes = slot_bytes
+        self.holders = [0] * self.slot_count
+        self.next_slot = 0
+
+    def close(self):
+        """Close and unlink every segment, the frames still held are lost."""
+        with self.lock:
+            segments = [retired[0] for retired in self.retired.values()]
+            if self.segment is not None:
+                segments.append(self.segment)
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+            self.segment = None
+            self.retired.clear()
+            self.holders = [0] * self.slot_count
+
+
+class SharedFrameReader:
+    """
+    Reading side of a `SharedFrameRing`, in the model process. It follows the ring to its new segment
+    when it is resized. The segments stay registered to the resource tracker the process shares with
+    the writer, which unlinks them if the writer dies without closing the ring.
+    """
+    def __init__(self):
+        self.segment : Optional[shared_memory.SharedMemory] = None
+
+    def view(self, name : str, offset : int, shape : tuple, dtype : str) -> np.ndarray:
+        """
+        Returns the frame in the slot, as a read only view on the shared memory. The view must be
+        dropped before the next call, which may close the segment it points to.
+        """
+        if self.segment is None or self.segment.name != name:
+            self.close()
+            self.segment = shared_memory.SharedMemory(name=name)
+
+        frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.segment.buf, offset=offset)
+        frame.flags.writeable = False
+        return frame
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
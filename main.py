@@ -12,8 +12,12 @@ from backend.services.drowsiness_event_service import DrowsinessEventService
 from backend.settings.app_config import settings
 from backend.infrastructure.session import init_db, engine
 
+from backend.domain.dto.camera_pipeline import CameraPipeline
+
+from backend.lib.model_process import model_processes
 from backend.lib.socket_trigger import SocketTrigger
-from backend.routers import config_router, detection_control_router, drowsiness_realtime_router, app_version, buzzer_router, drowsiness_event_router
+from backend.models.factory_model import hailo_inference_engine
+from backend.routers import config_router, detection_control_router, drowsiness_realtime_router, app_version, buzzer_router, drowsiness_event_router, metrics_router
 from backend.services.drowsiness_detection_service import DrowsinessDetectionService
 from backend.services.phone_detection_service import PhoneDetectionService
 from backend.services.hand_detection_service import HandsDetectionService
@@ -21,6 +25,7 @@ from backend.services.hand_detection_service import HandsDetectionService
 from backend.tasks.detection_task import DetectionTask
 from backend.utils.frame_buffer import FrameBuffer
 from backend.utils.logging import logging_default
+from backend.utils.metrics import metrics
 
 from backend.hardware.factory_hardware import (
     get_camera,
@@ -30,7 +35,6 @@ from backend.hardware.factory_hardware import (
 # Building Services and Hardware connection
 logging_default.info("Building services and initiated hardwares")
 socket_trigger = SocketTrigger(settings.ApiSettings)
-camera = get_camera()
 buzzer = get_buzzer()
 
 # Apply Alembic migrations
@@ -41,36 +45,43 @@ db_session = Session(engine)
 drowsiness_event_service = DrowsinessEventService(db_session)
 
 buzzer_service = BuzzerService(buzzer)
-drowsiness_service = DrowsinessDetectionService(buzzer_service, socket_trigger, drowsiness_event_service)
-phone_detection_service = PhoneDetectionService(socket_trigger)
-hand_service = HandsDetectionService(socket_trigger)
-
-detection_task = DetectionTask()
-
-# Create shared frame buffer
-frame_buffer = FrameBuffer()
-
-detection_background_service = DetectionBackgroundService(
-    detection_task,
-    drowsiness_service,
-    phone_detection_service,
-    hand_service,
-    camera,
-    frame_buffer
-)
+
+# Build the pipeline of each camera, with its own services, task and frame buffer
+camera_pipelines = []
+for camera_settings in settings.Cameras:
+    camera_id = camera_settings.camera_id
+    camera_pipelines.append(CameraPipeline(
+        camera_id=camera_id,
+        camera=get_camera(camera_settings),
+        frame_buffer=FrameBuffer(camera_id),
+        detection_task=DetectionTask(camera_id, camera_settings.inference_resolution),
+        drowsiness_service=DrowsinessDetectionService(buzzer_service, socket_trigger, drowsiness_event_service, camera_id),
+        phone_detection_service=PhoneDetectionService(socket_trigger, camera_id),
+        hand_service=HandsDetectionService(socket_trigger, camera_id)
+    ))
+
+detection_background_service = DetectionBackgroundService(camera_pipelines)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Start detection loop thread that will run the drowsiness service on app startup
     # source = https://stackoverflow.com/questions/70872276/fastapi-python-how-to-run-a-thread-in-the-background 
+    # Open the Hailo inference sessions once all the models have been loaded by the services
+    if hailo_inference_engine is not None:
+        hailo_inference_engine.open()
     detection_background_service.start()
     yield
 
     # Event when shutdown the FastAPI
-    camera.release()
+    for pipeline in camera_pipelines:
+        pipeline.camera.release()
     buzzer.cleanup()
     db_session.close()
     detection_background_service.stop()
+    model_processes.close()
+    if hailo_inference_engine is not None:
+        hailo_inference_engine.close()
+        hailo_inference_engine.release_device()
 
 # Define Fast API App
 logging_default.info("Run webApp")
@@ -98,7 +109,8 @@ app.mount(f"/{settings.ApiSettings.static_dir}", StaticFiles(directory=f"{settin
 logging_default.info("Registering API routers")
 app.include_router(app_version.router, prefix="/version", tags=["Version"])
 app.include_router(buzzer_router.buzzer_router(buzzer_service), prefix="/buzzer", tags=["Buzzer"])
-app.include_router(config_router.config_router(drowsiness_service, phone_detection_service, detection_task), prefix="/config", tags=["config"])
+app.include_router(config_router.config_router(detection_background_service), prefix="/config", tags=["config"])
 app.include_router(detection_control_router.detection_control_router(detection_background_service), prefix="/detection", tags=["Detection Control"])
-app.include_router(drowsiness_realtime_router.drowsiness_realtime_router(frame_buffer), prefix="/realtime", tags=["Realtime Drowsiness"])
-app.include_router(drowsiness_event_router.router, prefix="/drowsinessevent", tags=["Drowsiness Event"])
\ No newline at end of file
+app.include_router(drowsiness_realtime_router.drowsiness_realtime_router({pipeline.camera_id: pipeline.frame_buffer for pipeline in camera_pipelines}), prefix="/realtime", tags=["Realtime Drowsiness"])
+app.include_router(drowsiness_event_router.router, prefix="/drowsinessevent", tags=["Drowsiness Event"])
+app.include_router(metrics_router.metrics_router(metrics), prefix="/metrics", tags=["Metrics"])
\ No newline at end of file